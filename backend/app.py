@@ -17,10 +17,18 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from models.nutritional_model import NutritionalTargetModel
 from models.meal_recommender import MealRecommender
 from models.meal_recommender_ml import MealRecommenderML
+from models.meal_plan_optimizer import MealPlanOptimizer
+from models.meal_shards import ShardedMealRecommender
+from models.recommendation_table import RecommendationTable, artifact_fingerprint
 from models.workout_classifier import WorkoutClassifier
 from models.workout_generator_ml import WorkoutGeneratorML
 from models.progress_forecast import ProgressForecastModel
+from models.strength_standards import StrengthStandards
+from models.lift_quality import LiftQualityClassifier, WINDOW
+from models.population_percentiles import PopulationPercentiles, POUND_KG
+from models.periodization import MIN_WEEKS, MAX_WEEKS
 from utils.data_loader import load_datasets
+from utils.sensor_store import SENSOR_CHANNELS
 
 app = Flask(__name__)
 CORS(app)
@@ -29,13 +37,19 @@ CORS(app)
 nutritional_model = None
 meal_recommender = None
 meal_recommender_ml = None
+meal_plan_optimizer = None
+meal_shards = None
+recommendation_table = None
 workout_classifier = None
 workout_generator_ml = None
 progress_model = None
+strength_standards = None
+lift_quality_model = None
+population_percentiles = None
 
 def load_models():
     """Load trained models"""
-    global nutritional_model, meal_recommender, meal_recommender_ml, workout_classifier, workout_generator_ml, progress_model
+    global nutritional_model, meal_recommender, meal_recommender_ml, meal_plan_optimizer, meal_shards, recommendation_table, workout_classifier, workout_generator_ml, progress_model, strength_standards, lift_quality_model, population_percentiles
     
     # Get the directory where this script is located
     backend_dir = os.path.dirname(os.path.abspath(__file__))
@@ -64,67 +78,61 @@ def load_models():
         import traceback
         traceback.print_exc()
     
+    # Datasets the loaded models still need: the fallback meal recommender's
+    # dietary data, and exercises/stretches for the workout models. Models are
+    # trained by train_models.py, never at boot.
+    datasets = load_datasets(base_path=base_dir, names=['dietary', 'exercises', 'stretches'])
+    
     # Initialize ML meal recommender (preferred) and fallback meal recommender
     try:
-        # Change to base directory for data loading
-        original_dir = os.getcwd()
-        os.chdir(base_dir)
-        datasets = load_datasets(base_path='.')
-        os.chdir(original_dir)
-        
         # Try to load ML meal recommender first
         meal_ml_path = os.path.join(models_dir, 'meal_recommender_ml.joblib')
+        meal_store_path = os.path.join(models_dir, 'meal_catalog.sqlite')
         meal_recommender_ml = MealRecommenderML()
         
-        if os.path.exists(meal_ml_path):
+        # MEAL_CATALOG_BACKEND=sqlite serves recommendations from the SQLite
+        # catalog built by train_models.py instead of loading it into memory
+        use_store = os.environ.get('MEAL_CATALOG_BACKEND', 'memory').lower() == 'sqlite'
+        if use_store and os.path.exists(meal_store_path):
+            store = meal_recommender_ml.open_store(meal_store_path)
+            if os.path.exists(meal_ml_path) and store.artifact_sha256 != artifact_fingerprint(meal_ml_path):
+                print("⚠ SQLite meal catalog was built from a different model (rerun train_models.py to rebuild it)")
+        elif os.path.exists(meal_ml_path):
+            if use_store:
+                print(f"⚠ {meal_store_path} not found, loading the meal catalog into memory")
             try:
                 meal_recommender_ml.load(meal_ml_path)
                 # Verify model is loaded correctly
                 if meal_recommender_ml.meals_df is not None and len(meal_recommender_ml.meals_df) > 0:
                     print(f"✓ ML Meal recommender loaded from file ({len(meal_recommender_ml.meals_df)} meals)")
                 else:
-                    print("⚠ ML Meal recommender loaded but meals_df is empty, retraining...")
-                    # PRIORITY: Use meals dataset if available
-                    if datasets.get('meals') is not None and len(datasets['meals']) > 0:
-                        if meal_recommender_ml.train(meals_df=datasets['meals']):
-                            meal_recommender_ml.save(meal_ml_path)
-                            print(f"✓ ML Meal recommender retrained with {len(datasets['meals'])} USDA meals and saved")
-                        else:
-                            print("⚠ ML Meal recommender retraining failed")
-                            meal_recommender_ml = None
-                    elif datasets.get('dietary') is not None:
-                        if meal_recommender_ml.train(dietary_df=datasets['dietary']):
-                            meal_recommender_ml.save(meal_ml_path)
-                            print("✓ ML Meal recommender retrained and saved")
-                        else:
-                            print("⚠ ML Meal recommender retraining failed")
-                            meal_recommender_ml = None
-                    else:
-                        meal_recommender_ml = None
+                    print("⚠ ML Meal recommender loaded but meals_df is empty (run train_models.py to retrain it)")
+                    meal_recommender_ml = None
             except Exception as e:
                 print(f"⚠ Error loading ML meal recommender: {e}")
                 import traceback
                 traceback.print_exc()
                 meal_recommender_ml = None
-        # Train new model with meals dataset (PRIORITY) or dietary dataset (fallback)
-        elif datasets.get('meals') is not None and len(datasets['meals']) > 0:
-            if meal_recommender_ml.train(meals_df=datasets['meals']):
-                meal_recommender_ml.save(meal_ml_path)
-                print(f"✓ ML Meal recommender trained with {len(datasets['meals'])} USDA meals and saved")
-            else:
-                print("⚠ ML Meal recommender training failed")
-                meal_recommender_ml = None
-        elif datasets.get('dietary') is not None:
-            if meal_recommender_ml.train(dietary_df=datasets['dietary']):
-                meal_recommender_ml.save(meal_ml_path)
-                print("✓ ML Meal recommender trained and saved")
-            else:
-                print("⚠ ML Meal recommender training failed")
-                meal_recommender_ml = None
         else:
-            print("⚠ No meal or dietary data for ML meal recommender")
+            print(f"⚠ {meal_ml_path} not found, run train_models.py to train the ML meal recommender")
             meal_recommender_ml = None
         
+        # Multi-day meal planner over the in-memory ML meal catalog
+        if meal_recommender_ml is not None and meal_recommender_ml.snapshot is not None:
+            meal_plan_optimizer = MealPlanOptimizer(meal_recommender_ml)
+            print("✓ Meal plan optimizer initialized")
+            # MEAL_SHARDS=N scores recommendations across N worker processes
+            num_shards = int(os.environ.get('MEAL_SHARDS', '0') or 0)
+            if num_shards > 1:
+                meal_shards = ShardedMealRecommender(meal_recommender_ml, num_shards)
+                print(f"✓ Meal catalog split across {len(meal_shards)} shard worker processes")
+        if meal_recommender_ml is not None:
+            # Precomputed recommendations, only if built from the artifact just loaded
+            recommendation_table = RecommendationTable.open(
+                os.path.join(models_dir, 'meal_recommendations.bin'), meal_ml_path)
+            if recommendation_table is not None:
+                print(f"✓ Recommendation table loaded ({len(recommendation_table)} precomputed requests)")
+        
         # Fallback: Initialize traditional meal recommender
         meal_recommender = MealRecommender()
         if datasets['dietary'] is not None:
@@ -137,15 +145,13 @@ def load_models():
         import traceback
         traceback.print_exc()
         meal_recommender_ml = None
+        meal_plan_optimizer = None
+        meal_shards = None
+        recommendation_table = None
         meal_recommender = MealRecommender()  # Initialize empty
     
     # Load ML workout generator (preferred) and fallback workout classifier
     try:
-        original_dir = os.getcwd()
-        os.chdir(base_dir)
-        datasets = load_datasets(base_path='.')
-        os.chdir(original_dir)
-        
         # Try to load ML workout generator first
         workout_ml_path = os.path.join(models_dir, 'workout_generator_ml.joblib')
         workout_generator_ml = WorkoutGeneratorML()
@@ -153,15 +159,14 @@ def load_models():
         if os.path.exists(workout_ml_path):
             workout_generator_ml.load(workout_ml_path)
             print("✓ ML Workout generator loaded from file")
-        elif datasets['exercises'] is not None:
-            if workout_generator_ml.train(datasets['exercises']):
-                workout_generator_ml.save(workout_ml_path)
-                print("✓ ML Workout generator trained and saved")
-            else:
-                print("⚠ ML Workout generator training failed")
-                workout_generator_ml = None
+            if workout_generator_ml.stretch_routines is None:
+                # Saved before stretches were indexed: build the index now
+                workout_generator_ml.attach_stretches(datasets['stretches'])
+            if workout_generator_ml.search_index is None:
+                # Saved before exercise search existed: build it now
+                workout_generator_ml.build_search_index(datasets['stretches'])
         else:
-            print("⚠ No exercise data for ML workout generator")
+            print(f"⚠ {workout_ml_path} not found, run train_models.py to train the ML workout generator")
             workout_generator_ml = None
         
         # Fallback: Load workout classifier
@@ -174,11 +179,8 @@ def load_models():
             if datasets['exercises'] is not None:
                 workout_classifier.exercises_db = datasets['exercises']
             print("✓ Fallback workout classifier loaded from file")
-        elif datasets['progress'] is not None and datasets['exercises'] is not None:
-            workout_classifier.train(datasets['progress'], datasets['exercises'])
-            print("✓ Fallback workout classifier trained")
         else:
-            print("⚠ Workout classifier will use fallback")
+            print(f"⚠ {classifier_path} not found (run train_models.py), workout classifier will use fallback")
     except Exception as e:
         print(f"⚠ Error loading workout generator: {e}")
         import traceback
@@ -188,11 +190,6 @@ def load_models():
     
     # Load progress forecast model
     try:
-        original_dir = os.getcwd()
-        os.chdir(base_dir)
-        datasets = load_datasets(base_path='.')
-        os.chdir(original_dir)
-        
         progress_model = ProgressForecastModel()
         # Try to load pre-trained model first
         forecast_path = os.path.join(models_dir, 'progress_forecast.joblib')
@@ -201,16 +198,58 @@ def load_models():
             progress_model.model = data.get('model')
             progress_model.results = data.get('results', {})
             print("✓ Progress forecast model loaded from file")
-        elif datasets['progress'] is not None:
-            progress_model.train(datasets['progress'])
-            print("✓ Progress forecast model trained")
         else:
-            print("⚠ Progress forecast model will use fallback")
+            print(f"⚠ {forecast_path} not found (run train_models.py), progress forecast will use fallback")
     except Exception as e:
         print(f"⚠ Error loading progress forecast model: {e}")
         import traceback
         traceback.print_exc()
         progress_model = ProgressForecastModel()  # Initialize empty
+    
+    # Strength standards: lift percentiles from powerlifting_dataset.csv, or from a
+    # larger export (e.g. OpenPowerlifting) given by STRENGTH_STANDARDS_CSV
+    try:
+        standards_path = os.environ.get('STRENGTH_STANDARDS_CSV') or os.path.join(base_dir, 'powerlifting_dataset.csv')
+        if os.path.exists(standards_path):
+            strength_standards = StrengthStandards.from_csv(standards_path)
+            print(f"✓ Strength standards built ({len(strength_standards)} lift groups)")
+        else:
+            print(f"⚠ {standards_path} not found, strength percentiles unavailable")
+    except Exception as e:
+        print(f"⚠ Error building strength standards: {e}")
+        import traceback
+        traceback.print_exc()
+        strength_standards = None
+    
+    # Lift quality classifier over raw IMU windows (dataset7.csv)
+    try:
+        lift_quality_path = os.path.join(models_dir, 'lift_quality_model.joblib')
+        lift_quality_model = LiftQualityClassifier()
+        if os.path.exists(lift_quality_path):
+            lift_quality_model.load(lift_quality_path)
+        else:
+            print(f"⚠ {lift_quality_path} not found (run train_models.py), lift quality classifier unavailable")
+            lift_quality_model = None
+    except Exception as e:
+        print(f"⚠ Error loading lift quality classifier: {e}")
+        import traceback
+        traceback.print_exc()
+        lift_quality_model = None
+    
+    # Height / weight / BMI percentiles by gender (dataset1.csv, dataset4.csv)
+    try:
+        population_path = os.path.join(models_dir, 'population_percentiles.joblib')
+        population_percentiles = PopulationPercentiles()
+        if os.path.exists(population_path):
+            population_percentiles.load(population_path)
+        else:
+            print(f"⚠ {population_path} not found (run train_models.py), body percentiles unavailable")
+            population_percentiles = None
+    except Exception as e:
+        print(f"⚠ Error loading population percentiles: {e}")
+        import traceback
+        traceback.print_exc()
+        population_percentiles = None
 
 @app.route('/', methods=['GET'])
 def home():
@@ -228,7 +267,8 @@ def get_nutritional_targets():
     try:
         data = request.json
         age = int(data.get('age', 25))
-        weight_kg = float(data.get('weight', 70))
+        # The profile form sends weight in pounds (getNutritionalTargets in src/services/api.js)
+        weight_kg = float(data.get('weight', 154)) * POUND_KG
         height_feet = int(data.get('heightFeet', 5))
         height_inches = int(data.get('heightInches', 10))
         activity_level = data.get('activityLevel', 'Moderate')
@@ -258,6 +298,10 @@ def get_nutritional_targets():
                 'fats': max(30, int(calories * 0.35 / 9))
             }
         
+        if population_percentiles is not None:
+            result = dict(result)
+            result['percentiles'] = population_percentiles.percentile(gender, height_cm, weight_kg)
+        
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
@@ -270,18 +314,48 @@ def get_meal_recommendations():
         calorie_goal = int(data.get('calorieGoal', 2000))
         dietary_preferences = data.get('dietaryPreferences', 'Omnivore')
         num_meals = int(data.get('numMeals', 3))
+        # Hard filters: ingredient names and allergies (e.g. Peanuts, Gluten)
+        exclude_ingredients = data.get('excludeIngredients') or []
+        allergies = data.get('allergies') or []
+        if isinstance(exclude_ingredients, str):
+            exclude_ingredients = [exclude_ingredients]
         
         # USE ML MEAL RECOMMENDER ONLY - NO FALLBACKS
-        if not meal_recommender_ml or not hasattr(meal_recommender_ml, 'meals_df') or meal_recommender_ml.meals_df is None or len(meal_recommender_ml.meals_df) == 0:
+        # Read the model and its snapshot once; reloads publish a new snapshot
+        recommender = meal_recommender_ml
+        snapshot = recommender.snapshot if recommender is not None else None
+        if snapshot is None and (recommender is None or recommender.store is None):
             print("✗ ERROR: ML meal recommender not available!")
             return jsonify({'error': 'ML meal recommender not available. Please ensure model is trained and loaded.'}), 500
         
+        # On-grid requests without hard filters are served from the precomputed table
+        table = recommendation_table
+        if table is not None and not exclude_ingredients and not allergies:
+            payload = table.get(calorie_goal, dietary_preferences, num_meals)
+            if payload == b'[]':
+                return jsonify({'error': 'No meals found matching your dietary preferences.'}), 404
+            if payload is not None:
+                return app.response_class(payload, mimetype='application/json')
+        
         try:
-            meals = meal_recommender_ml.recommend_meals(
-                calorie_goal,
-                dietary_preferences,
-                num_meals=num_meals
-            )
+            shards = meal_shards
+            if shards is not None:
+                meals = shards.recommend_meals(
+                    calorie_goal,
+                    dietary_preferences,
+                    num_meals=num_meals,
+                    exclude_ingredients=exclude_ingredients,
+                    allergies=allergies
+                )
+            else:
+                meals = recommender.recommend_meals(
+                    calorie_goal,
+                    dietary_preferences,
+                    num_meals=num_meals,
+                    exclude_ingredients=exclude_ingredients,
+                    allergies=allergies,
+                    snapshot=snapshot
+                )
             if meals and len(meals) > 0:
                 print(f"✓ ML meal recommender returned {len(meals)} meals from dataset")
                 return jsonify(meals)
@@ -298,34 +372,183 @@ def get_meal_recommendations():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/meal-plan', methods=['POST'])
+def get_meal_plan():
+    """Get a multi-day meal plan that hits the daily macro targets"""
+    try:
+        data = request.json
+        calorie_goal = int(data.get('calorieGoal', 2000))
+        dietary_preferences = data.get('dietaryPreferences', 'Omnivore')
+        num_meals = int(data.get('numMeals', 3))
+        days = int(data.get('days', 7))
+        if calorie_goal <= 0 or not 1 <= num_meals <= 6 or not 1 <= days <= 28:
+            return jsonify({'error': 'calorieGoal must be positive, numMeals 1-6 and days 1-28'}), 400
+        
+        # Macro targets default to the same split as /api/nutritional-targets
+        protein = float(data.get('protein', max(50, int(calorie_goal * 0.15 / 4))))
+        carbs = float(data.get('carbs', max(100, int(calorie_goal * 0.50 / 4))))
+        fats = float(data.get('fats', max(30, int(calorie_goal * 0.35 / 9))))
+        exclude_ingredients = data.get('excludeIngredients') or []
+        allergies = data.get('allergies') or []
+        if isinstance(exclude_ingredients, str):
+            exclude_ingredients = [exclude_ingredients]
+        
+        if not meal_plan_optimizer:
+            return _meal_catalog_error('Meal planner')
+        
+        plan = meal_plan_optimizer.plan(calorie_goal, protein, carbs, fats, dietary_preferences,
+                                        num_meals=num_meals, days=days,
+                                        exclude_ingredients=exclude_ingredients, allergies=allergies)
+        if not plan:
+            return jsonify({'error': 'No meals found matching your dietary preferences.'}), 404
+        return jsonify(plan)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+def _meal_catalog_error(feature):
+    """Error response for a meal endpoint that needs the in-memory catalog"""
+    recommender = meal_recommender_ml
+    if recommender is not None and recommender.store is not None:
+        return jsonify({'error': f'{request.path} is not supported with MEAL_CATALOG_BACKEND=sqlite '
+                                 '(it needs the in-memory meal catalog)'}), 501
+    return jsonify({'error': f'{feature} not available. Please ensure the meal model is trained and loaded.'}), 500
+
+def _list_arg(value):
+    """Query-string list: repeated parameters or one comma-separated value"""
+    if isinstance(value, list):
+        if len(value) == 1:
+            value = value[0]
+        else:
+            return [v for v in value if v]
+    if not value:
+        return []
+    return [v.strip() for v in str(value).split(',') if v.strip()]
+
+@app.route('/api/meals/search', methods=['GET'])
+def search_meals():
+    """Search meal names (autocomplete): prefix matches first, then word and infix matches"""
+    try:
+        query = request.args.get('q', '').strip()
+        limit = int(request.args.get('limit', 10))
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        if not 1 <= limit <= 50:
+            return jsonify({'error': 'limit must be between 1 and 50'}), 400
+        dietary_preferences = _list_arg(request.args.getlist('dietaryPreferences')) or None
+        
+        recommender = meal_recommender_ml
+        snapshot = recommender.snapshot if recommender is not None else None
+        if snapshot is None:
+            return _meal_catalog_error('Meal search')
+        
+        results = recommender.search_meals(query, limit=limit, dietary_preferences=dietary_preferences,
+                                           snapshot=snapshot)
+        return jsonify({'query': query, 'results': results})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/meals/<int:meal_id>/alternatives', methods=['GET'])
+def get_meal_alternatives(meal_id):
+    """Get the closest alternatives to one meal (meal ids are fdc_id)"""
+    try:
+        k = int(request.args.get('k', 5))
+        if not 1 <= k <= 50:
+            return jsonify({'error': 'k must be between 1 and 50'}), 400
+        dietary_preferences = _list_arg(request.args.getlist('dietaryPreferences')) or None
+        exclude_ingredients = _list_arg(request.args.getlist('excludeIngredients'))
+        allergies = _list_arg(request.args.getlist('allergies'))
+        calories = request.args.get('calories', type=float)
+        # 'nutrition' (macro profile) or 'ingredients' (recipe embeddings)
+        by = request.args.get('by', 'nutrition')
+        if by not in ('nutrition', 'ingredients'):
+            return jsonify({'error': "by must be 'nutrition' or 'ingredients'"}), 400
+        
+        recommender = meal_recommender_ml
+        snapshot = recommender.snapshot if recommender is not None else None
+        if snapshot is None:
+            return _meal_catalog_error('Meal alternatives')
+        
+        alternatives = recommender.alternatives(meal_id, k=k, dietary_preferences=dietary_preferences,
+                                                exclude_ingredients=exclude_ingredients, allergies=allergies,
+                                                calories=calories, by=by, snapshot=snapshot)
+        if alternatives is None:
+            return jsonify({'error': f'Meal {meal_id} not found'}), 404
+        return jsonify({'mealId': meal_id, 'alternatives': alternatives})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+def _name_list(value):
+    """List of names from a JSON list or a comma-separated string (None if empty)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    names = [str(name).strip() for name in value if str(name).strip()]
+    return names or None
+
+# Training days per week for each activity level
+ACTIVITY_DAYS = {
+    'Sedentary': 3,
+    'Light': 4,
+    'Moderate': 5,
+    'Active': 5,
+    'Very Active': 6
+}
+# Largest batch accepted by /api/workout-plan/batch
+MAX_WORKOUT_BATCH = 5000
+
+def _workout_request(data):
+    """generate_workout_plan arguments from a workout-plan request body"""
+    if not isinstance(data, dict):
+        raise ValueError('request must be an object')
+    activity_level = data.get('activityLevel', 'Moderate')
+    # Optional exercise filters, e.g. {"equipment": ["Dumbbell", "Body Weight"], "maxDifficulty": 3}
+    max_difficulty = data.get('maxDifficulty')
+    if max_difficulty is not None:
+        try:
+            max_difficulty = int(max_difficulty)
+        except (TypeError, ValueError):
+            raise ValueError('maxDifficulty must be an integer from 1 to 5')
+        if not 1 <= max_difficulty <= 5:
+            raise ValueError('maxDifficulty must be an integer from 1 to 5')
+    seed = data.get('seed')
+    if seed is not None:
+        if isinstance(seed, bool) or not isinstance(seed, int) or not 0 <= seed < 2 ** 63:
+            raise ValueError('seed must be a non-negative 64-bit integer')
+    return {
+        'goal': data.get('fitnessGoal', 'General Fitness'),
+        'activity_level': activity_level,
+        'experience_level': data.get('experienceLevel', 'Moderate'),
+        'days_per_week': ACTIVITY_DAYS.get(activity_level, 5),
+        'seed': seed,
+        'equipment': _name_list(data.get('equipment')),
+        'exclude_equipment': _name_list(data.get('excludeEquipment')),
+        'max_difficulty': max_difficulty
+    }
+
 @app.route('/api/workout-plan', methods=['POST'])
 def get_workout_plan():
     """Get workout plan based on fitness goal and activity level using ML"""
     try:
         data = request.json
-        goal = data.get('fitnessGoal', 'General Fitness')
-        activity_level = data.get('activityLevel', 'Moderate')
-        experience_level = data.get('experienceLevel', 'Moderate')
-        
-        # Determine days per week based on activity level
-        activity_to_days = {
-            'Sedentary': 3,
-            'Light': 4,
-            'Moderate': 5,
-            'Active': 5,
-            'Very Active': 6
-        }
-        days_per_week = activity_to_days.get(activity_level, 5)
+        try:
+            workout_request = _workout_request(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        goal = workout_request['goal']
+        activity_level = workout_request['activity_level']
+        experience_level = workout_request['experience_level']
         
         # Try ML workout generator first (preferred)
         if workout_generator_ml and workout_generator_ml.exercises_df is not None:
             try:
-                plan = workout_generator_ml.generate_workout_plan(
-                    goal,
-                    activity_level,
-                    experience_level,
-                    days_per_week
-                )
+                plan = workout_generator_ml.generate_workout_plan(**workout_request)
                 if plan and len(plan) > 0:
                     return jsonify(plan)
             except Exception as e:
@@ -373,6 +596,115 @@ def get_workout_plan():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/workout-plan/batch', methods=['POST'])
+def get_workout_plans_batch():
+    """Workout plans for many clients in one request; invalid entries get an error entry
+    
+    Body: {"requests": [<workout-plan request>, ...]}. Pass a seed per request
+    for plans that are the same on every call.
+    """
+    try:
+        generator = workout_generator_ml
+        if generator is None or generator.exercises_df is None:
+            return jsonify({'error': 'ML workout generator not available. Please ensure model is trained and loaded.'}), 500
+        entries = (request.json or {}).get('requests')
+        if not isinstance(entries, list):
+            return jsonify({'error': 'requests must be a list'}), 400
+        if len(entries) > MAX_WORKOUT_BATCH:
+            return jsonify({'error': f'At most {MAX_WORKOUT_BATCH} requests per batch'}), 400
+        
+        workout_requests, errors = [], {}
+        for i, entry in enumerate(entries):
+            try:
+                workout_requests.append(_workout_request(entry))
+            except ValueError as e:
+                errors[i] = f'Invalid workout request: {e}'
+                workout_requests.append(None)
+        plans = iter(generator.generate_workout_plans_batch([r for r in workout_requests if r is not None]))
+        results = [{'error': errors[i]} if r is None else {'plan': next(plans)} for i, r in enumerate(workout_requests)]
+        return jsonify({'results': results})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/workout-program', methods=['POST'])
+def get_workout_program():
+    """Periodized multi-week program (4-16 weeks) with progressive overload, deloads and exercise rotation
+    
+    Body: a workout-plan request plus "weeks" (default 8).
+    """
+    try:
+        data = request.json
+        try:
+            workout_request = _workout_request(data)
+            weeks = data.get('weeks', 8)
+            if isinstance(weeks, bool) or not isinstance(weeks, int) or not MIN_WEEKS <= weeks <= MAX_WEEKS:
+                raise ValueError(f'weeks must be an integer from {MIN_WEEKS} to {MAX_WEEKS}')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        generator = workout_generator_ml
+        if generator is None or generator.exercises_df is None:
+            return jsonify({'error': 'ML workout generator not available. Please ensure model is trained and loaded.'}), 500
+        
+        return jsonify(generator.generate_program(weeks=weeks, **workout_request))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/exercises/search', methods=['GET'])
+def search_exercises():
+    """Full-text exercise and stretch search, e.g. ?q=no bench shoulder (BM25 ranking)"""
+    try:
+        query = request.args.get('q', '').strip()
+        limit = int(request.args.get('limit', 10))
+        # 'exercise' or 'stretch' (both when omitted)
+        kind = request.args.get('type') or None
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        if not 1 <= limit <= 50:
+            return jsonify({'error': 'limit must be between 1 and 50'}), 400
+        if kind not in (None, 'exercise', 'stretch'):
+            return jsonify({'error': "type must be 'exercise' or 'stretch'"}), 400
+
+        generator = workout_generator_ml
+        if generator is None or generator.search_index is None:
+            return jsonify({'error': 'ML workout generator not available. Please ensure model is trained and loaded.'}), 500
+
+        return jsonify({'query': query, 'results': generator.search_exercises(query, limit=limit, kind=kind)})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/exercises/<path:name>/substitutes', methods=['GET'])
+def get_exercise_substitutes(name):
+    """Get the exercises working the most similar muscles, optionally for one equipment or dataset row"""
+    try:
+        limit = int(request.args.get('limit', 5))
+        if not 1 <= limit <= 20:
+            return jsonify({'error': 'limit must be between 1 and 20'}), 400
+        equipment = request.args.get('equipment', '').strip() or None
+        # A dataset row picks one equipment version of the name
+        row = request.args.get('row')
+        row = int(row) if row not in (None, '') else None
+
+        generator = workout_generator_ml
+        substitutes = generator.substitutes if generator is not None else None
+        if substitutes is None:
+            return jsonify({'error': 'ML workout generator not available. Please ensure model is trained and loaded.'}), 500
+
+        results = substitutes.substitutes(name, equipment=equipment, limit=limit, row=row)
+        if results is None:
+            return jsonify({'error': f'Exercise {name} not found'}), 404
+        return jsonify({'exercise': name, 'equipment': equipment, 'substitutes': results})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
 @app.route('/api/progress-forecast', methods=['POST'])
 def get_progress_forecast():
     """Get 12-week progress forecast"""
@@ -506,6 +838,188 @@ def get_progress_forecast():
         traceback.print_exc()
         return jsonify({'error': str(e)}), 400
 
+# Largest batch accepted by /api/strength-percentile/batch
+MAX_STRENGTH_BATCH = 10000
+
+def _strength_item(data):
+    """Validated percentile query from a request body (raises ValueError)"""
+    if not isinstance(data, dict):
+        raise ValueError('Each lift must be an object')
+    if not data.get('lift'):
+        raise ValueError('lift is required')
+    if data.get('amount') is None:
+        raise ValueError('amount is required')
+    amount = float(data['amount'])
+    if amount <= 0:
+        raise ValueError('amount must be positive')
+    bodyweight = data.get('bodyweight')
+    return {
+        'lift': str(data['lift']),
+        'amount': amount,
+        'weightClass': data.get('weightClass'),
+        'bodyweight': float(bodyweight) if bodyweight is not None else None,
+        'age': float(data['age']) if data.get('age') is not None else None
+    }
+
+@app.route('/api/strength-percentile', methods=['POST'])
+def get_strength_percentile():
+    """Percentile of a lift among lifters of the same weight class and age band"""
+    try:
+        standards = strength_standards
+        if standards is None:
+            return jsonify({'error': 'Strength standards not available.'}), 500
+        try:
+            item = _strength_item(request.json)
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid lift: {e}'}), 400
+        
+        result = standards.percentiles([item])[0]
+        if result is None:
+            return jsonify({'error': f"Unknown lift '{item['lift']}' (use Squat, Bench Press or Deadlift)"}), 404
+        return jsonify(result)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/strength-percentile/batch', methods=['POST'])
+def get_strength_percentiles():
+    """Percentiles for many lifts in one request; invalid lifts get an error entry"""
+    try:
+        standards = strength_standards
+        if standards is None:
+            return jsonify({'error': 'Strength standards not available.'}), 500
+        lifts = (request.json or {}).get('lifts')
+        if not isinstance(lifts, list):
+            return jsonify({'error': 'lifts must be a list'}), 400
+        if len(lifts) > MAX_STRENGTH_BATCH:
+            return jsonify({'error': f'At most {MAX_STRENGTH_BATCH} lifts per request'}), 400
+        
+        items, errors = [], {}
+        for i, lift in enumerate(lifts):
+            try:
+                items.append(_strength_item(lift))
+            except (KeyError, TypeError, ValueError) as e:
+                errors[i] = f'Invalid lift: {e}'
+                items.append(None)
+        valid = [item for item in items if item is not None]
+        answers = iter(standards.percentiles(valid))
+        results = []
+        for i, item in enumerate(items):
+            if item is None:
+                results.append({'error': errors[i]})
+                continue
+            result = next(answers)
+            results.append(result if result is not None else {'error': f"Unknown lift '{item['lift']}'"})
+        return jsonify({'results': results})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+# Largest batch accepted by /api/body-percentiles/batch
+MAX_BODY_BATCH = 10000
+
+def _body_item(data):
+    """Validated percentile query: height in cm (or heightFeet/heightInches), weight in kg"""
+    if not isinstance(data, dict):
+        raise ValueError('Each person must be an object')
+    height = data.get('height')
+    if height is None and data.get('heightFeet') is not None:
+        height = (float(data['heightFeet']) * 12 + float(data.get('heightInches') or 0)) * 2.54
+    height = float(height) if height is not None else None
+    weight = float(data['weight']) if data.get('weight') is not None else None
+    if height is None and weight is None:
+        raise ValueError('height or weight is required')
+    if (height is not None and height <= 0) or (weight is not None and weight <= 0):
+        raise ValueError('height and weight must be positive')
+    return {'gender': data.get('gender'), 'height': height, 'weight': weight}
+
+@app.route('/api/body-percentiles', methods=['POST'])
+def get_body_percentiles():
+    """Height, weight and BMI percentiles of a user among people of the same gender"""
+    try:
+        population = population_percentiles
+        if population is None:
+            return jsonify({'error': 'Population percentiles not available.'}), 500
+        try:
+            item = _body_item(request.json)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid body measurements: {e}'}), 400
+        return jsonify(population.percentiles([item])[0])
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/body-percentiles/batch', methods=['POST'])
+def get_body_percentiles_batch():
+    """Percentiles for many people in one request; invalid entries get an error entry"""
+    try:
+        population = population_percentiles
+        if population is None:
+            return jsonify({'error': 'Population percentiles not available.'}), 500
+        people = (request.json or {}).get('people')
+        if not isinstance(people, list):
+            return jsonify({'error': 'people must be a list'}), 400
+        if len(people) > MAX_BODY_BATCH:
+            return jsonify({'error': f'At most {MAX_BODY_BATCH} people per request'}), 400
+        
+        items, errors = [], {}
+        for i, person in enumerate(people):
+            try:
+                items.append(_body_item(person))
+            except (TypeError, ValueError) as e:
+                errors[i] = f'Invalid body measurements: {e}'
+                items.append(None)
+        answers = iter(population.percentiles([item for item in items if item is not None]))
+        results = [{'error': errors[i]} if item is None else next(answers) for i, item in enumerate(items)]
+        return jsonify({'results': results})
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
+# Largest sensor batch accepted by /api/lift-quality (~90 s at 45 Hz)
+MAX_SENSOR_SAMPLES = 4096
+
+def _sensor_samples(samples):
+    """(n, channels) float32 array from rows of values in SENSOR_CHANNELS order or dicts by channel name"""
+    if not isinstance(samples, list) or not samples:
+        raise ValueError('samples must be a non-empty list')
+    if isinstance(samples[0], dict):
+        samples = [[row.get(channel, 0) for channel in SENSOR_CHANNELS] for row in samples]
+    array = np.asarray(samples, dtype=np.float32)
+    if array.ndim != 2 or array.shape[1] != len(SENSOR_CHANNELS):
+        raise ValueError(f'each sample needs {len(SENSOR_CHANNELS)} channel values')
+    if not np.isfinite(array).all():
+        raise ValueError('sample values must be finite numbers')
+    return array
+
+@app.route('/api/lift-quality', methods=['POST'])
+def get_lift_quality():
+    """Classify dumbbell curl execution from a batch of raw belt/arm/dumbbell/forearm sensor samples"""
+    try:
+        model = lift_quality_model
+        if model is None:
+            return jsonify({'error': 'Lift quality model not available.'}), 500
+        samples = (request.json or {}).get('samples')
+        if isinstance(samples, list) and len(samples) > MAX_SENSOR_SAMPLES:
+            return jsonify({'error': f'At most {MAX_SENSOR_SAMPLES} samples per request'}), 400
+        try:
+            array = _sensor_samples(samples)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid samples: {e}'}), 400
+        
+        result = model.predict(array)
+        if result is None:
+            return jsonify({'error': f'At least {WINDOW} samples are needed'}), 400
+        return jsonify(result)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 400
+
 if __name__ == '__main__':
     print("=" * 60)
     print("BIOBOARD API SERVER")
@@ -519,8 +1033,20 @@ if __name__ == '__main__':
     print("  GET  /api/health")
     print("  POST /api/nutritional-targets")
     print("  POST /api/meal-recommendations")
+    print("  POST /api/meal-plan")
+    print("  GET  /api/meals/search")
+    print("  GET  /api/meals/<id>/alternatives")
     print("  POST /api/workout-plan")
+    print("  POST /api/workout-plan/batch")
+    print("  POST /api/workout-program")
+    print("  GET  /api/exercises/search")
+    print("  GET  /api/exercises/<name>/substitutes")
     print("  POST /api/progress-forecast")
+    print("  POST /api/strength-percentile")
+    print("  POST /api/strength-percentile/batch")
+    print("  POST /api/body-percentiles")
+    print("  POST /api/body-percentiles/batch")
+    print("  POST /api/lift-quality")
     print("=" * 60)
     print("")
     try:
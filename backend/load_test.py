@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Synthetic load generator and soak test for the BioBoard API
+
+Starts app.py on a local port (or targets --url), replays user sessions whose
+profiles are sampled from dataset6.csv demographics and the form values the
+frontend sends, and reports latency percentiles, error rates and server RSS.
+
+Examples:
+    python3 load_test.py --requests 2000 --concurrency 8
+    python3 load_test.py --soak --duration 1800 --concurrency 4
+    python3 load_test.py --url http://localhost:5001 --pid 12345
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from models.population_percentiles import POUND_KG
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BACKEND_DIR)
+
+# Values the frontend form sends (see src/components/LandingPage.jsx and src/services/api.js)
+ACTIVITY_LEVELS = ['Sedentary', 'Light', 'Moderate', 'Active', 'Very Active']
+FITNESS_GOALS = ['Weight Loss', 'Muscle Gain', 'Endurance', 'General Fitness']
+DIETARY_PREFERENCES = ['Omnivore', 'Vegetarian', 'Vegan', 'Keto', 'Paleo', 'Mediterranean']
+EXPERIENCE_LEVELS = ['Beginner', 'Moderate', 'Advanced']
+MEALS_PER_DAY = [2, 3, 4, 5, 6]
+
+ENDPOINTS = ['/api/nutritional-targets', '/api/meal-recommendations', '/api/workout-plan', '/api/progress-forecast']
+
+class ProfileSampler:
+    """Samples user profiles from dataset6.csv demographics"""
+
+    def __init__(self, dietary_df, seed=None):
+        self.df = dietary_df[['Age', 'Gender', 'Weight_kg', 'Height_cm', 'BMI',
+                              'Physical_Activity_Level', 'Diet_Recommendation',
+                              'Daily_Caloric_Intake']].dropna().reset_index(drop=True)
+        self.rng = random.Random(seed)
+
+    def sample(self):
+        row = self.df.iloc[self.rng.randrange(len(self.df))]
+        total_inches = row['Height_cm'] / 2.54
+
+        # Overweight users mostly pick weight loss, lean users muscle gain
+        if row['BMI'] >= 25:
+            goal_weights = [0.6, 0.1, 0.1, 0.2]
+        elif row['BMI'] < 18.5:
+            goal_weights = [0.05, 0.6, 0.1, 0.25]
+        else:
+            goal_weights = [0.2, 0.3, 0.2, 0.3]
+
+        if row['Diet_Recommendation'] == 'Low_Carb' and self.rng.random() < 0.5:
+            diet = 'Keto'
+        else:
+            diet = self.rng.choices(DIETARY_PREFERENCES, weights=[0.5, 0.15, 0.1, 0.1, 0.05, 0.1])[0]
+
+        # dataset6 only has Sedentary/Moderate/Active; spread some users to the outer levels
+        activity = row['Physical_Activity_Level']
+        if activity == 'Sedentary' and self.rng.random() < 0.3:
+            activity = 'Light'
+        elif activity == 'Active' and self.rng.random() < 0.3:
+            activity = 'Very Active'
+
+        return {
+            'age': int(row['Age']),
+            'gender': row['Gender'],
+            # Pounds, as the profile form sends it
+            'weight': round(float(row['Weight_kg']) / POUND_KG, 1),
+            'heightFeet': int(total_inches // 12),
+            'heightInches': int(total_inches % 12),
+            'activityLevel': activity,
+            'fitnessGoal': self.rng.choices(FITNESS_GOALS, weights=goal_weights)[0],
+            'dietaryPreferences': diet,
+            'mealsPerDay': self.rng.choice(MEALS_PER_DAY),
+            'experienceLevel': self.rng.choice(EXPERIENCE_LEVELS),
+            'calorieGoal': int(row['Daily_Caloric_Intake'])
+        }
+
+class Stats:
+    """Thread-safe latency and error counters per endpoint"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        self.errors = {endpoint: 0 for endpoint in ENDPOINTS}
+        self.rss_samples = []  # (seconds since start, MB)
+
+    def record(self, endpoint, latency_ms, ok):
+        with self.lock:
+            self.latencies[endpoint].append(latency_ms)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def total_requests(self):
+        with self.lock:
+            return sum(len(v) for v in self.latencies.values())
+
+def post_json(base_url, endpoint, payload, timeout):
+    """POST a JSON payload, returning (status, parsed body or None, latency ms)"""
+    request = urllib.request.Request(
+        base_url + endpoint,
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            body = response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        body = e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        return None, None, (time.perf_counter() - start) * 1000
+    latency_ms = (time.perf_counter() - start) * 1000
+    try:
+        return status, json.loads(body), latency_ms
+    except ValueError:
+        return status, None, latency_ms
+
+def run_session(base_url, profile, stats, timeout):
+    """One user visiting the dashboard: targets, meals, workout and forecast"""
+    status, targets, latency = post_json(base_url, '/api/nutritional-targets', profile, timeout)
+    stats.record('/api/nutritional-targets', latency, status == 200)
+    calorie_goal = targets.get('calories', profile['calorieGoal']) if status == 200 and targets else profile['calorieGoal']
+
+    status, _, latency = post_json(base_url, '/api/meal-recommendations', {
+        'calorieGoal': calorie_goal,
+        'dietaryPreferences': profile['dietaryPreferences'],
+        'numMeals': profile['mealsPerDay']
+    }, timeout)
+    stats.record('/api/meal-recommendations', latency, status == 200)
+
+    status, _, latency = post_json(base_url, '/api/workout-plan', {
+        'fitnessGoal': profile['fitnessGoal'],
+        'activityLevel': profile['activityLevel'],
+        'experienceLevel': profile['experienceLevel']
+    }, timeout)
+    stats.record('/api/workout-plan', latency, status == 200)
+
+    status, _, latency = post_json(base_url, '/api/progress-forecast', {
+        'weight': profile['weight'],
+        'fitnessGoal': profile['fitnessGoal'],
+        'activityLevel': profile['activityLevel'],
+        'weeks': 12
+    }, timeout)
+    stats.record('/api/progress-forecast', latency, status == 200)
+
+def read_rss_mb(pid):
+    """Resident set size of a process in MB (Linux /proc), or None"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+def start_server(port):
+    """Start app.py (without the debug reloader) and wait until it answers"""
+    code = (
+        "import app; app.load_models(); "
+        f"app.app.run(port={port}, host='127.0.0.1', threaded=True, debug=False)"
+    )
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=BACKEND_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + '/api/health', timeout=1):
+                return process, base_url
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Server did not become ready within 60 seconds")
+
+def rss_slope_mb_per_min(samples, warmup_fraction):
+    """Least-squares RSS growth after the warm-up period, in MB per minute"""
+    if len(samples) < 3:
+        return 0.0
+    cutoff = samples[-1][0] * warmup_fraction
+    steady = [(t, mb) for t, mb in samples if t >= cutoff]
+    if len(steady) < 3:
+        return 0.0
+    t, mb = np.array(steady).T
+    return float(np.polyfit(t / 60.0, mb, 1)[0])
+
+def print_report(stats, elapsed, args):
+    print()
+    print("=" * 72)
+    print("LOAD TEST RESULTS")
+    print("=" * 72)
+    total = stats.total_requests()
+    total_errors = sum(stats.errors.values())
+    print(f"Duration: {elapsed:.1f}s, Requests: {total}, Throughput: {total / max(elapsed, 1e-9):.1f} req/s")
+    print()
+    print(f"{'Endpoint':<28}{'count':>7}{'err %':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for endpoint in ENDPOINTS:
+        latencies = np.array(stats.latencies[endpoint])
+        if len(latencies) == 0:
+            continue
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        error_pct = stats.errors[endpoint] / len(latencies) * 100
+        print(f"{endpoint:<28}{len(latencies):>7}{error_pct:>8.2f}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}{latencies.max():>9.1f}")
+    error_rate = total_errors / total * 100 if total else 0.0
+    print(f"Overall error rate: {error_rate:.2f}%")
+
+    leak = False
+    if stats.rss_samples:
+        rss = [mb for _, mb in stats.rss_samples]
+        slope = rss_slope_mb_per_min(stats.rss_samples, args.warmup)
+        print()
+        print(f"Server RSS: start {rss[0]:.1f} MB, end {rss[-1]:.1f} MB, peak {max(rss):.1f} MB")
+        print(f"RSS growth after warm-up: {slope:+.2f} MB/min")
+        print("RSS over time:")
+        step = max(1, len(stats.rss_samples) // 10)
+        for t, mb in stats.rss_samples[::step]:
+            print(f"  {t:>8.1f}s  {mb:>8.1f} MB")
+        if args.soak:
+            projected = slope * 60
+            leak = projected > args.leak_threshold
+            print(f"Projected growth per hour: {projected:+.1f} MB (threshold {args.leak_threshold:.1f} MB)")
+            print("⚠ Possible memory leak detected" if leak else "✓ No memory growth beyond threshold")
+    print("=" * 72)
+    return error_rate, leak
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Synthetic load generator for the BioBoard API')
+    parser.add_argument('--url', help='target an already running server instead of starting app.py')
+    parser.add_argument('--pid', type=int, help='server PID to sample RSS from when using --url')
+    parser.add_argument('--port', type=int, default=5051, help='port for the locally started server')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent virtual users')
+    parser.add_argument('--requests', type=int, default=400, help='total requests (ignored with --duration)')
+    parser.add_argument('--duration', type=float, help='run for this many seconds instead of a request count')
+    parser.add_argument('--soak', action='store_true', help='soak mode: long run with memory leak detection')
+    parser.add_argument('--rss-interval', type=float, default=1.0, help='seconds between RSS samples')
+    parser.add_argument('--warmup', type=float, default=0.2, help='fraction of the run ignored for RSS growth')
+    parser.add_argument('--leak-threshold', type=float, default=50.0, help='soak mode: max RSS growth in MB/hour')
+    parser.add_argument('--max-error-rate', type=float, default=1.0, help='fail if error rate (%%) exceeds this')
+    parser.add_argument('--timeout', type=float, default=30.0, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=42, help='profile sampling seed')
+    args = parser.parse_args(argv)
+    if args.soak and args.duration is None:
+        args.duration = 600.0
+
+    sampler = ProfileSampler(pd.read_csv(os.path.join(BASE_DIR, 'dataset6.csv')), seed=args.seed)
+
+    process = None
+    if args.url:
+        base_url, pid = args.url.rstrip('/'), args.pid
+    else:
+        print(f"Starting app.py on port {args.port}...")
+        process, base_url = start_server(args.port)
+        pid = process.pid
+        print(f"✓ Server ready (pid {pid})")
+
+    stats = Stats()
+    stop = threading.Event()
+    sessions_left = [max(1, args.requests // len(ENDPOINTS))]
+    sessions_lock = threading.Lock()
+    start = time.perf_counter()
+
+    def worker():
+        while not stop.is_set():
+            if args.duration is not None:
+                if time.perf_counter() - start >= args.duration:
+                    return
+            else:
+                with sessions_lock:
+                    if sessions_left[0] <= 0:
+                        return
+                    sessions_left[0] -= 1
+            with sessions_lock:
+                profile = sampler.sample()
+            run_session(base_url, profile, stats, args.timeout)
+
+    def sample_rss():
+        while not stop.is_set():
+            mb = read_rss_mb(pid)
+            if mb is not None:
+                with stats.lock:
+                    stats.rss_samples.append((time.perf_counter() - start, mb))
+            stop.wait(args.rss_interval)
+
+    mode = f"soak for {args.duration:.0f}s" if args.soak else (
+        f"{args.duration:.0f}s" if args.duration else f"{sessions_left[0] * len(ENDPOINTS)} requests")
+    print(f"Running {mode} with {args.concurrency} virtual users against {base_url}")
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.concurrency)]
+    rss_thread = threading.Thread(target=sample_rss, daemon=True) if pid else None
+    try:
+        if rss_thread:
+            rss_thread.start()
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(1.0)
+            if args.duration:
+                print(f"  {time.perf_counter() - start:>6.0f}s  {stats.total_requests()} requests", end='\r')
+    except KeyboardInterrupt:
+        print("\nStopping...")
+    finally:
+        stop.set()
+        elapsed = time.perf_counter() - start
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    error_rate, leak = print_report(stats, elapsed, args)
+    if error_rate > args.max_error_rate or leak:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+import re
+import numpy as np
+
+# Attributes of dataset8.csv indexed as bitmaps: request name -> column
+BITMAP_ATTRIBUTES = {
+    'equipment': 'Equipment',
+    'mechanics': 'Mechanics',
+    'force': 'Force',
+    'utility': 'Utility'
+}
+DIFFICULTY_COLUMN = 'Difficulty (1-5)'
+MAX_DIFFICULTY = 5
+# Spellings users send for equipment values of the dataset
+EQUIPMENT_ALIASES = {
+    'bodyweight': 'body weight',
+    'none': 'body weight',
+    'machine': 'lever',
+    'band': 'band resistive',
+    'trx': 'suspended',
+    'suspension': 'suspended'
+}
+
+_PARENTHESIS = re.compile(r'\s*\(.*')
+
+def normalize_value(value):
+    """Lowercase value without zero-width characters and repeated spaces"""
+    return ' '.join(str(value).replace('​', ' ').lower().split())
+
+def normalize_equipment(value):
+    """Canonical equipment key: 'Dumbbells' -> 'dumbbell', 'Bodyweight' -> 'body weight'"""
+    value = normalize_value(value)
+    value = EQUIPMENT_ALIASES.get(value, value)
+    if value.endswith('s') and not value.endswith('ss'):
+        value = value[:-1]
+    return EQUIPMENT_ALIASES.get(value, value)
+
+def _equipment_keys(value):
+    """Index keys of a dataset equipment value: the value and its family
+    ('Lever (selectorized)' is also 'lever', 'Cable  Standing Fly' also 'cable')"""
+    family = _PARENTHESIS.sub('', str(value)).strip()
+    family = re.split(r'\s{2,}', family)[0]
+    return {normalize_equipment(key) for key in (value, family) if key}
+
+class ExerciseBitmapIndex:
+    """Packed bitmaps of the exercises having each attribute value
+
+    Bit i of a bitmap is exercise row i. Bitmaps exist for every value of the
+    BITMAP_ATTRIBUTES columns and for every difficulty ceiling
+    (difficulty <= d), so a request's filters combine with a few bitwise
+    ANDs and ORs over len(exercises) / 8 bytes and never scan the DataFrame.
+    """
+
+    def __init__(self, exercises_df):
+        self.size = len(exercises_df)
+        self.bitmaps = {}
+        for attribute, column in BITMAP_ATTRIBUTES.items():
+            if column not in exercises_df.columns:
+                continue
+            members = {}
+            for row, value in enumerate(exercises_df[column].fillna('')):
+                keys = _equipment_keys(value) if attribute == 'equipment' else {normalize_value(value)}
+                for key in keys:
+                    members.setdefault(key, []).append(row)
+            for key, rows in members.items():
+                self.bitmaps[attribute, key] = self._pack(rows)
+
+        difficulty = np.full(self.size, 3.0)
+        if DIFFICULTY_COLUMN in exercises_df.columns:
+            difficulty = exercises_df[DIFFICULTY_COLUMN].to_numpy(dtype=np.float64)
+        for ceiling in range(1, MAX_DIFFICULTY + 1):
+            self.bitmaps['max_difficulty', ceiling] = self._pack(np.flatnonzero(difficulty <= ceiling))
+        self.everything = self._pack(np.arange(self.size))
+
+    def _pack(self, rows):
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def values(self, attribute):
+        """Indexed values of an attribute"""
+        return sorted(key for name, key in self.bitmaps if name == attribute)
+
+    def any_of(self, attribute, values):
+        """OR of the bitmaps of several values of one attribute (unknown values match nothing)"""
+        bitmap = np.zeros_like(self.everything)
+        for value in values:
+            key = normalize_equipment(value) if attribute == 'equipment' else normalize_value(value)
+            found = self.bitmaps.get((attribute, key))
+            if found is not None:
+                bitmap |= found
+        return bitmap
+
+    def select(self, equipment=None, exclude_equipment=None, max_difficulty=None,
+               mechanics=None, force=None, utility=None):
+        """Bitmap of the exercises passing every given filter
+
+        List filters allow any of their values (OR); different filters must
+        all hold (AND). exclude_equipment removes exercises using any of its
+        values.
+        """
+        bitmap = self.everything.copy()
+        for attribute, values in [('equipment', equipment), ('mechanics', mechanics),
+                                  ('force', force), ('utility', utility)]:
+            if values:
+                bitmap &= self.any_of(attribute, values)
+        if exclude_equipment:
+            bitmap &= ~self.any_of('equipment', exclude_equipment)
+        if max_difficulty is not None:
+            ceiling = int(min(MAX_DIFFICULTY, max(1, max_difficulty)))
+            bitmap &= self.bitmaps['max_difficulty', ceiling]
+        return bitmap
+
+    def mask(self, bitmap):
+        """Boolean row mask of a bitmap"""
+        return np.unpackbits(bitmap, count=self.size).astype(bool)
+
+    def count(self, bitmap):
+        return int(np.unpackbits(bitmap, count=self.size).sum())
@@ -0,0 +1,154 @@
+import re
+import numpy as np
+
+from models.meal_search import _csr
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Term-frequency weight of each indexed column (a word of the name counts three times)
+FIELD_WEIGHTS = {
+    'Exercise Name': 3.0,
+    'Main_muscle': 2.0,
+    'Target_Muscles': 1.0,
+    'Equipment': 1.0,
+    'Preparation': 1.0,
+    'Execution': 1.0
+}
+# Query words excluding the word that follows them ("no bench" drops exercises mentioning a bench)
+NEGATIONS = {'no', 'not', 'without'}
+STOPWORDS = {'a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'into', 'is', 'of', 'on', 'or',
+             'the', 'then', 'to', 'until', 'with'}
+EXERCISE = 'exercise'
+STRETCH = 'stretch'
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+def stem(word):
+    """Singular form of a word: 'shoulders' -> 'shoulder', 'presses' -> 'press'"""
+    if len(word) > 4 and word.endswith('sses'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+def tokenize(text):
+    """Stemmed lowercase words of a text, stopwords dropped"""
+    return [stem(word) for word in _WORD.findall(str(text).lower())
+            if word not in STOPWORDS]
+
+def _clean_text(row, column):
+    value = row.get(column)
+    return ' '.join(value.replace('​', ' ').split()) if isinstance(value, str) else ''
+
+class ExerciseSearchIndex:
+    """BM25 full-text search over exercise and stretch names and instructions
+
+    Documents are the rows of dataset8.csv followed by the rows of the
+    stretch dataset. Each term has a posting list of documents with their
+    BM25 weight (idf times the saturated, length-normalized term frequency)
+    computed at build time, so scoring a query is one scatter-add per query
+    term and a partial sort of the scores.
+    """
+
+    def __init__(self):
+        self.documents = []
+        self.terms = {}
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.postings = np.zeros(0, dtype=np.int32)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.kinds = np.zeros(0, dtype='<U8')
+
+    @classmethod
+    def build(cls, exercises_df, stretches_df=None):
+        index = cls()
+        frames = [(EXERCISE, exercises_df)]
+        if stretches_df is not None and len(stretches_df) > 0:
+            frames.append((STRETCH, stretches_df))
+
+        term_counts = []
+        for kind, frame in frames:
+            for _, row in frame.iterrows():
+                index.documents.append({
+                    'name': _clean_text(row, 'Exercise Name'),
+                    'type': kind,
+                    'equipment': _clean_text(row, 'Equipment'),
+                    'mainMuscle': _clean_text(row, 'Main_muscle')
+                })
+                counts = {}
+                for column, weight in FIELD_WEIGHTS.items():
+                    for term in tokenize(_clean_text(row, column)):
+                        counts[term] = counts.get(term, 0) + weight
+                term_counts.append(counts)
+
+        lengths = np.array([sum(counts.values()) for counts in term_counts], dtype=np.float64)
+        average_length = lengths.mean() if len(lengths) else 1.0
+        norms = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(average_length, 1e-9))
+        keys, documents, frequencies = [], [], []
+        for document, counts in enumerate(term_counts):
+            for term, frequency in counts.items():
+                keys.append(index.terms.setdefault(term, len(index.terms)))
+                documents.append(document)
+                frequencies.append(frequency)
+        keys = np.asarray(keys, dtype=np.int32)
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        document_frequency = np.bincount(keys, minlength=len(index.terms))
+        idf = np.log(1 + (len(term_counts) - document_frequency + 0.5) / (document_frequency + 0.5))
+        weights = idf[keys] * frequencies * (BM25_K1 + 1) / (frequencies + norms[documents])
+
+        index.offsets, index.postings = _csr(keys, documents, len(index.terms))
+        order = np.argsort(keys, kind='stable')
+        index.weights = weights[order].astype(np.float32)
+        index.kinds = np.array([document['type'] for document in index.documents])
+        return index
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _posting(self, term):
+        term_id = self.terms.get(term)
+        if term_id is None:
+            return None, None
+        lo, hi = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.postings[lo:hi], self.weights[lo:hi]
+
+    def parse_query(self, query):
+        """(terms, excluded terms) of a query; a negation word excludes the next word"""
+        terms, excluded = [], []
+        negate = False
+        for word in _WORD.findall(str(query).lower()):
+            if word in NEGATIONS:
+                negate = True
+                continue
+            if word in STOPWORDS:
+                continue
+            (excluded if negate else terms).append(stem(word))
+            negate = False
+        return terms, excluded
+
+    def search(self, query, limit=10, kind=None):
+        """Best matching exercises and stretches for a query, best first
+
+        kind restricts results to EXERCISE or STRETCH documents. Documents
+        containing an excluded term ("no bench") are dropped.
+        """
+        terms, excluded = self.parse_query(query)
+        if not terms or not self.documents:
+            return []
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        for term in terms:
+            postings, weights = self._posting(term)
+            if postings is not None:
+                scores[postings] += weights
+        for term in excluded:
+            postings, _ = self._posting(term)
+            if postings is not None:
+                scores[postings] = 0
+        if kind is not None:
+            scores[self.kinds != kind] = 0
+
+        matches = np.flatnonzero(scores > 0)
+        if len(matches) > limit:
+            matches = matches[np.argpartition(-scores[matches], limit - 1)[:limit]]
+        matches = matches[np.argsort(-scores[matches], kind='stable')]
+        return [dict(self.documents[document], score=round(float(scores[document]), 4)) for document in matches]
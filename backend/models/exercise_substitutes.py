@@ -0,0 +1,137 @@
+import numpy as np
+from scipy import sparse
+
+from models.workout_scheduler import parse_muscles
+from models.exercise_index import normalize_value, normalize_equipment
+
+# Muscle columns of a muscle profile and their weights. Antagonists get their
+# own dimensions: sharing them means a similar movement pattern, not shared load.
+PROFILE_COLUMNS = {
+    'Target_Muscles': 1.0,
+    'Synergist_Muscles': 0.5,
+    'Stabilizer_Muscles': 0.25,
+    'Antagonist_Muscles': 0.25
+}
+# Substitutes kept per exercise, overall and per equipment value
+TOP_K = 20
+EQUIPMENT_TOP_K = 10
+# Weaker matches share little more than stabilizers and are not used to fill plans
+MIN_PLAN_SIMILARITY = 0.3
+
+class ExerciseSubstitutes:
+    """Precomputed nearest exercises by muscle profile
+
+    Each exercise is a sparse vector over its muscles (weighted by the column
+    they are listed in). The cosine-similarity top-k of every exercise is
+    computed once, overall and restricted to each equipment value of the
+    ExerciseBitmapIndex, so a substitute lookup is a dict and array access.
+    Only the exercise row itself is excluded: other equipment versions of
+    the same name are its closest substitutes. The full similarity matrix is
+    kept for substitutes under arbitrary filters.
+    """
+
+    def __init__(self, exercises_df, exercise_index):
+        clean = lambda value: ' '.join(str(value).replace('​', ' ').split())
+        self.names = exercises_df['Exercise Name'].map(clean).to_numpy()
+        self.equipment = exercises_df['Equipment'].fillna('').map(clean).to_numpy()
+        self.main_muscles = exercises_df['Main_muscle'].fillna('').astype(str).to_numpy()
+        self.difficulty = exercises_df['Difficulty (1-5)'].to_numpy()
+        self.rows_by_name = {}
+        for row, name in enumerate(self.names):
+            self.rows_by_name.setdefault(normalize_value(name), []).append(row)
+
+        vocabulary = {}
+        rows, cols, values = [], [], []
+        for column, weight in PROFILE_COLUMNS.items():
+            if column not in exercises_df.columns:
+                continue
+            for row, text in enumerate(exercises_df[column]):
+                for muscle in parse_muscles(text):
+                    rows.append(row)
+                    cols.append(vocabulary.setdefault((column == 'Antagonist_Muscles', muscle.lower()), len(vocabulary)))
+                    values.append(weight)
+        profiles = sparse.csr_matrix((values, (rows, cols)), shape=(len(self.names), max(1, len(vocabulary))))
+        # Muscles listed in several columns were summed; cap them at a target's weight
+        profiles.data = np.minimum(profiles.data, 1.0)
+        norms = np.sqrt(np.asarray(profiles.multiply(profiles).sum(axis=1)).ravel())
+        profiles = sparse.diags(1 / np.where(norms > 0, norms, 1)) @ profiles
+        similarity = (profiles @ profiles.T).toarray().astype(np.float32)
+        np.fill_diagonal(similarity, -1)
+        self.similarity = similarity
+
+        self.neighbours, self.scores = self._top_k(similarity, TOP_K)
+        self.by_equipment = {}
+        for (attribute, key), bitmap in exercise_index.bitmaps.items():
+            if attribute != 'equipment':
+                continue
+            allowed = exercise_index.mask(bitmap)
+            self.by_equipment[key] = self._top_k(np.where(allowed[None, :], similarity, -1), EQUIPMENT_TOP_K)
+
+    @staticmethod
+    def _top_k(similarity, k):
+        """Neighbour rows and scores sorted by similarity, -1 where there are fewer than k"""
+        k = min(k, similarity.shape[1])
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1).astype(np.int32)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        top[top_scores <= 0] = -1
+        return top, top_scores
+
+    def rows(self, name):
+        """Rows of every version of an exercise name (case-insensitive), empty if unknown"""
+        return self.rows_by_name.get(normalize_value(name), [])
+
+    def neighbour_rows(self, row, equipment=None):
+        """(rows, scores) of the substitutes of an exercise row, best first"""
+        if equipment is None:
+            neighbours, scores = self.neighbours[row], self.scores[row]
+        else:
+            table = self.by_equipment.get(normalize_equipment(equipment))
+            if table is None:
+                return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+            neighbours, scores = table[0][row], table[1][row]
+        keep = neighbours >= 0
+        return neighbours[keep], scores[keep]
+
+    def best_allowed(self, row, allowed, min_similarity=MIN_PLAN_SIMILARITY):
+        """Most similar exercise among the rows of a boolean mask, or None"""
+        scores = np.where(allowed, self.similarity[row], -1)
+        best = int(scores.argmax())
+        return best if scores[best] >= min_similarity else None
+
+    def substitutes(self, name, equipment=None, limit=5, row=None):
+        """Substitute exercises for an exercise, one per name and equipment; None if it is unknown
+
+        The exercise is every row of a name, or one dataset row when row is
+        given. Neighbours of several rows keep their best similarity.
+        """
+        if row is not None:
+            rows = [row] if 0 <= row < len(self.names) else []
+        else:
+            rows = self.rows(name)
+        if not rows:
+            return None
+        best = {}
+        for query in rows:
+            for neighbour, score in zip(*self.neighbour_rows(query, equipment)):
+                if score > best.get(int(neighbour), -1):
+                    best[int(neighbour)] = score
+        results, seen = [], set()
+        for neighbour, score in sorted(best.items(), key=lambda item: (-item[1], item[0])):
+            key = (self.names[neighbour], self.equipment[neighbour])
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append({
+                'row': neighbour,
+                'name': self.names[neighbour],
+                'equipment': self.equipment[neighbour],
+                'mainMuscle': self.main_muscles[neighbour],
+                'difficulty': int(self.difficulty[neighbour]),
+                'similarity': round(float(score), 4)
+            })
+            if len(results) == limit:
+                break
+        return results
@@ -0,0 +1,116 @@
+import re
+import numpy as np
+
+# Ingredient terms excluded for each allergy. Gluten and Peanuts are the
+# values of the Allergies column in dataset6.csv.
+ALLERGEN_INGREDIENTS = {
+    'Gluten': ['wheat', 'flour', 'bread', 'pasta', 'noodle', 'barley', 'rye', 'couscous', 'cracker',
+               'tortilla', 'bagel', 'bun', 'toast', 'pizza', 'pancake', 'granola', 'carbonara', 'wrap',
+               'breadcrumb', 'semolina', 'spaghetti', 'macaroni'],
+    'Peanuts': ['peanut'],
+    'Tree_Nuts': ['almond', 'walnut', 'cashew', 'pecan', 'pistachio', 'hazelnut', 'macadamia', 'nut'],
+    'Dairy': ['milk', 'cheese', 'butter', 'cream', 'yogurt', 'parfait', 'dairy'],
+    'Eggs': ['egg', 'omelet', 'scrambled', 'mayonnaise'],
+    'Soy': ['soy', 'tofu', 'tempeh', 'edamame', 'miso'],
+    'Fish': ['fish', 'salmon', 'tuna', 'cod', 'anchovy', 'sardine', 'tilapia'],
+    'Shellfish': ['shrimp', 'crab', 'lobster', 'prawn', 'clam', 'mussel', 'oyster', 'scallop', 'seafood']
+}
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+def _singular(word):
+    """Crude singular form so 'Peanuts' matches 'peanut'"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith('oes'):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+def normalize_ingredient(term):
+    """Lowercase, singular, space-separated form of an ingredient or query term"""
+    return ' '.join(_singular(word) for word in _WORD.findall(str(term).lower()))
+
+def meal_terms(name, ingredients=None):
+    """Index terms for one meal: its name words, each ingredient and the ingredient's words"""
+    terms = set(normalize_ingredient(name).split())
+    for ingredient in ingredients if ingredients is not None else []:
+        phrase = normalize_ingredient(ingredient)
+        if phrase:
+            terms.add(phrase)
+            terms.update(phrase.split())
+    return terms
+
+def allergy_terms(allergies):
+    """Ingredient terms to exclude for a list of allergies (unknown allergies are used as terms)"""
+    if not allergies:
+        return []
+    if isinstance(allergies, str):
+        allergies = [allergies]
+    lookup = {key.lower(): terms for key, terms in ALLERGEN_INGREDIENTS.items()}
+    terms = []
+    for allergy in allergies:
+        if allergy is None or str(allergy).strip().lower() in ('', 'none', 'nan'):
+            continue
+        key = str(allergy).strip().lower().replace(' ', '_')
+        terms.extend(lookup.get(key, [allergy]))
+    return terms
+
+class IngredientIndex:
+    """Inverted index from ingredient term to the meals that contain it
+
+    Posting lists are sorted int32 row positions into the meal catalog, stored
+    back to back in one array (postings[offsets[t]:offsets[t + 1]] for term id
+    t). Excluding ingredients clears the rows of each matching posting list in
+    a boolean mask, so the cost depends on how many meals match, not on the
+    catalog size or the length of meal names.
+    """
+
+    def __init__(self, vocabulary, offsets, postings, num_meals):
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings = postings
+        self.num_meals = num_meals
+
+    @classmethod
+    def build(cls, names, ingredient_lists=None):
+        """Build the index from meal names and optional per-meal ingredient lists"""
+        if ingredient_lists is None:
+            ingredient_lists = [None] * len(names)
+        vocabulary = {}
+        rows = []
+        term_ids = []
+        for row, (name, ingredients) in enumerate(zip(names, ingredient_lists)):
+            for term in meal_terms(name, ingredients):
+                rows.append(row)
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+
+        rows = np.array(rows, dtype=np.int32)
+        term_ids = np.array(term_ids, dtype=np.int32)
+        # Stable sort by term keeps each posting list in row order
+        order = np.argsort(term_ids, kind='stable')
+        counts = np.bincount(term_ids, minlength=len(vocabulary))
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(vocabulary, offsets, rows[order], len(names))
+
+    def posting(self, term):
+        """Sorted row positions of meals containing the term"""
+        term_id = self.vocabulary.get(normalize_ingredient(term))
+        if term_id is None:
+            return self.postings[:0]
+        return self.postings[self.offsets[term_id]:self.offsets[term_id + 1]]
+
+    def exclude(self, mask, terms):
+        """Clear the rows of every meal containing any of the terms (mask is modified in place)"""
+        for term in terms or []:
+            mask[self.posting(term)] = False
+        return mask
+
+    def exclusion_mask(self, terms):
+        """Boolean mask of meals that contain none of the terms"""
+        return self.exclude(np.ones(self.num_meals, dtype=bool), terms)
+
+    def nbytes(self):
+        return self.offsets.nbytes + self.postings.nbytes
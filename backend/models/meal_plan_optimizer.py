@@ -0,0 +1,188 @@
+import time
+import numpy as np
+import pandas as pd
+
+from models.meal_recommender_ml import MEAL_TYPES_BY_COUNT, DEFAULT_MEAL_TYPES, meal_distribution_for
+
+MACRO_COLUMNS = ['protein', 'carbs', 'fats']
+
+class MealPlanOptimizer:
+    """Multi-day meal planner that minimizes daily macro error
+
+    Like MealRecommenderML.recommend_meals, every meal is scaled to its slot's
+    share of the calorie goal, so a meal's macro contribution is fixed by its
+    protein/carbs/fats per calorie. A plan is built day by day with a greedy
+    start followed by vectorized coordinate descent over per-slot candidate
+    pools. No meal is used twice in a plan and no name repeats within a day;
+    when a slot runs out of candidates these rules are relaxed and the plan's
+    warnings say so.
+    The planner is bound to the recommender snapshot it was built from.
+    """
+
+    def __init__(self, recommender, candidates_per_slot=256, max_passes=4):
+        self.recommender = recommender
+        self.candidates_per_slot = candidates_per_slot
+        self.max_passes = max_passes
+        self.snapshot = recommender.snapshot
+
+        meals_df = self.snapshot.meals_df
+        calories = meals_df['calories'].to_numpy(dtype=np.float64)
+        # Macro grams per calorie, one row per meal
+        self.density = np.column_stack([
+            meals_df[col].to_numpy(dtype=np.float64) / calories for col in MACRO_COLUMNS
+        ]).astype(np.float32)
+        self.name_codes = pd.factorize(meals_df['name'])[0]
+
+        # Eligible-meal masks per preference filter set (see _preference_key), filled on first use
+        self._preference_masks = {}
+
+        # Partition of meal indices by meal type (PP_recipes catalogs only)
+        self.meal_type_masks = {}
+        if 'meal_type' in meals_df.columns:
+            for meal_type in meals_df['meal_type'].dropna().unique():
+                self.meal_type_masks[meal_type] = (meals_df['meal_type'] == meal_type).to_numpy()
+
+    def _eligible(self, dietary_preferences, exclude_ingredients=None, allergies=None):
+        """Meals allowed by the dietary preferences (all meals if none match) and exclusions"""
+        key = self.recommender._preference_key(dietary_preferences)
+        mask = self._preference_masks.get(key)
+        if mask is None:
+            mask = self.recommender._preference_mask(dietary_preferences, self.snapshot.meals_df)
+            if not mask.any():
+                mask = np.ones(len(mask), dtype=bool)
+            self._preference_masks[key] = mask
+        excluded = self.recommender.exclusion_mask(exclude_ingredients, allergies, self.snapshot)
+        if excluded is not None:
+            # Cached masks are shared between requests, so combine into a new array
+            mask = mask & excluded
+        return mask
+
+    def _slot_pools(self, eligible, slot_types, target_density, days):
+        """Candidate meal indices per slot, closest macro profile first"""
+        distance = (((self.density - target_density) / target_density) ** 2).sum(axis=1)
+        pools = {}
+        for slot_type in set(slot_types):
+            pool_mask = eligible
+            type_mask = self.meal_type_masks.get(slot_type)
+            if type_mask is not None and np.count_nonzero(eligible & type_mask) >= days:
+                pool_mask = eligible & type_mask
+
+            idx = np.flatnonzero(pool_mask)
+            pool_distance = distance[idx]
+            k = min(self.candidates_per_slot, len(idx))
+            if k < len(idx):
+                top = np.argpartition(pool_distance, k - 1)[:k]
+            else:
+                top = np.arange(len(idx))
+            pools[slot_type] = idx[top[np.argsort(pool_distance[top], kind='stable')]]
+        return [pools[slot_type] for slot_type in slot_types]
+
+    def plan(self, calorie_goal, protein, carbs, fats, dietary_preferences, num_meals=3, days=7, time_budget_ms=50,
+             exclude_ingredients=None, allergies=None):
+        """Plan num_meals meals per day for the given number of days"""
+        meals_df = self.snapshot.meals_df
+        eligible = self._eligible(dietary_preferences, exclude_ingredients, allergies)
+        if len(meals_df) == 0 or not eligible.any():
+            return None
+
+        deadline = time.perf_counter() + time_budget_ms / 1000.0
+        target = np.array([protein, carbs, fats], dtype=np.float64)
+        target = np.maximum(target, 1.0)
+        target_density = (target / calorie_goal).astype(np.float32)
+        shares = np.array(meal_distribution_for(num_meals), dtype=np.float64)
+        slot_types = MEAL_TYPES_BY_COUNT.get(num_meals, DEFAULT_MEAL_TYPES)
+        slot_types = [slot_types[i] if i < len(slot_types) else f'Meal {i+1}' for i in range(num_meals)]
+
+        pools = self._slot_pools(eligible, slot_types, target_density, days)
+        # Grams of each macro a candidate contributes in its slot
+        contributions = [calorie_goal * share * self.density[pool] for share, pool in zip(shares, pools)]
+
+        used = np.zeros(len(meals_df), dtype=bool)
+        # Constraints relaxed because a slot ran out of candidates
+        warnings = set()
+        plan_days = []
+        for day in range(days):
+            choice = [-1] * num_meals
+            total = np.zeros(3, dtype=np.float64)
+
+            for passes in range(self.max_passes + 1):
+                changed = False
+                for slot in range(num_meals):
+                    pool = pools[slot]
+                    if len(pool) == 0:
+                        continue
+                    rest = total - (contributions[slot][choice[slot]] if choice[slot] >= 0 else 0)
+                    if passes == 0:
+                        # Greedy start: match this slot's share of the daily targets
+                        errors = (((contributions[slot] - target * shares[slot]) / target) ** 2).sum(axis=1)
+                    else:
+                        errors = (((rest + contributions[slot] - target) / target) ** 2).sum(axis=1)
+
+                    # No repeats across the plan, no duplicate names within the day
+                    blocked = used[pool].copy()
+                    other_names = [self.name_codes[pools[s][choice[s]]] for s in range(num_meals) if s != slot and choice[s] >= 0]
+                    if other_names:
+                        blocked |= np.isin(self.name_codes[pool], other_names)
+                    if choice[slot] >= 0:
+                        blocked[choice[slot]] = False
+                    if blocked.all():
+                        if not used[pool].all():
+                            blocked = used[pool].copy()
+                            warnings.add('Not enough eligible meals: some meal names repeat within a day')
+                        else:
+                            blocked = np.zeros(len(pool), dtype=bool)
+                            warnings.add('Not enough eligible meals: some meals repeat across days')
+                    errors = np.where(blocked, np.inf, errors)
+
+                    best = int(np.argmin(errors))
+                    if best != choice[slot]:
+                        if choice[slot] >= 0:
+                            used[pool[choice[slot]]] = False
+                        choice[slot] = best
+                        used[pool[best]] = True
+                        changed = True
+                    total = rest + contributions[slot][best]
+
+                if passes > 0 and (not changed or time.perf_counter() > deadline):
+                    break
+
+            plan_days.append(self._format_day(day, choice, pools, shares, slot_types, calorie_goal))
+
+        return {
+            'targets': {
+                'calories': int(calorie_goal),
+                'protein': int(protein),
+                'carbs': int(carbs),
+                'fats': int(fats)
+            },
+            'days': plan_days,
+            'averageError': self._average_error(plan_days, target),
+            'warnings': sorted(warnings)
+        }
+
+    def _format_day(self, day, choice, pools, shares, slot_types, calorie_goal):
+        meals_df = self.snapshot.meals_df
+        meals = []
+        for slot, candidate in enumerate(choice):
+            if candidate < 0:
+                continue
+            row = pools[slot][candidate]
+            slot_calories = calorie_goal * shares[slot]
+            density = self.density[row]
+            meals.append({
+                'id': int(meals_df['fdc_id'].iat[row]),
+                'name': meals_df['name'].iat[row],
+                'type': slot_types[slot],
+                'protein': int(slot_calories * density[0]),
+                'carbs': int(slot_calories * density[1]),
+                'fats': int(slot_calories * density[2]),
+                'calories': int(slot_calories)
+            })
+        totals = {key: sum(meal[key] for meal in meals) for key in ['calories', 'protein', 'carbs', 'fats']}
+        return {'day': f'Day {day + 1}', 'meals': meals, 'totals': totals}
+
+    def _average_error(self, plan_days, target):
+        """Mean absolute percentage error of each daily macro total"""
+        totals = np.array([[d['totals'][col] for col in MACRO_COLUMNS] for d in plan_days], dtype=np.float64)
+        errors = np.abs(totals - target) / target * 100
+        return {col: round(float(errors[:, i].mean()), 1) for i, col in enumerate(MACRO_COLUMNS)}
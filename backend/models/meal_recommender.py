@@ -5,6 +5,9 @@ class MealRecommender:
     def __init__(self):
         self.meals_db = None
         self.results = {}
+        # (cuisine, low_carb, low_sodium) filter -> (sorted calories, row positions)
+        self.calorie_index = {}
+        self.records = []
         
     def create_meal_database(self, dietary_df):
         """Create meal database from dietary patterns"""
@@ -78,6 +81,7 @@ class MealRecommender:
                         meals.append(meal)
         
         self.meals_db = pd.DataFrame(meals)
+        self._build_calorie_index()
         
         self.results = {
             'total_meals': len(self.meals_db),
@@ -91,29 +95,77 @@ class MealRecommender:
         
         return self.meals_db
     
+    def _build_calorie_index(self):
+        """Presort meals by calories for every filter combination recommend_meals can apply"""
+        calories = self.meals_db['calories'].to_numpy(dtype=np.float64)
+        cuisines = self.meals_db['cuisine'].to_numpy()
+        low_carb = self.meals_db['diet'].isin(['Low_Carb', 'Balanced']).to_numpy()
+        low_sodium = (self.meals_db['restrictions'] == 'Low_Sodium').to_numpy()
+        
+        self.records = self.meals_db.to_dict('records')
+        self.calorie_index = {}
+        for cuisine in [None] + list(pd.unique(cuisines)):
+            cuisine_mask = np.ones(len(calories), dtype=bool) if cuisine is None else cuisines == cuisine
+            for carb_filter in [False, True]:
+                for sodium_filter in [False, True]:
+                    mask = cuisine_mask.copy()
+                    if carb_filter:
+                        mask &= low_carb
+                    if sodium_filter:
+                        mask &= low_sodium
+                    rows = np.flatnonzero(mask)
+                    # Stable sort keeps database order among equal calories
+                    rows = rows[np.argsort(calories[rows], kind='stable')]
+                    self.calorie_index[(cuisine, carb_filter, sodium_filter)] = (calories[rows], rows)
+    
+    def _nearest(self, sorted_calories, rows, target, k):
+        """Rows of the k meals closest to target calories, nearest first (ties in database order)"""
+        n = len(rows)
+        k = min(k, n)
+        hi = int(np.searchsorted(sorted_calories, target))
+        lo = hi - 1
+        picked = []
+        while len(picked) < k:
+            if lo < 0 or (hi < n and sorted_calories[hi] - target < target - sorted_calories[lo]):
+                picked.append((sorted_calories[hi] - target, rows[hi]))
+                hi += 1
+            else:
+                picked.append((target - sorted_calories[lo], rows[lo]))
+                lo -= 1
+        # Include everything tied with the k-th meal so ties resolve in database order
+        if picked:
+            last = max(diff for diff, _ in picked)
+            while lo >= 0 and target - sorted_calories[lo] == last:
+                picked.append((last, rows[lo]))
+                lo -= 1
+            while hi < n and sorted_calories[hi] - target == last:
+                picked.append((last, rows[hi]))
+                hi += 1
+        picked.sort()
+        return picked[:k]
+    
     def recommend_meals(self, calorie_goal, dietary_preferences, cuisine_preference=None, num_meals=3):
         """Recommend meals based on user preferences"""
         if self.meals_db is None or len(self.meals_db) == 0:
             return []
         
-        filtered = self.meals_db.copy()
-        
-        if cuisine_preference:
-            filtered = filtered[filtered['cuisine'] == cuisine_preference]
-        
+        carb_filter = False
+        sodium_filter = False
         if dietary_preferences:
             if 'Low_Sugar' in dietary_preferences or 'Low_Carb' in dietary_preferences:
-                filtered = filtered[filtered['diet'].isin(['Low_Carb', 'Balanced'])]
+                carb_filter = True
             if 'Low_Sodium' in dietary_preferences:
-                filtered = filtered[filtered['restrictions'] == 'Low_Sodium']
+                sodium_filter = True
         
-        if len(filtered) == 0:
-            filtered = self.meals_db.copy()
+        sorted_calories, rows = self.calorie_index.get((cuisine_preference or None, carb_filter, sodium_filter), ((), ()))
+        if len(rows) == 0:
+            sorted_calories, rows = self.calorie_index[(None, False, False)]
         
         target_calories_per_meal = calorie_goal / num_meals
-        filtered['calorie_diff'] = abs(filtered['calories'] - target_calories_per_meal)
-        filtered = filtered.sort_values('calorie_diff')
-        
-        selected = filtered.head(num_meals).to_dict('records')
+        selected = []
+        for diff, row in self._nearest(sorted_calories, rows, target_calories_per_meal, num_meals):
+            meal = dict(self.records[row])
+            meal['calorie_diff'] = float(diff)
+            selected.append(meal)
         
         return selected
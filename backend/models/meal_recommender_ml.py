@@ -4,15 +4,194 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.preprocessing import StandardScaler
 from sklearn.neighbors import NearestNeighbors
 
+from models.ingredient_index import IngredientIndex, allergy_terms
+from models.recipe_embeddings import RecipeEmbeddings
+from models.meal_search import MealNameIndex
+from models.meal_store import MealStore
+from utils.keyword_classifier import LABEL_KEYWORDS, classify_names
+
+# Share of the daily calorie goal for each meal slot
+# For 3 meals: Breakfast 25%, Lunch 40%, Dinner 35%
+# For 4 meals: Breakfast 20%, Mid-morning 20%, Lunch 35%, Dinner 25%
+# For 5 meals: Breakfast 20%, Mid-morning 15%, Lunch 30%, Afternoon 15%, Dinner 20%
+# For 6 meals: Breakfast 18%, Mid-morning 15%, Lunch 25%, Afternoon 12%, Dinner 20%, Evening 10%
+MEAL_DISTRIBUTIONS = {
+    3: [0.25, 0.40, 0.35],
+    4: [0.20, 0.20, 0.35, 0.25],
+    5: [0.20, 0.15, 0.30, 0.15, 0.20],
+    6: [0.18, 0.15, 0.25, 0.12, 0.20, 0.10]
+}
+
+# Standard meal types for different numbers of meals
+MEAL_TYPES_BY_COUNT = {
+    3: ['Breakfast', 'Lunch', 'Dinner'],
+    4: ['Breakfast', 'Mid-morning Snack', 'Lunch', 'Dinner'],
+    5: ['Breakfast', 'Mid-morning Snack', 'Lunch', 'Afternoon Snack', 'Dinner'],
+    6: ['Breakfast', 'Mid-morning Snack', 'Lunch', 'Afternoon Snack', 'Dinner', 'Evening Snack']
+}
+DEFAULT_MEAL_TYPES = ['Breakfast', 'Lunch', 'Dinner', 'Snack', 'Meal']
+
+# Compact storage schema for the meal catalog. Text columns have few distinct
+# values (PP_recipes has ~30 names), so categoricals store each string once.
+MEAL_SCHEMA = {
+    'name': 'category',
+    'category': 'category',
+    'cuisine': 'category',
+    'diet': 'category',
+    'meal_type': 'category',
+    'restrictions': 'category',
+    'calories': 'float32',
+    'protein': 'float32',
+    'carbs': 'float32',
+    'fats': 'float32',
+    'is_vegetarian': 'bool',
+    'is_vegan': 'bool',
+    'has_meat': 'bool',
+    'has_dairy': 'bool',
+    'has_egg': 'bool',
+    'fdc_id': 'int32',
+    'calorie_level': 'int8'
+}
+
+def compact_meals_df(meals_df):
+    """Cast meal catalog columns to MEAL_SCHEMA dtypes (columns not present are skipped)"""
+    meals_df = meals_df.reset_index(drop=True)
+    if 'fdc_id' not in meals_df.columns:
+        # Synthetic catalogs have no source ids; row positions serve as stable meal ids
+        meals_df['fdc_id'] = np.arange(len(meals_df))
+    missing_labels = [col for col in LABEL_KEYWORDS if col not in meals_df.columns]
+    if missing_labels:
+        # Catalogs ingested before keyword labels existed are labelled from their names
+        labels = classify_names(meals_df['name'].astype(str).astype('category'))
+        for col in missing_labels:
+            meals_df[col] = labels[col].to_numpy()
+    for col, dtype in MEAL_SCHEMA.items():
+        if col not in meals_df.columns:
+            continue
+        if dtype == 'bool':
+            # Missing flags count as False so dietary filters stay conservative
+            meals_df[col] = meals_df[col].fillna(False).astype(bool)
+        elif dtype == 'category':
+            meals_df[col] = meals_df[col].astype(str).astype('category')
+        else:
+            meals_df[col] = pd.to_numeric(meals_df[col], errors='coerce').fillna(0).astype(dtype)
+    return meals_df
+
+def meal_distribution_for(num_meals):
+    """Calorie share per meal slot (even split for non-standard meal counts)"""
+    return MEAL_DISTRIBUTIONS.get(num_meals, [1.0 / num_meals] * num_meals)
+
+FEATURE_COLUMNS = ['calories', 'protein', 'carbs', 'fats']
+# Similarity multiplier for meat dishes when the user is an omnivore
+MEAT_BOOST = 1.2
+
+def _read_only(array):
+    """float32 copy of array that cannot be written to"""
+    array = np.array(array, dtype=np.float32, order='C')
+    array.setflags(write=False)
+    return array
+
+class MealSnapshot:
+    """Immutable, validated state of a trained meal recommender
+
+    Built once when a model is trained or loaded and published with a single
+    attribute assignment, so a request either sees the previous snapshot or
+    the new one, never a half-built mix. Feature arrays are read-only and
+    meals_df must be treated as read-only by callers.
+    """
+    __slots__ = ('meals_df', 'scaler', 'knn_model', 'meal_features', 'meal_features_scaled', 'ingredient_index',
+                 'meal_unit', 'sorted_ids', 'id_rows', 'mask_cache', 'embeddings', 'name_index')
+
+    def __init__(self, meals_df, scaler, knn_model, meal_features_scaled=None, ingredient_index=None,
+                 embeddings=None, name_index=None):
+        if meals_df is None or len(meals_df) == 0:
+            raise ValueError('Meal catalog is empty')
+        missing = [col for col in FEATURE_COLUMNS if col not in meals_df.columns]
+        if missing:
+            raise ValueError(f'Meal catalog is missing columns: {missing}')
+        if not hasattr(scaler, 'mean_') or len(scaler.mean_) != len(FEATURE_COLUMNS):
+            raise ValueError('Meal feature scaler is not fitted on the catalog features')
+
+        meal_features = _read_only(meals_df[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+        if meal_features_scaled is None or np.shape(meal_features_scaled) != meal_features.shape:
+            meal_features_scaled = scaler.transform(meal_features)
+        if ingredient_index is None or ingredient_index.num_meals != len(meals_df):
+            # Artifacts without an index fall back to indexing meal names
+            ingredient_index = IngredientIndex.build(meals_df['name'].astype(str).tolist())
+
+        object.__setattr__(self, 'meals_df', meals_df)
+        object.__setattr__(self, 'scaler', scaler)
+        object.__setattr__(self, 'knn_model', knn_model)
+        object.__setattr__(self, 'meal_features', meal_features)
+        object.__setattr__(self, 'meal_features_scaled', _read_only(meal_features_scaled))
+        object.__setattr__(self, 'ingredient_index', ingredient_index)
+        if embeddings is not None and len(embeddings.vectors) != len(meals_df):
+            raise ValueError('Recipe embeddings do not match the meal catalog')
+        object.__setattr__(self, 'embeddings', embeddings)
+        if name_index is None or len(name_index.row_name_ids) != len(meals_df):
+            name_index = MealNameIndex.build(meals_df['name'])
+        object.__setattr__(self, 'name_index', name_index)
+
+        # Unit-length scaled features: a dot product is the cosine similarity knn_model uses
+        norms = np.linalg.norm(self.meal_features_scaled, axis=1, keepdims=True)
+        object.__setattr__(self, 'meal_unit', _read_only(self.meal_features_scaled / np.maximum(norms, 1e-12)))
+
+        # fdc_id -> row lookup by binary search over the sorted ids
+        ids = meals_df['fdc_id'].to_numpy() if 'fdc_id' in meals_df.columns else np.arange(len(meals_df))
+        id_rows = np.argsort(ids, kind='stable')
+        sorted_ids = ids[id_rows]
+        id_rows.setflags(write=False)
+        sorted_ids.setflags(write=False)
+        object.__setattr__(self, 'sorted_ids', sorted_ids)
+        object.__setattr__(self, 'id_rows', id_rows)
+        # Dietary preference masks by preference filter set (a bounded key space), filled on first use
+        object.__setattr__(self, 'mask_cache', {})
+
+    def row_for_id(self, meal_id):
+        """Catalog row of the meal with this fdc_id, or None"""
+        pos = int(np.searchsorted(self.sorted_ids, meal_id))
+        if pos < len(self.sorted_ids) and self.sorted_ids[pos] == meal_id:
+            return int(self.id_rows[pos])
+        return None
+
+    def __setattr__(self, name, value):
+        raise AttributeError('MealSnapshot is immutable; build a new snapshot instead')
+
 class MealRecommenderML:
     """ML-based meal recommender using content-based filtering and dataset patterns"""
     
     def __init__(self):
         self.dietary_df = None
-        self.scaler = StandardScaler()
-        self.knn_model = None
-        self.meal_features = None
+        # Replaced wholesale by train()/load(); read it once per request
+        self.snapshot = None
+        # Optional SQLite catalog, used when no snapshot is loaded (see open_store)
+        self.store = None
         self.results = {}
+    
+    @property
+    def meals_df(self):
+        snapshot = self.snapshot
+        return snapshot.meals_df if snapshot is not None else None
+    
+    @property
+    def scaler(self):
+        snapshot = self.snapshot
+        return snapshot.scaler if snapshot is not None else None
+    
+    @property
+    def knn_model(self):
+        snapshot = self.snapshot
+        return snapshot.knn_model if snapshot is not None else None
+    
+    @property
+    def meal_features(self):
+        snapshot = self.snapshot
+        return snapshot.meal_features if snapshot is not None else None
+    
+    @property
+    def meal_features_scaled(self):
+        snapshot = self.snapshot
+        return snapshot.meal_features_scaled if snapshot is not None else None
         
     def train(self, dietary_df=None, meals_df=None):
         """Train meal recommender on meal dataset (preferred) or dietary patterns"""
@@ -20,28 +199,28 @@ class MealRecommenderML:
         # PRIORITY: Use actual meal dataset if provided
         if meals_df is not None and len(meals_df) > 0:
             print("✓ Using USDA FoodData Central meal dataset")
-            self.meals_df = meals_df.copy()
+            meals_df = meals_df.copy()
             
             # Ensure required columns exist
             required_cols = ['name', 'calories', 'protein', 'carbs', 'fats']
-            if not all(col in self.meals_df.columns for col in required_cols):
+            if not all(col in meals_df.columns for col in required_cols):
                 print("⚠ Meal dataset missing required columns, trying to infer...")
                 return False
             
             # Ensure numeric columns are properly formatted
             for col in ['calories', 'protein', 'carbs', 'fats']:
-                self.meals_df[col] = pd.to_numeric(self.meals_df[col], errors='coerce').fillna(0)
+                meals_df[col] = pd.to_numeric(meals_df[col], errors='coerce').fillna(0)
             
             # Filter out invalid meals
-            self.meals_df = self.meals_df[
-                (self.meals_df['calories'] > 0) & 
-                (self.meals_df['calories'] < 5000) &
-                (self.meals_df['protein'] >= 0) &
-                (self.meals_df['carbs'] >= 0) &
-                (self.meals_df['fats'] >= 0)
+            meals_df = meals_df[
+                (meals_df['calories'] > 0) & 
+                (meals_df['calories'] < 5000) &
+                (meals_df['protein'] >= 0) &
+                (meals_df['carbs'] >= 0) &
+                (meals_df['fats'] >= 0)
             ].copy()
             
-            print(f"  Loaded {len(self.meals_df)} real meals from USDA dataset")
+            print(f"  Loaded {len(meals_df)} real meals from USDA dataset")
             
         # FALLBACK: Use dietary patterns to create synthetic meals
         elif dietary_df is not None and len(dietary_df) > 0:
@@ -78,43 +257,73 @@ class MealRecommenderML:
                                 'fats': int(meal_calories * fat_ratio / 9),
                             })
             
-            self.meals_df = pd.DataFrame(meals)
+            meals_df = pd.DataFrame(meals)
         
         else:
             print("⚠ No meal or dietary data available for training")
             return False
         
-        if len(self.meals_df) == 0:
+        if len(meals_df) == 0:
             print("⚠ No meals available after processing")
             return False
         
+        memory_before = meals_df.memory_usage(deep=True).sum()
+        # Ingredient lists only feed the ingredient index, they are not kept in the catalog
+        ingredients = meals_df.pop('ingredients').tolist() if 'ingredients' in meals_df.columns else None
+        meals_df = compact_meals_df(meals_df)
+        names = meals_df['name'].astype(str).tolist()
+        ingredient_index = IngredientIndex.build(names, ingredients)
+        embeddings = RecipeEmbeddings.build(names, ingredients)
+        
         # Create feature matrix for content-based filtering
-        feature_cols = ['calories', 'protein', 'carbs', 'fats']
-        self.meal_features = self.meals_df[feature_cols].values
-        self.meal_features_scaled = self.scaler.fit_transform(self.meal_features)
+        meal_features = meals_df[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+        scaler = StandardScaler()
+        meal_features_scaled = scaler.fit_transform(meal_features).astype(np.float32)
         
         # Train KNN model for recommendations
-        self.knn_model = NearestNeighbors(n_neighbors=min(10, len(self.meals_df)), metric='cosine')
-        self.knn_model.fit(self.meal_features_scaled)
+        knn_model = NearestNeighbors(n_neighbors=min(10, len(meals_df)), metric='cosine')
+        knn_model.fit(meal_features_scaled)
+        
+        self.snapshot = MealSnapshot(meals_df, scaler, knn_model, meal_features_scaled, ingredient_index, embeddings)
         
         # Get cuisines and diet types
-        cuisines = self.meals_df['cuisine'].unique().tolist() if 'cuisine' in self.meals_df.columns else []
-        diet_types = self.meals_df['diet'].unique().tolist() if 'diet' in self.meals_df.columns else []
+        cuisines = meals_df['cuisine'].unique().tolist() if 'cuisine' in meals_df.columns else []
+        diet_types = meals_df['diet'].unique().tolist() if 'diet' in meals_df.columns else []
         
         self.results = {
-            'total_meals': len(self.meals_df),
+            'total_meals': len(meals_df),
             'cuisines': cuisines,
             'diet_types': diet_types,
-            'training_samples': len(self.meals_df)
+            'training_samples': len(meals_df),
+            'embedding_dim': int(embeddings.vectors.shape[1]) if embeddings is not None else 0,
+            'memory': self.memory_report(memory_before)
         }
         
         print(f"✓ ML Meal Recommender Trained:")
-        print(f"  - Meals: {len(self.meals_df)}")
+        print(f"  - Meals: {len(meals_df)}")
+        print(f"  - Catalog memory: {self.results['memory']['meals_df_before_mb']} MB -> "
+              f"{self.results['memory']['meals_df_mb']} MB")
+        print(f"  - Ingredient index: {len(ingredient_index.vocabulary)} terms")
+        print(f"  - Recipe embeddings: {self.results['embedding_dim']} dimensions")
         print(f"  - Cuisines: {self.results['cuisines']}")
         print(f"  - Diet Types: {self.results['diet_types']}")
         
         return True
     
+    def memory_report(self, meals_df_before=None):
+        """Memory used by the catalog and feature arrays, in MB"""
+        mb = lambda n: round(float(n) / (1024 * 1024), 2)
+        report = {
+            'meals_df_mb': mb(self.meals_df.memory_usage(deep=True).sum()),
+            'meal_features_mb': mb(self.meal_features.nbytes) if self.meal_features is not None else 0.0,
+            'meal_features_scaled_mb': mb(self.meal_features_scaled.nbytes) if self.meal_features_scaled is not None else 0.0,
+            'ingredient_index_mb': mb(self.snapshot.ingredient_index.nbytes()) if self.snapshot is not None else 0.0,
+            'columns': {col: str(dtype) for col, dtype in self.meals_df.dtypes.items()}
+        }
+        if meals_df_before is not None:
+            report['meals_df_before_mb'] = mb(meals_df_before)
+        return report
+    
     def _get_bmi_range(self, bmi):
         """Categorize BMI into range"""
         if bmi < 18.5:
@@ -126,71 +335,236 @@ class MealRecommenderML:
         else:
             return 'Obese'
     
-    def recommend_meals(self, calorie_goal, dietary_preferences, num_meals=3):
+    def _preference_filters(self, dietary_preferences):
+        """Vegan/vegetarian flags and allowed diet and restriction values for dietary preferences"""
+        filters = {'vegan': False, 'vegetarian': False, 'diets': [], 'restrictions': []}
+        if not dietary_preferences:
+            return filters
+        
+        # Handle string or list of preferences
+        if isinstance(dietary_preferences, str):
+            pref_list = [dietary_preferences]
+        else:
+            pref_list = dietary_preferences if isinstance(dietary_preferences, list) else [dietary_preferences]
+        
+        for pref in pref_list:
+            if 'Vegan' in pref:
+                # ONLY vegan foods (no meat, dairy, eggs)
+                filters['vegan'] = True
+            elif 'Vegetarian' in pref:
+                # Vegetarian (no meat, but can have dairy/eggs)
+                filters['vegetarian'] = True
+                filters['diets'].append('Balanced')
+            elif 'Keto' in pref or 'Low_Carb' in pref:
+                filters['diets'].extend(['Low_Carb', 'Balanced'])
+            elif 'Low_Sodium' in pref:
+                filters['restrictions'].append('Low_Sodium')
+            elif 'Paleo' in pref:
+                filters['diets'].append('Balanced')  # Approximate
+            elif 'Mediterranean' in pref:
+                filters['diets'].append('Balanced')  # Approximate
+            # Omnivore can eat anything - no filter (meat is prioritized when scoring)
+        return filters
+    
+    def _preference_key(self, dietary_preferences):
+        """Hashable form of the filters of dietary preferences, for caching their masks
+        
+        Masks depend only on these filters, so arbitrary request values map to
+        a small, fixed set of keys and caches keyed on them stay bounded.
+        """
+        filters = self._preference_filters(dietary_preferences)
+        return (filters['vegan'], filters['vegetarian'], tuple(sorted(set(filters['diets']))),
+                tuple(sorted(set(filters['restrictions']))))
+    
+    def _preference_mask(self, dietary_preferences, meals_df=None):
+        """Boolean mask over meals_df for the given dietary preferences"""
+        if meals_df is None:
+            meals_df = self.meals_df
+        mask = np.ones(len(meals_df), dtype=bool)
+        filters = self._preference_filters(dietary_preferences)
+        
+        if filters['vegan']:
+            if 'is_vegan' in meals_df.columns:
+                mask &= (meals_df['is_vegan'] == True).to_numpy()
+            # Also filter by name keyword labels as backup
+            mask &= ~(meals_df['has_meat'] | meals_df['has_dairy'] | meals_df['has_egg']).to_numpy()
+        if filters['vegetarian']:
+            if 'is_vegetarian' in meals_df.columns:
+                mask &= (meals_df['is_vegetarian'] == True).to_numpy()
+            # Also filter by name keyword labels as backup (only meat, not dairy)
+            mask &= ~meals_df['has_meat'].to_numpy()
+        
+        # Apply filters only if we have filters to apply
+        if filters['diets']:
+            mask &= meals_df['diet'].isin(filters['diets']).to_numpy()
+        if filters['restrictions'] and 'restrictions' in meals_df.columns:
+            mask &= meals_df['restrictions'].isin(filters['restrictions']).to_numpy()
+        
+        return mask
+    
+    def _cached_preference_mask(self, dietary_preferences, snapshot):
+        """Read-only preference mask, computed once per snapshot and preference filter set"""
+        key = self._preference_key(dietary_preferences)
+        mask = snapshot.mask_cache.get(key)
+        if mask is None:
+            mask = self._preference_mask(dietary_preferences, snapshot.meals_df)
+            mask.setflags(write=False)
+            snapshot.mask_cache[key] = mask
+        return mask
+    
+    def alternatives(self, meal_id, k=5, dietary_preferences=None, exclude_ingredients=None,
+                     allergies=None, calories=None, by='nutrition', snapshot=None):
+        """k meals most similar to a meal, for swapping it out
+        
+        by='nutrition' uses the cosine metric of knn_model on the macro features;
+        by='ingredients' searches the recipe embeddings (falling back to
+        nutrition when the model has none). Only meals allowed by the dietary
+        preferences and exclusions are returned and meals sharing the original's
+        name are skipped. If calories is given, alternatives are scaled to that
+        portion. Returns None if the meal id is unknown.
+        """
+        if snapshot is None:
+            snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        row = snapshot.row_for_id(meal_id)
+        if row is None:
+            return None
+        
+        meals_df = snapshot.meals_df
+        allowed = self._cached_preference_mask(dietary_preferences, snapshot)
+        excluded = self.exclusion_mask(exclude_ingredients, allergies, snapshot)
+        if excluded is not None:
+            allowed = allowed & excluded
+        names = meals_df['name'].array
+        name_codes = names.codes
+        allowed = allowed & (name_codes != name_codes[row])
+        
+        # Over-fetch so there are still k meals after dropping repeated names
+        if by == 'ingredients' and snapshot.embeddings is not None:
+            top, scores = snapshot.embeddings.search(snapshot.embeddings.vectors[row], k * 4, allowed)
+        else:
+            similarity = np.where(allowed, snapshot.meal_unit @ snapshot.meal_unit[row], -np.inf)
+            take = min(int(np.count_nonzero(allowed)), k * 4)
+            if take == 0:
+                return []
+            top = np.argpartition(-similarity, take - 1)[:take]
+            top = top[np.argsort(-similarity[top], kind='stable')]
+            scores = similarity[top]
+        
+        ids = meals_df['fdc_id'].to_numpy()
+        results = []
+        seen_names = set()
+        for meal_row, score in zip(top, scores):
+            code = name_codes[meal_row]
+            if code in seen_names:
+                continue
+            seen_names.add(code)
+            meal_calories, protein, carbs, fats = snapshot.meal_features[meal_row]
+            scale = calories / float(meal_calories) if calories and meal_calories > 0 else 1.0
+            results.append({
+                'id': int(ids[meal_row]),
+                'name': names.categories[code],
+                'protein': int(protein * scale),
+                'carbs': int(carbs * scale),
+                'fats': int(fats * scale),
+                'calories': int(meal_calories * scale),
+                'similarity': round(float(score), 3)
+            })
+            if len(results) >= k:
+                break
+        return results
+    
+    def search_meals(self, query, limit=10, dietary_preferences=None, snapshot=None):
+        """Meals whose names match a search query, best first (one meal per distinct name)
+        
+        Names starting with the query rank first, then names with words starting
+        with the query words, then names containing the query anywhere.
+        """
+        if snapshot is None:
+            snapshot = self.snapshot
+        if snapshot is None:
+            return []
+        
+        name_index = snapshot.name_index
+        allowed_rows = allowed_names = None
+        if dietary_preferences:
+            allowed_rows = self._cached_preference_mask(dietary_preferences, snapshot)
+            key = ('names', self._preference_key(dietary_preferences))
+            allowed_names = snapshot.mask_cache.get(key)
+            if allowed_names is None:
+                allowed_names = name_index.allowed_names(allowed_rows)
+                allowed_names.setflags(write=False)
+                snapshot.mask_cache[key] = allowed_names
+        
+        names = snapshot.meals_df['name'].array
+        ids = snapshot.meals_df['fdc_id'].to_numpy()
+        results = []
+        for name_id, match in name_index.search(query, limit, allowed_names):
+            row = name_index.first_row(name_id, allowed_rows)
+            meal_calories, protein, carbs, fats = snapshot.meal_features[row]
+            results.append({
+                'id': int(ids[row]),
+                'name': names.categories[names.codes[row]],
+                'protein': int(protein),
+                'carbs': int(carbs),
+                'fats': int(fats),
+                'calories': int(meal_calories),
+                'match': match
+            })
+        return results
+    
+    def exclusion_mask(self, exclude_ingredients=None, allergies=None, snapshot=None):
+        """Meals free of the excluded ingredients and allergens (None if nothing is excluded)"""
+        terms = list(exclude_ingredients or []) + allergy_terms(allergies)
+        if not terms:
+            return None
+        if snapshot is None:
+            snapshot = self.snapshot
+        return snapshot.ingredient_index.exclusion_mask(terms)
+    
+    def recommend_meals(self, calorie_goal, dietary_preferences, num_meals=3,
+                        exclude_ingredients=None, allergies=None, snapshot=None):
         """Recommend meals using ML (content-based filtering + KNN)"""
-        if self.meals_df is None or len(self.meals_df) == 0:
+        # Read the published snapshot once so a concurrent reload cannot mix models
+        if snapshot is None:
+            snapshot = self.snapshot
+        store = self.store
+        if snapshot is None and store is None:
             return []
         
-        # Filter by dietary preferences
-        filtered = self.meals_df.copy()
+        if snapshot is None:
+            # Dietary, calorie-window and exclusion filters run in SQL
+            terms = list(exclude_ingredients or []) + allergy_terms(allergies)
+            candidates = store.candidates(self._preference_filters(dietary_preferences),
+                                          calorie_goal / num_meals, terms)
+            if candidates is None:
+                return []
+            filtered, filtered_features_scaled = candidates
+            return self._select_meals(filtered, filtered_features_scaled, store.scaler,
+                                      calorie_goal, dietary_preferences, num_meals)
         
-        # Map frontend dietary preferences to backend format
-        if dietary_preferences:
-            # Handle string or list of preferences
-            if isinstance(dietary_preferences, str):
-                pref_list = [dietary_preferences]
-            else:
-                pref_list = dietary_preferences if isinstance(dietary_preferences, list) else [dietary_preferences]
-            
-            # Filter by dietary preferences
-            diet_filters = []
-            restriction_filters = []
-            
-            for pref in pref_list:
-                if 'Vegan' in pref:
-                    # Filter to ONLY vegan foods (no meat, dairy, eggs)
-                    if 'is_vegan' in filtered.columns:
-                        filtered = filtered[filtered['is_vegan'] == True]
-                    # Also filter by name as backup
-                    filtered = filtered[~filtered['name'].str.lower().str.contains('|'.join([
-                        'cheese', 'milk', 'butter', 'cream', 'yogurt', 'dairy',
-                        'beef', 'chicken', 'pork', 'turkey', 'lamb', 'meat', 'bacon', 'sausage', 'ham', 'steak',
-                        'fish', 'seafood', 'salmon', 'tuna', 'shrimp', 'poultry', 'egg', 'yolk'
-                    ]), case=False, na=False)]
-                elif 'Vegetarian' in pref:
-                    # Filter to vegetarian (no meat, but can have dairy/eggs)
-                    if 'is_vegetarian' in filtered.columns:
-                        filtered = filtered[filtered['is_vegetarian'] == True]
-                    # Also filter by name as backup (only meat, not dairy)
-                    filtered = filtered[~filtered['name'].str.lower().str.contains('|'.join([
-                        'beef', 'chicken', 'pork', 'turkey', 'lamb', 'meat', 'bacon', 'sausage', 'ham', 'steak',
-                        'fish', 'seafood', 'salmon', 'tuna', 'shrimp', 'poultry'
-                    ]), case=False, na=False)]
-                    diet_filters.append('Balanced')
-                elif 'Keto' in pref or 'Low_Carb' in pref:
-                    diet_filters.extend(['Low_Carb', 'Balanced'])
-                elif 'Low_Sodium' in pref:
-                    restriction_filters.append('Low_Sodium')
-                elif 'Paleo' in pref:
-                    diet_filters.append('Balanced')  # Approximate
-                elif 'Mediterranean' in pref:
-                    diet_filters.append('Balanced')  # Approximate
-                elif 'Omnivore' in pref or pref == 'Omnivore':
-                    # Omnivore can eat anything but PREFER meat options
-                    # Don't filter out any meals, but we'll prioritize non-vegetarian meals later
-                    # Keep all meals available for selection
-                    pass  # Don't add any filters - use all meals
-            
-            # Apply filters only if we have filters to apply
-            if diet_filters:
-                filtered = filtered[filtered['diet'].isin(diet_filters)]
-            if restriction_filters:
-                filtered = filtered[filtered['restrictions'].isin(restriction_filters)]
+        # Filter by dietary preferences
+        mask = self._preference_mask(dietary_preferences, snapshot.meals_df)
         
         # If no meals match filters (or no filters applied), use all meals
-        if len(filtered) == 0:
-            filtered = self.meals_df.copy()
-        
+        if not mask.any():
+            mask = np.ones(len(snapshot.meals_df), dtype=bool)
+        
+        # Ingredient and allergy exclusions are hard filters, never relaxed
+        excluded = self.exclusion_mask(exclude_ingredients, allergies, snapshot)
+        if excluded is not None:
+            mask &= excluded
+            if not mask.any():
+                return []
+        filtered = snapshot.meals_df[mask]
+        # Scaled features of the filtered meals were computed when the snapshot was built
+        filtered_features_scaled = snapshot.meal_features_scaled[mask]
+        return self._select_meals(filtered, filtered_features_scaled, snapshot.scaler,
+                                  calorie_goal, dietary_preferences, num_meals)
+    
+    def _target_features_scaled(self, scaler, calorie_goal, num_meals):
+        """Scaled per-meal nutrition target for a daily calorie goal"""
         # Create target nutritional profile
         target_calories_per_meal = calorie_goal / num_meals
         # Estimate target macros (balanced distribution)
@@ -199,74 +573,72 @@ class MealRecommenderML:
         target_fats = int(target_calories_per_meal * 0.25 / 9)
         
         target_features = np.array([[target_calories_per_meal, target_protein, target_carbs, target_fats]])
-        
-        # Ensure scaler is initialized and working
-        feature_cols = ['calories', 'protein', 'carbs', 'fats']
-        
-        # Reinitialize scaler if needed (e.g., after loading from file)
-        if self.scaler is None or not hasattr(self.scaler, 'mean_') or self.meal_features is None:
-            # Reinitialize scaler
-            self.meal_features = self.meals_df[feature_cols].values
-            self.scaler = StandardScaler()
-            self.meal_features_scaled = self.scaler.fit_transform(self.meal_features)
-        
-        try:
-            target_features_scaled = self.scaler.transform(target_features)
-        except (ValueError, AttributeError) as e:
-            # If scaler transform fails, reinitialize
-            self.meal_features = self.meals_df[feature_cols].values
-            self.scaler = StandardScaler()
-            self.scaler.fit(self.meal_features)
-            self.meal_features_scaled = self.scaler.transform(self.meal_features)
-            target_features_scaled = self.scaler.transform(target_features)
-        
-        # Get features for filtered meals
-        filtered_features_raw = filtered[feature_cols].values
-        filtered_features_scaled = self.scaler.transform(filtered_features_raw)
+        return scaler.transform(target_features)
+    
+    def _boost_meat(self, similarities, is_vegetarian, dietary_preferences):
+        """For Omnivore: boost similarity scores of meat options in place (prioritize non-vegetarian meals)"""
+        if is_vegetarian is None:
+            return similarities
+        if dietary_preferences and ('Omnivore' in dietary_preferences or dietary_preferences == 'Omnivore'):
+            # Boost similarity for non-vegetarian meals by 20%, capped at 1.0
+            meat = ~np.asarray(is_vegetarian, dtype=bool)
+            similarities[meat] = np.minimum(1.0, similarities[meat] * MEAT_BOOST)
+        return similarities
+    
+    def _select_meals(self, filtered, filtered_features_scaled, scaler, calorie_goal, dietary_preferences, num_meals):
+        """Score candidate meals against the per-meal target and pick a diverse, scaled set"""
+        target_features_scaled = self._target_features_scaled(scaler, calorie_goal, num_meals)
         
         # Find most similar meals using cosine similarity
         similarities = cosine_similarity(target_features_scaled, filtered_features_scaled)[0]
-        
-        # For Omnivore: Boost similarity scores for meat options (prioritize non-vegetarian meals)
-        if dietary_preferences and ('Omnivore' in dietary_preferences or dietary_preferences == 'Omnivore'):
-            # Boost similarity for non-vegetarian meals by 20%
-            meat_boost = 1.2
-            for idx in range(len(similarities)):
-                if not filtered.iloc[idx].get('is_vegetarian', True):  # If not vegetarian (has meat)
-                    similarities[idx] = min(1.0, similarities[idx] * meat_boost)  # Cap at 1.0
-        
+        is_vegetarian = filtered['is_vegetarian'].to_numpy() if 'is_vegetarian' in filtered.columns else None
+        self._boost_meat(similarities, is_vegetarian, dietary_preferences)
+        return self._diverse_selection(filtered, similarities, calorie_goal, dietary_preferences, num_meals)
+    
+    def _diverse_selection(self, filtered, similarities, calorie_goal, dietary_preferences, num_meals):
+        """Pick num_meals of the scored candidates, mixing meal types and cuisines, scaled to the goal"""
         # Get top N meals with diversity (ensure different meal types AND cuisines)
         # Sort by similarity but ensure we get diverse meals
         top_indices = []
         selected_cuisines = set()
         selected_meal_types = set()
         similarity_sorted_indices = np.argsort(similarities)[::-1]
+        selected = np.zeros(len(filtered), dtype=bool)
         
         # If dataset has meal_type column (from PP_recipes), prioritize meal type diversity
         has_meal_type = 'meal_type' in filtered.columns
+        # Candidate columns read once as arrays, in similarity order
+        cuisines = filtered['cuisine'].to_numpy(dtype=object)[similarity_sorted_indices]
+        if has_meal_type:
+            meal_types = filtered['meal_type'].to_numpy(dtype=object)[similarity_sorted_indices]
+        else:
+            meal_types = np.full(len(filtered), None, dtype=object)
+        if 'is_vegetarian' in filtered.columns:
+            is_meat_sorted = ~filtered['is_vegetarian'].to_numpy(dtype=bool)[similarity_sorted_indices]
+        else:
+            is_meat_sorted = np.zeros(len(filtered), dtype=bool)
         
         # For Omnivore: Track meat vs non-meat selection to ensure more meat
         is_omnivore = dietary_preferences and ('Omnivore' in dietary_preferences or dietary_preferences == 'Omnivore')
         meat_selected = 0
         veg_selected = 0
         target_meat_ratio = 0.65  # Aim for 65% meat, 35% vegetarian/vegan for omnivore
+        target_meat_count = int(num_meals * target_meat_ratio)
         
-        for idx in similarity_sorted_indices:
+        for position, idx in enumerate(similarity_sorted_indices.tolist()):
             if len(top_indices) >= num_meals:
                 break
-            meal_cuisine = filtered.iloc[idx]['cuisine']
-            meal_name = filtered.iloc[idx]['name']
-            meal_type = filtered.iloc[idx].get('meal_type', None) if has_meal_type else None
-            is_meat = not filtered.iloc[idx].get('is_vegetarian', True)
+            meal_cuisine = cuisines[position]
+            meal_type = meal_types[position]
+            is_meat = bool(is_meat_sorted[position])
+            count = len(top_indices)
             
             # For Omnivore: Prioritize meat if we don't have enough yet
-            if is_omnivore and len(top_indices) > 0:
-                target_meat_count = int(num_meals * target_meat_ratio)
+            if is_omnivore and count > 0:
                 needs_more_meat = meat_selected < target_meat_count
                 
                 # If we need more meat and this is meat, prioritize it (unless already have this meal type)
                 if needs_more_meat and is_meat:
-                    # Check if we should prioritize by meal type diversity first
                     if has_meal_type and meal_type and meal_type not in selected_meal_types:
                         # Different meal type is good
                         top_indices.append(idx)
@@ -274,7 +646,7 @@ class MealRecommenderML:
                         selected_cuisines.add(meal_cuisine)
                         selected_meal_types.add(meal_type)
                         continue
-                    elif meal_cuisine not in selected_cuisines or len(top_indices) < target_meat_count:
+                    elif meal_cuisine not in selected_cuisines or count < target_meat_count:
                         # Different cuisine or still need more meat
                         top_indices.append(idx)
                         meat_selected += 1
@@ -292,7 +664,6 @@ class MealRecommenderML:
                 
                 # If we have enough meat and this is veg, that's fine if diversity is good
                 if not needs_more_meat and not is_meat:
-                    # Check diversity first
                     if has_meal_type and meal_type and meal_type not in selected_meal_types:
                         top_indices.append(idx)
                         veg_selected += 1
@@ -308,31 +679,27 @@ class MealRecommenderML:
                         continue
             
             # Prioritize diversity - prefer different meal types first, then different cuisines
-            if len(top_indices) == 0:
+            if count == 0:
                 # Always take first (best match)
-                top_indices.append(idx)
+                take = True
                 selected_cuisines.add(meal_cuisine)
-                if meal_type:
-                    selected_meal_types.add(meal_type)
-                if is_omnivore:
-                    if is_meat:
-                        meat_selected += 1
-                    else:
-                        veg_selected += 1
             elif has_meal_type and meal_type and meal_type not in selected_meal_types:
                 # Prioritize different meal type (Breakfast, Lunch, Dinner)
-                top_indices.append(idx)
-                selected_meal_types.add(meal_type)
+                take = True
                 selected_cuisines.add(meal_cuisine)
-                if is_omnivore:
-                    if is_meat:
-                        meat_selected += 1
-                    else:
-                        veg_selected += 1
             elif meal_cuisine not in selected_cuisines:
                 # Prefer different cuisine for diversity
-                top_indices.append(idx)
+                take = True
                 selected_cuisines.add(meal_cuisine)
+            elif similarities[idx] > 0.5:
+                # If we need more meals and similarity is good, take it
+                # For omnivore, prefer meat if we don't have enough
+                take = (not is_omnivore or not is_meat or meat_selected < target_meat_count
+                        or veg_selected < num_meals - target_meat_count)
+            else:
+                take = False
+            if take:
+                top_indices.append(idx)
                 if meal_type:
                     selected_meal_types.add(meal_type)
                 if is_omnivore:
@@ -340,85 +707,47 @@ class MealRecommenderML:
                         meat_selected += 1
                     else:
                         veg_selected += 1
-            elif len(top_indices) < num_meals and similarities[idx] > 0.5:
-                # If we need more meals and similarity is good, take it
-                # For omnivore, prefer meat if we don't have enough
-                if is_omnivore and meat_selected < target_meat_count and is_meat:
-                    top_indices.append(idx)
-                    meat_selected += 1
-                    if meal_type:
-                        selected_meal_types.add(meal_type)
-                elif not is_omnivore or veg_selected < num_meals - target_meat_count or not is_meat:
-                    top_indices.append(idx)
-                    if meal_type:
-                        selected_meal_types.add(meal_type)
-                    if is_omnivore:
-                        if is_meat:
-                            meat_selected += 1
-                        else:
-                            veg_selected += 1
+        selected[top_indices] = True
         
         # If we still don't have enough and have meal types, try to fill with different meal types
         if has_meal_type and len(top_indices) < num_meals:
-            target_meal_types = ['Breakfast', 'Lunch', 'Dinner']
-            for target_type in target_meal_types:
+            for target_type in ['Breakfast', 'Lunch', 'Dinner']:
                 if len(top_indices) >= num_meals:
                     break
                 if target_type not in selected_meal_types:
-                    # Find best meal of this type
-                    for idx in similarity_sorted_indices:
-                        if idx not in top_indices and filtered.iloc[idx].get('meal_type') == target_type:
-                            top_indices.append(idx)
-                            selected_meal_types.add(target_type)
-                            break
+                    # Best meal of this type (candidates are in similarity order)
+                    of_type = np.flatnonzero((meal_types == target_type) & ~selected[similarity_sorted_indices])
+                    if len(of_type):
+                        idx = similarity_sorted_indices[of_type[0]]
+                        top_indices.append(idx)
+                        selected[idx] = True
+                        selected_meal_types.add(target_type)
         
         # If we still don't have enough, fill with remaining top similar meals
-        while len(top_indices) < num_meals and len(top_indices) < len(similarity_sorted_indices):
-            for idx in similarity_sorted_indices:
-                if idx not in top_indices:
-                    top_indices.append(idx)
-                    break
+        if len(top_indices) < num_meals:
+            remaining = similarity_sorted_indices[~selected[similarity_sorted_indices]]
+            top_indices.extend(remaining[:num_meals - len(top_indices)].tolist())
         
         # FORCE meal type diversity if we have meal_type column and need 3 meals
         if has_meal_type and num_meals == 3 and len(top_indices) >= 3:
             # Check if we have all 3 meal types
-            current_meal_types = set()
-            for idx in top_indices[:3]:
-                mt = filtered.iloc[idx].get('meal_type')
-                if mt:
-                    current_meal_types.add(mt)
+            row_types = filtered['meal_type'].to_numpy(dtype=object)
+            current_meal_types = {row_types[idx] for idx in top_indices[:3] if row_types[idx]}
             
             # If we don't have all 3 types, force it
             if len(current_meal_types) < 3:
-                target_types = ['Breakfast', 'Lunch', 'Dinner']
                 new_indices = []
-                used_indices = set()
+                used = np.zeros(len(similarity_sorted_indices), dtype=bool)
                 
-                # For each target type, find the best matching meal
-                for target_type in target_types:
-                    best_idx = None
-                    best_sim = -1
-                    
-                    # Find best match for this meal type
-                    for idx in similarity_sorted_indices:
-                        if idx in used_indices:
-                            continue
-                        mt = filtered.iloc[idx].get('meal_type')
-                        if mt == target_type:
-                            if similarities[idx] > best_sim:
-                                best_sim = similarities[idx]
-                                best_idx = idx
-                    
-                    if best_idx is not None:
-                        new_indices.append(best_idx)
-                        used_indices.add(best_idx)
-                    else:
-                        # Fallback to any available
-                        for idx in similarity_sorted_indices:
-                            if idx not in used_indices:
-                                new_indices.append(idx)
-                                used_indices.add(idx)
-                                break
+                # For each target type, take the best matching meal, else the best one left
+                for target_type in ['Breakfast', 'Lunch', 'Dinner']:
+                    available = np.flatnonzero(~used)
+                    if len(available) == 0:
+                        continue
+                    of_type = available[meal_types[available] == target_type]
+                    position = of_type[0] if len(of_type) else available[0]
+                    new_indices.append(similarity_sorted_indices[position])
+                    used[position] = True
                 
                 if len(new_indices) == 3:
                     top_indices = new_indices
@@ -432,16 +761,7 @@ class MealRecommenderML:
         # For 6 meals: Breakfast 18%, Mid-morning 15%, Lunch 25%, Afternoon 12%, Dinner 20%, Evening 10%
         # For other numbers: distribute evenly
         num_selected = len(selected_meals)
-        if num_selected == 3:
-            meal_distribution = [0.25, 0.40, 0.35]
-        elif num_selected == 4:
-            meal_distribution = [0.20, 0.20, 0.35, 0.25]
-        elif num_selected == 5:
-            meal_distribution = [0.20, 0.15, 0.30, 0.15, 0.20]
-        elif num_selected == 6:
-            meal_distribution = [0.18, 0.15, 0.25, 0.12, 0.20, 0.10]
-        else:
-            meal_distribution = [1.0/num_selected] * num_selected
+        meal_distribution = meal_distribution_for(num_selected)
         
         for idx in range(len(selected_meals)):
             # Scale each meal to its target distribution
@@ -455,16 +775,7 @@ class MealRecommenderML:
                 selected_meals.iloc[idx, selected_meals.columns.get_loc('fats')] = int(selected_meals.iloc[idx]['fats'] * scale_factor)
         
         # Format for frontend - assign meal types based on number of meals
-        # Standard meal types for different numbers
-        meal_types_map = {
-            3: ['Breakfast', 'Lunch', 'Dinner'],
-            4: ['Breakfast', 'Mid-morning Snack', 'Lunch', 'Dinner'],
-            5: ['Breakfast', 'Mid-morning Snack', 'Lunch', 'Afternoon Snack', 'Dinner'],
-            6: ['Breakfast', 'Mid-morning Snack', 'Lunch', 'Afternoon Snack', 'Dinner', 'Evening Snack']
-        }
-        
-        # Default meal types order
-        meal_types_order = meal_types_map.get(num_selected, ['Breakfast', 'Lunch', 'Dinner', 'Snack', 'Meal'])
+        meal_types_order = MEAL_TYPES_BY_COUNT.get(num_selected, DEFAULT_MEAL_TYPES)
         
         formatted_meals = []
         for i, (_, meal) in enumerate(selected_meals.iterrows()):
@@ -481,6 +792,7 @@ class MealRecommenderML:
                     meal_type = f'Meal {i+1}'
             
             formatted_meals.append({
+                'id': int(meal['fdc_id']),
                 'name': meal['name'],
                 'type': meal_type,
                 'protein': int(meal['protein']),
@@ -495,24 +807,64 @@ class MealRecommenderML:
         import joblib
         import os
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        snapshot = self.snapshot
+        # meal_features is a view of meals_df columns, so it is rebuilt on load
         joblib.dump({
-            'meals_df': self.meals_df,
-            'scaler': self.scaler,
-            'meal_features': self.meal_features,
-            'meal_features_scaled': self.meal_features_scaled,
-            'knn_model': self.knn_model,
+            'meals_df': snapshot.meals_df,
+            'scaler': snapshot.scaler,
+            'meal_features_scaled': snapshot.meal_features_scaled,
+            'knn_model': snapshot.knn_model,
+            'ingredient_index': snapshot.ingredient_index,
+            'embeddings': self._save_embeddings(snapshot, path),
+            'name_index': snapshot.name_index,
             'results': self.results
         }, path)
         print(f"✓ ML Meal Recommender saved to {path}")
     
+    def _save_embeddings(self, snapshot, path):
+        """Write embeddings next to the artifact; returns what the artifact stores about them"""
+        if snapshot.embeddings is None:
+            return None
+        import os
+        embeddings_path = os.path.splitext(path)[0] + '_embeddings.npy'
+        index = snapshot.embeddings.save(embeddings_path)
+        index['file'] = os.path.basename(embeddings_path)
+        return index
+    
     def load(self, path='models/meal_recommender_ml.joblib'):
         import joblib
         data = joblib.load(path)
-        self.meals_df = data['meals_df']
-        self.scaler = data['scaler']
-        self.meal_features = data['meal_features']
-        self.meal_features_scaled = data['meal_features_scaled']
-        self.knn_model = data['knn_model']
+        # Older artifacts were saved with object/int64 columns and float64 features
+        meals_df = compact_meals_df(data['meals_df'])
+        scaler = data['scaler']
+        meal_features_scaled = data.get('meal_features_scaled')
+        if scaler is None or not hasattr(scaler, 'mean_'):
+            # Repair unfitted scalers here rather than on the request path
+            print("⚠ Saved meal scaler is not fitted, refitting on the catalog")
+            scaler = StandardScaler().fit(meals_df[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+            meal_features_scaled = None
+        embeddings = None
+        embeddings_info = data.get('embeddings')
+        if embeddings_info:
+            import os
+            embeddings_path = os.path.join(os.path.dirname(path), embeddings_info['file'])
+            if os.path.exists(embeddings_path):
+                # Memory-mapped: pages are shared between worker processes and loaded on demand
+                embeddings = RecipeEmbeddings.load(embeddings_path, embeddings_info)
+            else:
+                print(f"⚠ Recipe embeddings file {embeddings_path} is missing, ingredient similarity disabled")
+        self.snapshot = MealSnapshot(meals_df, scaler, data['knn_model'], meal_features_scaled,
+                                     data.get('ingredient_index'), embeddings, data.get('name_index'))
         self.results = data['results']
         print(f"✓ ML Meal Recommender loaded from {path}")
-
+    
+    def save_store(self, path='models/meal_catalog.sqlite', artifact_sha256=None):
+        """Write the loaded catalog to a SQLite store"""
+        return MealStore.build(path, self.snapshot, artifact_sha256)
+    
+    def open_store(self, path='models/meal_catalog.sqlite'):
+        """Serve recommendations from a SQLite store; the catalog itself is not loaded"""
+        self.store = MealStore.open(path)
+        self.snapshot = None
+        print(f"✓ ML Meal Recommender serving from SQLite store {path} ({len(self.store)} meals)")
+        return self.store
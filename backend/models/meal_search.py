@@ -0,0 +1,165 @@
+import re
+from bisect import bisect_left
+import numpy as np
+
+_WORD = re.compile(r'[a-z0-9]+')
+# Sorts after every character a normalized name can contain
+_PREFIX_END = '\uffff'
+
+def normalize_name(name):
+    """Lowercase alphanumeric words separated by single spaces"""
+    return ' '.join(_WORD.findall(str(name).lower()))
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _csr(keys, values, num_keys):
+    """Group values by key: values[offsets[k]:offsets[k + 1]] belong to key k, in input order"""
+    keys = np.asarray(keys, dtype=np.int32)
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(num_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=num_keys), out=offsets[1:])
+    return offsets, np.asarray(values, dtype=np.int32)[order]
+
+class MealNameIndex:
+    """Autocomplete index over the distinct meal names of a catalog
+
+    Name ids are assigned in ranking order (shorter names first, then
+    alphabetical), so every posting list below is already sorted by rank and
+    the best matches are simply the smallest ids. Three structures back the
+    three match kinds, best first:
+      - prefix: sorted normalized names, binary searched for the query
+      - word: sorted distinct words; the words starting with a prefix form a
+        contiguous range whose name postings are one contiguous slice
+      - infix: trigram posting lists, intersected and then verified
+    """
+
+    def __init__(self, names, sorted_names, name_order, words, word_offsets, word_postings,
+                 trigrams, trigram_offsets, trigram_postings, row_name_ids, row_offsets, rows):
+        self.names = names
+        self.sorted_names = sorted_names
+        self.name_order = name_order
+        self.words = words
+        self.word_offsets = word_offsets
+        self.word_postings = word_postings
+        self.trigrams = trigrams
+        self.trigram_offsets = trigram_offsets
+        self.trigram_postings = trigram_postings
+        self.row_name_ids = row_name_ids
+        self.row_offsets = row_offsets
+        self.rows = rows
+
+    @classmethod
+    def build(cls, name_series):
+        """Build from the categorical name column of a meal catalog"""
+        categories = [str(name) for name in name_series.cat.categories]
+        normalized = [normalize_name(name) for name in categories]
+        rank = sorted(range(len(categories)), key=lambda i: (len(normalized[i]), normalized[i]))
+        code_to_id = np.empty(len(categories), dtype=np.int32)
+        code_to_id[rank] = np.arange(len(categories), dtype=np.int32)
+        names = [normalized[i] for i in rank]
+
+        # Full-name prefix search
+        name_order = sorted(range(len(names)), key=names.__getitem__)
+        sorted_names = [names[i] for i in name_order]
+
+        # Word prefix search
+        words = sorted({word for name in names for word in name.split()})
+        word_ids = {word: i for i, word in enumerate(words)}
+        keys, values = [], []
+        for name_id, name in enumerate(names):
+            for word in set(name.split()):
+                keys.append(word_ids[word])
+                values.append(name_id)
+        word_offsets, word_postings = _csr(keys, values, len(words))
+
+        # Infix search
+        trigrams = {}
+        keys, values = [], []
+        for name_id, name in enumerate(names):
+            for trigram in _trigrams(name):
+                keys.append(trigrams.setdefault(trigram, len(trigrams)))
+                values.append(name_id)
+        trigram_offsets, trigram_postings = _csr(keys, values, len(trigrams))
+
+        # Catalog rows of each name
+        row_name_ids = code_to_id[name_series.cat.codes.to_numpy()]
+        row_offsets, rows = _csr(row_name_ids, np.arange(len(row_name_ids)), len(names))
+
+        return cls(names, sorted_names, np.array(name_order, dtype=np.int32), words, word_offsets,
+                   word_postings, trigrams, trigram_offsets, trigram_postings, row_name_ids, row_offsets, rows)
+
+    def allowed_names(self, allowed_rows):
+        """Names with at least one allowed catalog row"""
+        allowed = np.zeros(len(self.names), dtype=bool)
+        allowed[self.row_name_ids[allowed_rows]] = True
+        return allowed
+
+    def _prefix_ids(self, query):
+        lo = bisect_left(self.sorted_names, query)
+        hi = bisect_left(self.sorted_names, query + _PREFIX_END)
+        return np.sort(self.name_order[lo:hi])
+
+    def _word_ids(self, query):
+        marked = None
+        for word in query.split():
+            lo = bisect_left(self.words, word)
+            hi = bisect_left(self.words, word + _PREFIX_END)
+            postings = self.word_postings[self.word_offsets[lo]:self.word_offsets[hi]]
+            if marked is None:
+                marked = np.zeros(len(self.names), dtype=bool)
+                marked[postings] = True
+            else:
+                current = np.zeros(len(self.names), dtype=bool)
+                current[postings] = True
+                marked &= current
+        return np.flatnonzero(marked) if marked is not None else np.zeros(0, dtype=np.int64)
+
+    def _infix_candidates(self, query):
+        """Names containing every trigram of the query (a superset of the infix matches)"""
+        postings = []
+        for trigram in _trigrams(query):
+            trigram_id = self.trigrams.get(trigram)
+            if trigram_id is None:
+                return np.zeros(0, dtype=np.int32)
+            postings.append(self.trigram_postings[self.trigram_offsets[trigram_id]:self.trigram_offsets[trigram_id + 1]])
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        return candidates
+
+    def search(self, query, limit=10, allowed_names=None):
+        """Best matching name ids and match kinds, at most limit of them"""
+        query = normalize_name(query)
+        if not query:
+            return []
+        results = []
+        seen = set()
+
+        def take(ids, kind, verify=False):
+            if allowed_names is not None:
+                ids = ids[allowed_names[ids]]
+            for name_id in ids:
+                if len(results) >= limit:
+                    return
+                name_id = int(name_id)
+                if name_id in seen or (verify and query not in self.names[name_id]):
+                    continue
+                seen.add(name_id)
+                results.append((name_id, kind))
+
+        take(self._prefix_ids(query), 'prefix')
+        if len(results) < limit:
+            take(self._word_ids(query), 'word')
+        if len(results) < limit and len(query) >= 3:
+            # Exactly one trigram means every candidate contains the query
+            take(self._infix_candidates(query), 'infix', verify=len(query) > 3)
+        return results
+
+    def first_row(self, name_id, allowed_rows=None):
+        """First catalog row with this name (restricted to allowed rows if given)"""
+        rows = self.rows[self.row_offsets[name_id]:self.row_offsets[name_id + 1]]
+        if allowed_rows is not None:
+            rows = rows[allowed_rows[rows]]
+        return int(rows[0]) if len(rows) else None
@@ -0,0 +1,256 @@
+import atexit
+import itertools
+import threading
+import multiprocessing as mp
+import numpy as np
+from sklearn.preprocessing import normalize
+
+from models.ingredient_index import allergy_terms
+
+# Candidates kept by each shard, and again by the coordinator over all shards:
+# the best meals overall and the best meals of each meal type the diversity
+# selection looks for
+SHARD_TOP_K = 64
+SELECTION_MEAL_TYPES = ['Breakfast', 'Lunch', 'Dinner']
+
+def _top_k(scores, k):
+    """Positions of the k highest scores (unordered)"""
+    if len(scores) <= k:
+        return np.arange(len(scores))
+    return np.argpartition(-scores, k - 1)[:k]
+
+def _candidates(similarities, type_masks, k):
+    """Sorted positions of the top k similarities overall and within each meal type mask"""
+    picks = [_top_k(similarities, k)]
+    for type_mask in type_masks:
+        of_type = np.flatnonzero(type_mask)
+        picks.append(of_type[_top_k(similarities[of_type], k)])
+    return np.unique(np.concatenate(picks))
+
+def _type_masks(meal_types):
+    """Boolean mask per SELECTION_MEAL_TYPES over an array of meal types (none without the column)"""
+    if meal_types is None:
+        return []
+    return [meal_types == meal_type for meal_type in SELECTION_MEAL_TYPES]
+
+class MealShard:
+    """Scoring state for one contiguous slice [start, end) of a snapshot's catalog"""
+
+    def __init__(self, recommender, snapshot, start, end):
+        self.recommender = recommender
+        self.snapshot = snapshot
+        self.start = start
+        self.end = end
+        self.meals_df = snapshot.meals_df.iloc[start:end]
+        # Normalized like cosine_similarity does, so scores match the unsharded path
+        self.unit = normalize(np.asarray(snapshot.meal_features_scaled[start:end], dtype=np.float64))
+        self.is_vegetarian = self.meals_df['is_vegetarian'].to_numpy() if 'is_vegetarian' in self.meals_df.columns else None
+        meal_types = self.meals_df['meal_type'].to_numpy() if 'meal_type' in self.meals_df.columns else None
+        self.type_masks = _type_masks(meal_types)
+        self.mask_cache = {}
+
+    def preference_mask(self, dietary_preferences):
+        # Keyed on the normalized filters, so the cache holds one mask per filter set
+        key = self.recommender._preference_key(dietary_preferences)
+        mask = self.mask_cache.get(key)
+        if mask is None:
+            mask = self.recommender._preference_mask(dietary_preferences, self.meals_df)
+            self.mask_cache[key] = mask
+        return mask
+
+    def score(self, unit_target, dietary_preferences, use_preferences, exclude_terms, k):
+        """Catalog rows and boosted similarities of this shard's top candidates"""
+        if use_preferences:
+            mask = self.preference_mask(dietary_preferences).copy()
+        else:
+            mask = np.ones(self.end - self.start, dtype=bool)
+        index = self.snapshot.ingredient_index
+        for term in exclude_terms:
+            # Posting lists are sorted, so this shard's rows are one slice of each
+            posting = index.posting(term)
+            lo, hi = np.searchsorted(posting, [self.start, self.end])
+            mask[posting[lo:hi] - self.start] = False
+
+        rows = np.flatnonzero(mask)
+        similarities = self.unit[rows] @ unit_target
+        is_vegetarian = self.is_vegetarian[rows] if self.is_vegetarian is not None else None
+        self.recommender._boost_meat(similarities, is_vegetarian, dietary_preferences)
+
+        picks = _candidates(similarities, [type_mask[rows] for type_mask in self.type_masks], k)
+        return rows[picks] + self.start, similarities[picks]
+
+def _serve_shard(conn, recommender, snapshot, start, end):
+    """Worker process loop: answer (request id, arguments) messages for one shard until told to stop"""
+    shard = MealShard(recommender, snapshot, start, end)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        request_id, arguments = message
+        try:
+            conn.send((request_id, 'ok', shard.score(*arguments)))
+        except Exception as e:
+            conn.send((request_id, 'error', f'{type(e).__name__}: {e}'))
+    conn.close()
+
+class ShardDown(Exception):
+    """A shard worker process died or its pipe broke"""
+
+class ShardedMealRecommender:
+    """Scatter-gather meal recommendation over catalog shards owned by worker processes
+
+    The catalog of a loaded MealRecommenderML is split into num_shards
+    contiguous slices and each slice is scored by its own forked worker
+    process. A request is sent to every shard, which applies the dietary and
+    exclusion filters to its rows and returns its top candidates. The
+    coordinator merges them into one global top k overall and per meal type,
+    and runs the usual diversity selection on those candidates only.
+
+    A shard answers one request at a time: a request holds a shard's lock
+    from sending to it until its reply is read. Concurrent requests queue on
+    the locks and only overlap where one is still waiting on later shards
+    after another has been answered by the earlier ones. Messages carry a
+    request id, so a reply left in a pipe by a failed request is discarded
+    instead of being read as the next request's answer. A dead worker is
+    restarted and that request is scored in-process instead.
+    """
+
+    def __init__(self, recommender, num_shards):
+        snapshot = recommender.snapshot
+        if snapshot is None:
+            raise ValueError('Sharding needs a loaded meal catalog')
+        self.recommender = recommender
+        self.snapshot = snapshot
+        meals_df = snapshot.meals_df
+        self.meal_types = meals_df['meal_type'].to_numpy() if 'meal_type' in meals_df.columns else None
+        num_shards = max(1, min(num_shards, len(snapshot.meals_df)))
+        bounds = np.linspace(0, len(snapshot.meals_df), num_shards + 1).astype(int)
+        self.bounds = [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])]
+        # fork: workers share the parent's catalog pages instead of reloading the artifact
+        self.context = mp.get_context('fork')
+        self.connections = [None] * len(self.bounds)
+        self.processes = [None] * len(self.bounds)
+        for shard in range(len(self.bounds)):
+            self._start_shard(shard)
+        # One request at a time per pipe; a shard takes the next request as soon
+        # as its reply to the previous one has been read
+        self.locks = [threading.Lock() for _ in self.connections]
+        self.request_ids = itertools.count()
+        atexit.register(self.close)
+
+    def _start_shard(self, shard):
+        start, end = self.bounds[shard]
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_serve_shard,
+                                       args=(child_conn, self.recommender, self.snapshot, start, end), daemon=True)
+        process.start()
+        child_conn.close()
+        self.connections[shard] = parent_conn
+        self.processes[shard] = process
+
+    def _restart_shard(self, shard):
+        """Replace a dead shard worker (caller holds the shard's lock)"""
+        print(f"⚠ Meal shard {shard} worker died, restarting it")
+        try:
+            self.connections[shard].close()
+        except OSError:
+            pass
+        process = self.processes[shard]
+        if process.is_alive():
+            process.kill()
+        process.join(timeout=1)
+        self._start_shard(shard)
+
+    def _send(self, shard, message):
+        try:
+            self.connections[shard].send(message)
+        except (BrokenPipeError, EOFError, OSError) as e:
+            raise ShardDown(shard) from e
+
+    def _receive(self, shard, request_id):
+        """Reply of a shard to one request, skipping replies left over from failed requests"""
+        while True:
+            try:
+                reply_id, status, payload = self.connections[shard].recv()
+            except (EOFError, BrokenPipeError, OSError) as e:
+                raise ShardDown(shard) from e
+            if reply_id == request_id:
+                return status, payload
+
+    def __len__(self):
+        return len(self.processes)
+
+    def recommend_meals(self, calorie_goal, dietary_preferences, num_meals=3, exclude_ingredients=None, allergies=None):
+        """Same contract as MealRecommenderML.recommend_meals, scored across the shards"""
+        recommender = self.recommender
+        snapshot = self.snapshot
+        # If no meal matches the preferences, every meal is a candidate (as in recommend_meals)
+        use_preferences = bool(recommender._cached_preference_mask(dietary_preferences, snapshot).any())
+        terms = list(exclude_ingredients or []) + allergy_terms(allergies)
+        target = recommender._target_features_scaled(snapshot.scaler, calorie_goal, num_meals)
+        unit_target = normalize(target)[0]
+        k = max(SHARD_TOP_K, 16 * num_meals)
+        request = (unit_target, dietary_preferences, use_preferences, terms, k)
+
+        # Locks are taken in shard order, so concurrent requests cannot deadlock,
+        # and each one is released once its shard has replied
+        request_id = next(self.request_ids)
+        message = (request_id, request)
+        replies = []
+        down = []
+        acquired = released = 0
+        try:
+            for shard, lock in enumerate(self.locks):
+                lock.acquire()
+                acquired += 1
+                try:
+                    self._send(shard, message)
+                except ShardDown:
+                    down.append(shard)
+            for shard, lock in enumerate(self.locks):
+                if shard not in down:
+                    try:
+                        replies.append(self._receive(shard, request_id))
+                    except ShardDown:
+                        down.append(shard)
+                if shard in down:
+                    self._restart_shard(shard)
+                lock.release()
+                released += 1
+        finally:
+            for lock in self.locks[released:acquired]:
+                lock.release()
+        if down:
+            # The replies are incomplete: score this request without the shards
+            return recommender.recommend_meals(calorie_goal, dietary_preferences, num_meals=num_meals,
+                                               exclude_ingredients=exclude_ingredients, allergies=allergies,
+                                               snapshot=snapshot)
+        errors = [reply for status, reply in replies if status != 'ok']
+        if errors:
+            raise RuntimeError(f'Meal shard failed: {errors[0]}')
+
+        # Shards are contiguous and answered in order, so rows are already in catalog order
+        rows = np.concatenate([payload[0] for _, payload in replies])
+        similarities = np.concatenate([payload[1] for _, payload in replies])
+        if len(rows) == 0:
+            return []
+        meal_types = self.meal_types[rows] if self.meal_types is not None else None
+        picks = _candidates(similarities, _type_masks(meal_types), k)
+        rows, similarities = rows[picks], similarities[picks]
+        filtered = snapshot.meals_df.iloc[rows]
+        return recommender._diverse_selection(filtered, similarities, calorie_goal, dietary_preferences, num_meals)
+
+    def close(self):
+        for conn in self.connections:
+            try:
+                conn.send(None)
+                conn.close()
+            except (OSError, BrokenPipeError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+        self.connections = []
+        self.processes = []
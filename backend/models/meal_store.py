@@ -0,0 +1,187 @@
+import os
+import json
+import pickle
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+
+from models.ingredient_index import normalize_ingredient
+
+# Catalog columns copied into the store, in table order. Columns a catalog
+# does not have are stored as NULL and left out of queries.
+STORE_COLUMNS = ['fdc_id', 'name', 'category', 'cuisine', 'diet', 'meal_type', 'restrictions',
+                 'calories', 'protein', 'carbs', 'fats',
+                 'is_vegan', 'is_vegetarian', 'has_meat', 'has_dairy', 'has_egg']
+TEXT_COLUMNS = {'name', 'category', 'cuisine', 'diet', 'meal_type', 'restrictions'}
+FLAG_COLUMNS = {'is_vegan', 'is_vegetarian', 'has_meat', 'has_dairy', 'has_egg'}
+INSERT_BATCH_ROWS = 50000
+
+# Per-meal calorie window pushed down to SQL, as a share of the per-meal target
+CALORIE_WINDOW = 0.5
+# Fewer candidates than this inside the window and the window is dropped
+MIN_WINDOW_CANDIDATES = 200
+
+def _column_type(col):
+    if col in TEXT_COLUMNS:
+        return 'TEXT'
+    return 'INTEGER' if col in FLAG_COLUMNS or col == 'fdc_id' else 'REAL'
+
+SCHEMA = f"""
+CREATE TABLE meals (
+    row INTEGER PRIMARY KEY,
+    {', '.join(f'{col} {_column_type(col)}' for col in STORE_COLUMNS)},
+    features BLOB NOT NULL
+);
+-- Covers every dietary and calorie-window filter, so counting candidates never touches the table
+CREATE INDEX idx_meals_filters ON meals (is_vegan, is_vegetarian, diet, meal_type, calories,
+                                         has_meat, has_dairy, has_egg, restrictions);
+CREATE TABLE meal_terms (term TEXT NOT NULL, row INTEGER NOT NULL, PRIMARY KEY (term, row)) WITHOUT ROWID;
+CREATE TABLE meta (key TEXT PRIMARY KEY, value BLOB);
+"""
+
+def _placeholders(values):
+    return ', '.join('?' * len(values))
+
+class MealStore:
+    """Meal catalog in a SQLite file, queried with the recommender's filters
+
+    Rows keep their catalog positions (row), and each row stores its scaled
+    feature vector as a float32 BLOB, so candidates fetched from SQL score
+    exactly like the in-memory catalog. Ingredient terms live in meal_terms
+    for exclusion subqueries. Only the rows matching a request are ever read,
+    so a server using the store does not hold the catalog in memory.
+    """
+
+    def __init__(self, path, columns, scaler, artifact_sha256=None):
+        self.path = path
+        self.columns = columns
+        self.scaler = scaler
+        self.artifact_sha256 = artifact_sha256
+        self._local = threading.local()
+
+    @classmethod
+    def build(cls, path, snapshot, artifact_sha256=None):
+        """Write a snapshot's catalog, scaled features and ingredient terms to a new SQLite file"""
+        meals_df = snapshot.meals_df
+        columns = [col for col in STORE_COLUMNS if col in meals_df.columns]
+        tmp_path = path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript('PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;')
+            conn.executescript(SCHEMA)
+            features = np.ascontiguousarray(snapshot.meal_features_scaled, dtype=np.float32)
+            insert = f"INSERT INTO meals (row, {', '.join(columns)}, features) VALUES (?, {_placeholders(columns)}, ?)"
+            for start in range(0, len(meals_df), INSERT_BATCH_ROWS):
+                chunk = meals_df.iloc[start:start + INSERT_BATCH_ROWS]
+                values = []
+                for col in columns:
+                    if col in TEXT_COLUMNS:
+                        values.append(chunk[col].astype(str).tolist())
+                    elif col in FLAG_COLUMNS:
+                        values.append(chunk[col].astype(int).tolist())
+                    else:
+                        values.append(chunk[col].tolist())
+                rows = range(start, start + len(chunk))
+                blobs = [features[row].tobytes() for row in rows]
+                conn.executemany(insert, zip(rows, *values, blobs))
+
+            index = snapshot.ingredient_index
+            terms = sorted(index.vocabulary, key=index.vocabulary.get)
+            counts = np.diff(index.offsets)
+            conn.executemany('INSERT INTO meal_terms (term, row) VALUES (?, ?)',
+                             zip(np.repeat(np.array(terms, dtype=object), counts), index.postings.tolist()))
+
+            conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)', [
+                ('columns', json.dumps(columns)),
+                ('scaler', pickle.dumps(snapshot.scaler)),
+                ('artifact_sha256', artifact_sha256)
+            ])
+            conn.execute('ANALYZE')
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+        print(f"✓ Meal catalog store with {len(meals_df)} meals saved to {path}")
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path):
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            meta = dict(conn.execute('SELECT key, value FROM meta'))
+        finally:
+            conn.close()
+        return cls(path, json.loads(meta['columns']), pickle.loads(meta['scaler']), meta.get('artifact_sha256'))
+
+    def connection(self):
+        """Read-only connection for the calling thread (sqlite3 connections are per thread)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+            self._local.conn = conn
+        return conn
+
+    def preference_clause(self, filters):
+        """SQL condition and parameters for the filters from MealRecommenderML._preference_filters"""
+        conditions, params = [], []
+        if filters['vegan']:
+            if 'is_vegan' in self.columns:
+                conditions.append('is_vegan = 1')
+            conditions.append('has_meat = 0 AND has_dairy = 0 AND has_egg = 0')
+        if filters['vegetarian']:
+            if 'is_vegetarian' in self.columns:
+                conditions.append('is_vegetarian = 1')
+            conditions.append('has_meat = 0')
+        if filters['diets']:
+            conditions.append(f"diet IN ({_placeholders(filters['diets'])})")
+            params.extend(filters['diets'])
+        if filters['restrictions'] and 'restrictions' in self.columns:
+            conditions.append(f"restrictions IN ({_placeholders(filters['restrictions'])})")
+            params.extend(filters['restrictions'])
+        return conditions, params
+
+    def _count(self, conditions, params):
+        where = ' AND '.join(conditions) or '1'
+        return self.connection().execute(f'SELECT COUNT(*) FROM meals WHERE {where}', params).fetchone()[0]
+
+    def candidates(self, filters, target_calories, exclude_terms=None, min_candidates=MIN_WINDOW_CANDIDATES):
+        """Catalog rows and scaled features for a request, or None if exclusions remove every meal
+
+        Candidates are the meals allowed by the dietary filters whose calories
+        are within CALORIE_WINDOW of the per-meal target. The window is
+        dropped when it holds too few meals, and like the in-memory path the
+        dietary filters are dropped when no meal passes them.
+        """
+        preference, params = self.preference_clause(filters)
+        window = ['calories BETWEEN ? AND ?']
+        window_params = [target_calories * (1 - CALORIE_WINDOW), target_calories * (1 + CALORIE_WINDOW)]
+        exclusion, exclusion_params = [], []
+        terms = sorted({normalize_ingredient(term) for term in exclude_terms or []} - {''})
+        if terms:
+            exclusion = [f'row NOT IN (SELECT row FROM meal_terms WHERE term IN ({_placeholders(terms)}))']
+            exclusion_params = terms
+
+        if self._count(preference + window + exclusion, params + window_params + exclusion_params) >= min_candidates:
+            conditions, params = preference + window, params + window_params
+        elif not preference or self._count(preference, params) > 0:
+            conditions = preference
+        elif self._count(window + exclusion, window_params + exclusion_params) >= min_candidates:
+            conditions, params = window, window_params
+        else:
+            conditions, params = [], []
+
+        where = ' AND '.join(conditions + exclusion) or '1'
+        query = f"SELECT row, {', '.join(self.columns)}, features FROM meals WHERE {where} ORDER BY row"
+        filtered = pd.read_sql_query(query, self.connection(), params=params + exclusion_params)
+        if len(filtered) == 0:
+            return None
+        features = np.frombuffer(b''.join(filtered.pop('features')), dtype=np.float32).reshape(len(filtered), -1)
+        for col in FLAG_COLUMNS.intersection(self.columns):
+            filtered[col] = filtered[col].astype(bool)
+        return filtered.drop(columns='row'), features
+
+    def __len__(self):
+        return self._count([], [])
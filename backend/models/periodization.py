@@ -0,0 +1,75 @@
+import numpy as np
+
+# Program lengths accepted by WorkoutGeneratorML.generate_program
+MIN_WEEKS = 4
+MAX_WEEKS = 16
+# Weeks per block: loading weeks, then one deload week. Exercises rotate every block.
+BLOCK_WEEKS = 4
+
+# Starting sets and rep range by goal and experience level
+SETS_REPS = {
+    ('Muscle Gain', 'Beginner'): (3, 8, 10),
+    ('Muscle Gain', 'Advanced'): (4, 6, 8),
+    ('Muscle Gain', None): (3, 10, 12),
+    ('Weight Loss', None): (3, 12, 15),
+    (None, None): (3, 10, 10)
+}
+# Starting intensity (% of 1RM) by goal
+START_INTENSITY = {'Muscle Gain': 67.5, 'Weight Loss': 60.0, 'Endurance': 55.0}
+DEFAULT_INTENSITY = 62.5
+MAX_INTENSITY = 90.0
+
+# Progressive overload: intensity added per loading week and per block,
+# extra sets in each loading week of a block, reps dropped per block
+WEEK_INTENSITY_STEP = 2.5
+BLOCK_INTENSITY_STEP = 2.5
+LOADING_EXTRA_SETS = (0, 1, 1)
+BLOCK_REP_DROP = 1
+MIN_REPS = 4
+# Deload weeks: sets removed and intensity below the block's first week
+DELOAD_SETS = 1
+DELOAD_INTENSITY_DROP = 10.0
+# Isolation exercises work in a higher rep range than compound ones
+ISOLATION_EXTRA_REPS = 2
+# Zone 2 cardio minutes: first week, added per loading week and per block, cap and deload
+CARDIO_MINUTES = 30
+CARDIO_WEEK_STEP = 5
+CARDIO_BLOCK_STEP = 5
+MAX_CARDIO_MINUTES = 60
+DELOAD_CARDIO_MINUTES = 20
+
+def sets_reps(goal, experience_level):
+    """(sets, low reps, high reps) a goal and experience level start from"""
+    for key in [(goal, experience_level), (goal, None), (None, None)]:
+        if key in SETS_REPS:
+            return SETS_REPS[key]
+
+def progression(goal, experience_level, weeks):
+    """Per-week load of a mesocycle as arrays of length weeks
+
+    Weeks come in blocks of BLOCK_WEEKS: every loading week adds intensity
+    and sets, every block starts heavier with fewer reps, and the last week
+    of each block is a deload.
+    """
+    sets, low, high = sets_reps(goal, experience_level)
+    week = np.arange(weeks)
+    block = week // BLOCK_WEEKS
+    in_block = week % BLOCK_WEEKS
+    deload = in_block == BLOCK_WEEKS - 1
+    loading_step = np.minimum(in_block, len(LOADING_EXTRA_SETS) - 1)
+
+    block_intensity = START_INTENSITY.get(goal, DEFAULT_INTENSITY) + BLOCK_INTENSITY_STEP * block
+    intensity = np.where(deload, block_intensity - DELOAD_INTENSITY_DROP,
+                         block_intensity + WEEK_INTENSITY_STEP * loading_step)
+    rep_drop = np.minimum(BLOCK_REP_DROP * block, low - MIN_REPS)
+    cardio = np.minimum(CARDIO_MINUTES + CARDIO_BLOCK_STEP * block + CARDIO_WEEK_STEP * loading_step,
+                        MAX_CARDIO_MINUTES)
+    return {
+        'block': block,
+        'deload': deload,
+        'sets': np.where(deload, max(1, sets - DELOAD_SETS), sets + np.asarray(LOADING_EXTRA_SETS)[loading_step]),
+        'reps_low': low - rep_drop,
+        'reps_high': high - rep_drop,
+        'intensity': np.minimum(intensity, MAX_INTENSITY),
+        'cardio_minutes': np.where(deload, DELOAD_CARDIO_MINUTES, cardio)
+    }
@@ -0,0 +1,162 @@
+import os
+import numpy as np
+import pandas as pd
+import joblib
+
+# Histogram grid of each metric: (lowest value, highest value, bin width).
+# Values outside the grid fall in the first or last bin.
+METRIC_BINS = {
+    'height': (100.0, 230.0, 0.5),  # cm
+    'weight': (20.0, 250.0, 0.5),  # kg
+    'bmi': (10.0, 70.0, 0.1)
+}
+GENDERS = ['Male', 'Female']
+ALL = 'All'
+INCH_CM = 2.54
+POUND_KG = 0.45359237
+
+def normalize_gender(gender):
+    """'Male', 'Female' or ALL for anything else"""
+    key = str(gender or '').strip().lower()
+    if key in ('male', 'm', 'man'):
+        return 'Male'
+    if key in ('female', 'f', 'woman'):
+        return 'Female'
+    return ALL
+
+def _body_rows(heights_weights_df=None, body_index_df=None):
+    """gender / height (cm) / weight (kg) rows from dataset1.csv and dataset4.csv"""
+    frames = []
+    if heights_weights_df is not None and len(heights_weights_df) > 0:
+        # dataset1.csv has no gender, in inches and pounds (and a BOM on the first header)
+        columns = {col.strip('﻿ ').lower(): col for col in heights_weights_df.columns}
+        frames.append(pd.DataFrame({
+            'gender': ALL,
+            'height': pd.to_numeric(heights_weights_df[columns['height(inches)']], errors='coerce') * INCH_CM,
+            'weight': pd.to_numeric(heights_weights_df[columns['weight(pounds)']], errors='coerce') * POUND_KG
+        }))
+    if body_index_df is not None and len(body_index_df) > 0:
+        frames.append(pd.DataFrame({
+            'gender': body_index_df['Gender'].map(normalize_gender),
+            'height': pd.to_numeric(body_index_df['Height'], errors='coerce'),
+            'weight': pd.to_numeric(body_index_df['Weight'], errors='coerce')
+        }))
+    if not frames:
+        return None
+    rows = pd.concat(frames, ignore_index=True)
+    rows = rows[(rows['height'] > 0) & (rows['weight'] > 0)]
+    rows['bmi'] = rows['weight'] / (rows['height'] / 100) ** 2
+    return rows
+
+class PopulationPercentiles:
+    """Height, weight and BMI percentiles by gender from cumulative histograms
+
+    Each (gender, metric) distribution is a fixed-width histogram whose
+    cumulative counts are precomputed, so a percentile is one bin index
+    computed from the value plus a linear interpolation inside the bin,
+    independent of the population size. The ALL group holds every row,
+    including the rows of unknown gender.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.cumulative = {}
+        self.sizes = {}
+        self.results = {}
+
+    def train(self, heights_weights_df=None, body_index_df=None):
+        """Build the histograms from dataset1.csv and/or dataset4.csv"""
+        rows = _body_rows(heights_weights_df, body_index_df)
+        if rows is None or len(rows) == 0:
+            print("⚠ No height/weight data available for population percentiles")
+            return False
+
+        for gender in GENDERS + [ALL]:
+            group = rows if gender == ALL else rows[rows['gender'] == gender]
+            if len(group) == 0:
+                continue
+            self.sizes[gender] = len(group)
+            for metric, (lo, hi, width) in METRIC_BINS.items():
+                num_bins = int(round((hi - lo) / width))
+                values = np.clip(group[metric].to_numpy(dtype=np.float64), lo, hi)
+                bins = np.minimum(((values - lo) // width).astype(np.int64), num_bins - 1)
+                counts = np.bincount(bins, minlength=num_bins)
+                self.counts[gender, metric] = counts.astype(np.int32)
+                self.cumulative[gender, metric] = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        self.results = {
+            'samples': {gender: int(size) for gender, size in self.sizes.items()},
+            'medians': {
+                gender: {metric: round(float(rows[metric].median() if gender == ALL else
+                                             rows.loc[rows['gender'] == gender, metric].median()), 2)
+                         for metric in METRIC_BINS}
+                for gender in self.sizes
+            }
+        }
+        print(f"✓ Population Percentiles Built:")
+        print(f"  - Samples: {self.results['samples']}")
+        return True
+
+    def _percentiles(self, gender, metric, values):
+        lo, hi, width = METRIC_BINS[metric]
+        counts = self.counts[gender, metric]
+        cumulative = self.cumulative[gender, metric]
+        position = (np.clip(values, lo, hi) - lo) / width
+        bins = np.minimum(position.astype(np.int64), len(counts) - 1)
+        inside = cumulative[bins] + counts[bins] * np.minimum(position - bins, 1.0)
+        return 100.0 * inside / cumulative[-1]
+
+    def percentiles(self, items):
+        """Percentiles for a batch of {'gender', 'height' (cm), 'weight' (kg)} items
+
+        Returns a list of dicts with the percentile of each metric given
+        (BMI needs both height and weight) within the item's gender, or
+        within everyone when the gender is unknown.
+        """
+        results = [None] * len(items)
+        by_gender = {}
+        for i, item in enumerate(items):
+            gender = normalize_gender(item.get('gender'))
+            if gender not in self.sizes:
+                gender = ALL
+            by_gender.setdefault(gender, []).append(i)
+
+        for gender, positions in by_gender.items():
+            heights = np.array([items[i].get('height') or np.nan for i in positions], dtype=np.float64)
+            weights = np.array([items[i].get('weight') or np.nan for i in positions], dtype=np.float64)
+            values = {'height': heights, 'weight': weights, 'bmi': weights / (heights / 100) ** 2}
+            metrics = {metric: self._percentiles(gender, metric, np.nan_to_num(metric_values))
+                       for metric, metric_values in values.items()}
+            for j, i in enumerate(positions):
+                result = {'gender': gender, 'sampleSize': self.sizes[gender]}
+                for metric, metric_values in values.items():
+                    if np.isfinite(metric_values[j]):
+                        result[metric] = {'value': round(float(metric_values[j]), 2),
+                                          'percentile': round(float(metrics[metric][j]), 1)}
+                results[i] = result
+        return results
+
+    def percentile(self, gender, height=None, weight=None):
+        """Percentiles of one person's height (cm), weight (kg) and BMI"""
+        return self.percentiles([{'gender': gender, 'height': height, 'weight': weight}])[0]
+
+    def save(self, path='models/population_percentiles.joblib'):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump({
+            'bins': METRIC_BINS,
+            'counts': self.counts,
+            'cumulative': self.cumulative,
+            'sizes': self.sizes,
+            'results': self.results
+        }, path)
+        print(f"✓ Model saved to {path}")
+
+    def load(self, path='models/population_percentiles.joblib'):
+        data = joblib.load(path)
+        if data.get('bins') != METRIC_BINS:
+            raise ValueError(f'{path} was built with different histogram bins, retrain it')
+        self.counts = data['counts']
+        self.cumulative = data['cumulative']
+        self.sizes = data['sizes']
+        self.results = data.get('results', {})
+        print(f"✓ Population percentiles loaded from {path}")
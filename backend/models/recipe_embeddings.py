@@ -0,0 +1,133 @@
+import os
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from models.ingredient_index import meal_terms
+
+EMBEDDING_DIM = 64
+CHUNK_ROWS = 50000
+# Rows used to fit the SVD and the coarse quantizer; the rest are only transformed
+FIT_SAMPLE_ROWS = 200000
+# Below this size a full scan is as fast as probing an inverted file
+MIN_IVF_ROWS = 5000
+
+def _terms(doc):
+    """Documents are already term lists (module-level so vectorizers pickle)"""
+    return doc
+
+def _embed_chunk(vectorizer, svd, docs):
+    vectors = svd.transform(vectorizer.transform(docs)).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+class RecipeEmbeddings:
+    """Dense ingredient embeddings with an inverted-file (IVF) ANN index
+
+    TF-IDF over each recipe's ingredient terms is reduced to unit-length
+    float32 vectors with truncated SVD, so a dot product is the cosine
+    similarity. Vectors are clustered with k-means and each cluster keeps a
+    posting list of its rows; a query scores only the rows of the nprobe
+    clusters whose centroids are closest.
+    """
+
+    def __init__(self, vectors, centroids=None, offsets=None, rows=None):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+
+    @classmethod
+    def build(cls, names, ingredient_lists=None, dim=EMBEDDING_DIM, n_jobs=-1, chunk_rows=CHUNK_ROWS):
+        """Embed every meal from its name and ingredients; None if there are too few terms"""
+        if ingredient_lists is None:
+            ingredient_lists = [None] * len(names)
+        docs = [sorted(meal_terms(name, ingredients)) for name, ingredients in zip(names, ingredient_lists)]
+        rng = np.random.default_rng(42)
+        sample = docs if len(docs) <= FIT_SAMPLE_ROWS else [docs[i] for i in rng.choice(len(docs), FIT_SAMPLE_ROWS, replace=False)]
+
+        vectorizer = TfidfVectorizer(analyzer=_terms, min_df=2 if len(docs) > 1000 else 1,
+                                     sublinear_tf=True, dtype=np.float32)
+        tfidf_sample = vectorizer.fit_transform(sample)
+        dim = min(dim, tfidf_sample.shape[1] - 1, len(sample) - 1)
+        if dim < 2:
+            return None
+        svd = TruncatedSVD(n_components=dim, random_state=42)
+        svd.fit(tfidf_sample)
+
+        chunks = Parallel(n_jobs=n_jobs)(
+            delayed(_embed_chunk)(vectorizer, svd, docs[start:start + chunk_rows])
+            for start in range(0, len(docs), chunk_rows)
+        )
+        embeddings = cls(np.concatenate(chunks))
+        embeddings.build_ivf(rng)
+        return embeddings
+
+    def build_ivf(self, rng=None):
+        """Cluster the vectors into ~4*sqrt(n) lists for sub-linear search"""
+        n = len(self.vectors)
+        if n < MIN_IVF_ROWS:
+            self.centroids = self.offsets = self.rows = None
+            return
+        rng = rng if rng is not None else np.random.default_rng(42)
+        nlist = int(min(4096, 4 * np.sqrt(n)))
+        sample = self.vectors if n <= FIT_SAMPLE_ROWS else self.vectors[np.sort(rng.choice(n, FIT_SAMPLE_ROWS, replace=False))]
+        kmeans = MiniBatchKMeans(n_clusters=nlist, batch_size=4096, n_init=1, random_state=42).fit(sample)
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+        assignment = np.concatenate([
+            np.argmax(self.vectors[start:start + CHUNK_ROWS] @ centroids.T, axis=1)
+            for start in range(0, n, CHUNK_ROWS)
+        ])
+        self.rows = np.argsort(assignment, kind='stable').astype(np.int32)
+        self.offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=nlist), out=self.offsets[1:])
+        self.centroids = centroids
+
+    def search(self, query, k=10, allowed=None, nprobe=8):
+        """Rows and similarities of the k vectors closest to query, best first
+
+        allowed is an optional boolean mask over rows. If the probed clusters hold
+        fewer than k allowed rows the search falls back to a full scan.
+        """
+        rows = None
+        if self.centroids is not None:
+            nprobe = min(nprobe, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.concatenate([self.rows[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+            if allowed is not None:
+                rows = rows[allowed[rows]]
+            if len(rows) < k:
+                rows = None
+        if rows is None:
+            rows = np.flatnonzero(allowed) if allowed is not None else np.arange(len(self.vectors))
+        if len(rows) == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+
+        scores = self.vectors[rows] @ query
+        take = min(k, len(rows))
+        top = np.argpartition(-scores, take - 1)[:take]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return rows[top], scores[top]
+
+    def save(self, path):
+        """Write the vectors to a .npy file; returns the index arrays to store alongside"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Vectors memory-mapped from this very file are already on disk
+        mapped = isinstance(self.vectors, np.memmap) and os.path.abspath(self.vectors.filename) == os.path.abspath(path)
+        if not mapped:
+            # Replace the file instead of rewriting it: a running server may have it memory-mapped
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(self.vectors, dtype=np.float32))
+            os.replace(tmp_path, path)
+        return {'centroids': self.centroids, 'offsets': self.offsets, 'rows': self.rows}
+
+    @classmethod
+    def load(cls, path, index):
+        """Memory-map the vectors written by save()"""
+        vectors = np.load(path, mmap_mode='r')
+        return cls(vectors, index.get('centroids'), index.get('offsets'), index.get('rows'))
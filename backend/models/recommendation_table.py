@@ -0,0 +1,172 @@
+import os
+import json
+import mmap
+import struct
+import hashlib
+import numpy as np
+from joblib import Parallel, delayed
+
+# Quantized request grid. recommend_meals is deterministic in
+# (calorie_goal, dietary_preferences, num_meals), so every grid point can be
+# answered ahead of time.
+CALORIE_STEP = 50
+MIN_CALORIES = 1200
+MAX_CALORIES = 4000
+PREFERENCES = ['Omnivore', 'Vegetarian', 'Vegan', 'Keto', 'Low_Carb', 'Low_Sodium', 'Paleo', 'Mediterranean']
+MEAL_COUNTS = [3, 4, 5, 6]
+
+MAGIC = b'BBRT'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sII')  # magic, format version, header JSON length
+
+def artifact_fingerprint(path):
+    """SHA-256 of a model artifact"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def grid_keys(grid):
+    """Every (calorie_goal, preference, num_meals) of a grid, in file order"""
+    calories = range(grid['min_calories'], grid['max_calories'] + 1, grid['calorie_step'])
+    return [(c, p, n) for c in calories for p in grid['preferences'] for n in grid['meal_counts']]
+
+_worker_models = {}
+
+def _recommend_chunk(model_path, keys):
+    """Serialized recommendations for a chunk of grid keys (runs in a worker process)"""
+    from models.meal_recommender_ml import MealRecommenderML
+    model = _worker_models.get(model_path)
+    if model is None:
+        model = MealRecommenderML()
+        model.load(model_path)
+        # Workers are reused across chunks; keep one model per artifact
+        _worker_models.clear()
+        _worker_models[model_path] = model
+    return [
+        json.dumps(model.recommend_meals(calories, preference, num_meals=num_meals),
+                   separators=(',', ':'), sort_keys=True).encode()
+        for calories, preference, num_meals in keys
+    ]
+
+def materialize(model_path, table_path, n_jobs=-1, chunk_size=64):
+    """Precompute the whole grid from a saved model and write the table file
+
+    Returns a summary dict for the training results.
+    """
+    grid = {
+        'calorie_step': CALORIE_STEP,
+        'min_calories': MIN_CALORIES,
+        'max_calories': MAX_CALORIES,
+        'preferences': PREFERENCES,
+        'meal_counts': MEAL_COUNTS
+    }
+    keys = grid_keys(grid)
+    chunks = Parallel(n_jobs=n_jobs)(
+        delayed(_recommend_chunk)(model_path, keys[start:start + chunk_size])
+        for start in range(0, len(keys), chunk_size)
+    )
+    values = [value for chunk in chunks for value in chunk]
+
+    header = json.dumps({
+        'grid': grid,
+        'entries': len(values),
+        'artifact': os.path.basename(model_path),
+        'artifact_sha256': artifact_fingerprint(model_path)
+    }).encode()
+    offsets = np.zeros(len(values) + 1, dtype='<u8')
+    np.cumsum([len(value) for value in values], out=offsets[1:])
+
+    # Written to a temporary file and renamed, so a server that has the old
+    # table mapped keeps reading a complete file
+    os.makedirs(os.path.dirname(table_path) or '.', exist_ok=True)
+    tmp_path = table_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(offsets.tobytes())
+        for value in values:
+            f.write(value)
+    os.replace(tmp_path, table_path)
+    print(f"✓ Recommendation table with {len(values)} entries saved to {table_path}")
+    return {
+        'entries': len(values),
+        'empty_entries': sum(1 for value in values if value == b'[]'),
+        'file_mb': round(os.path.getsize(table_path) / 1e6, 3),
+        'artifact_sha256': json.loads(header)['artifact_sha256']
+    }
+
+class RecommendationTable:
+    """Read-only, memory-mapped table of precomputed meal recommendations
+
+    File layout: a fixed header, a JSON header describing the grid and the
+    model artifact it was built from, n + 1 little-endian uint64 offsets and
+    the concatenated JSON responses. The entry of a request is found by
+    arithmetic on its grid coordinates, so a lookup is one offset read and
+    one slice regardless of the table size.
+    """
+
+    def __init__(self, path, buffer, header, offsets, payload_start):
+        self.path = path
+        self.buffer = buffer
+        self.header = header
+        self.offsets = offsets
+        self.payload_start = payload_start
+        grid = header['grid']
+        self.calorie_step = grid['calorie_step']
+        self.min_calories = grid['min_calories']
+        self.num_calories = (grid['max_calories'] - grid['min_calories']) // grid['calorie_step'] + 1
+        self.preference_ids = {p: i for i, p in enumerate(grid['preferences'])}
+        self.meal_count_ids = {n: i for i, n in enumerate(grid['meal_counts'])}
+
+    @classmethod
+    def open(cls, path, artifact_path=None):
+        """Map a table file; None if it is missing, unreadable or built from a different artifact"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, header_len = _HEADER.unpack_from(buffer, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                print(f"⚠ {path} is not a recommendation table (version {version}), ignoring it")
+                return None
+            header = json.loads(buffer[_HEADER.size:_HEADER.size + header_len])
+            start = _HEADER.size + header_len
+            offsets = np.frombuffer(buffer, dtype='<u8', count=header['entries'] + 1, offset=start)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"⚠ Could not read recommendation table {path}: {e}")
+            return None
+
+        if artifact_path is not None:
+            if not os.path.exists(artifact_path) or artifact_fingerprint(artifact_path) != header['artifact_sha256']:
+                print(f"⚠ Recommendation table {path} was built from a different model, ignoring it "
+                      "(rerun train_models.py to rebuild it)")
+                return None
+        return cls(path, buffer, header, offsets, start + offsets.nbytes)
+
+    def key_index(self, calorie_goal, dietary_preferences, num_meals):
+        """Position of a request in the table, or None if it is off the grid"""
+        if isinstance(dietary_preferences, list) and len(dietary_preferences) == 1:
+            dietary_preferences = dietary_preferences[0]
+        if not isinstance(dietary_preferences, str):
+            return None
+        preference = self.preference_ids.get(dietary_preferences)
+        meals = self.meal_count_ids.get(num_meals)
+        step, remainder = divmod(calorie_goal - self.min_calories, self.calorie_step)
+        if preference is None or meals is None or remainder or not 0 <= step < self.num_calories:
+            return None
+        return (step * len(self.preference_ids) + preference) * len(self.meal_count_ids) + meals
+
+    def get(self, calorie_goal, dietary_preferences, num_meals):
+        """JSON bytes of the precomputed recommendations, or None for off-grid requests"""
+        index = self.key_index(calorie_goal, dietary_preferences, num_meals)
+        if index is None:
+            return None
+        start = self.payload_start + int(self.offsets[index])
+        end = self.payload_start + int(self.offsets[index + 1])
+        return self.buffer[start:end]
+
+    def __len__(self):
+        return self.header['entries']
@@ -0,0 +1,223 @@
+import re
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+
+LIFT_ALIASES = {
+    'squat': 'Squat', 'back squat': 'Squat',
+    'bench': 'Bench Press', 'bench press': 'Bench Press',
+    'deadlift': 'Deadlift', 'dead lift': 'Deadlift'
+}
+# Best-of-three columns of an OpenPowerlifting export, one row per lift
+OPENPOWERLIFTING_LIFTS = {'Best3SquatKg': 'Squat', 'Best3BenchKg': 'Bench Press', 'Best3DeadliftKg': 'Deadlift'}
+
+# Federation-style age bands: (first age of the band, label)
+AGE_BANDS = [(0, 'Sub-Junior'), (19, 'Junior'), (24, 'Open'), (40, 'Masters 1'),
+             (50, 'Masters 2'), (60, 'Masters 3'), (70, 'Masters 4')]
+ALL = 'All'
+# Groups smaller than this fall back to a wider group (all ages, then all weight classes)
+MIN_GROUP_SIZE = 20
+CHUNK_ROWS = 500000
+STANDARD_PERCENTILES = [50, 75, 90, 95]
+
+_BAND_STARTS = [start for start, _ in AGE_BANDS]
+_CLASS_LIMIT = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*(\+)?')
+
+def normalize_lift(name):
+    """Canonical lift name ('Squat', 'Bench Press', 'Deadlift') or None"""
+    key = ' '.join(str(name).lower().replace('_', ' ').replace('-', ' ').split())
+    return LIFT_ALIASES.get(key)
+
+def normalize_weight_class(value):
+    """'93', '93 kg' and '93kg' become '93 kg', '120+' becomes '120+ kg'; other labels are kept"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    match = _CLASS_LIMIT.match(str(value))
+    if not match:
+        return str(value).strip() or None
+    limit = float(match.group(1))
+    limit = int(limit) if limit.is_integer() else limit
+    return f"{limit}{'+' if match.group(2) else ''} kg"
+
+def _class_limit(weight_class):
+    """Upper bodyweight limit of a class, inf for open-ended classes"""
+    match = _CLASS_LIMIT.match(weight_class)
+    if not match or match.group(2):
+        return np.inf
+    return float(match.group(1))
+
+def age_band(age):
+    """Age band label for an age, or None if the age is unknown"""
+    if age is None or pd.isna(age):
+        return None
+    return AGE_BANDS[max(0, bisect_right(_BAND_STARTS, float(age)) - 1)][1]
+
+def _age_bands(ages):
+    starts = np.array([start for start, _ in AGE_BANDS], dtype=np.float64)
+    labels = np.array([label for _, label in AGE_BANDS] + [ALL], dtype=object)
+    ages = pd.to_numeric(ages, errors='coerce').to_numpy(dtype=np.float64)
+    positions = np.maximum(np.searchsorted(starts, ages, side='right') - 1, 0)
+    # Unknown ages only count towards the all-ages groups
+    positions[np.isnan(ages)] = len(AGE_BANDS)
+    return labels[positions]
+
+def _lift_rows(chunk):
+    """lift / weight_class / age_band / amount rows from a chunk of either CSV layout"""
+    if 'Lift Type' in chunk.columns:
+        rows = pd.DataFrame({
+            'lift': chunk['Lift Type'].map(normalize_lift),
+            'weight_class': chunk['Weight Class'],
+            'age': chunk['Age'],
+            'amount': pd.to_numeric(chunk['Amount Lifted (kg)'], errors='coerce')
+        })
+    else:
+        # OpenPowerlifting: one column per lift; negative values are failed attempts
+        rows = pd.concat([
+            pd.DataFrame({
+                'lift': lift,
+                'weight_class': chunk['WeightClassKg'],
+                'age': chunk['Age'] if 'Age' in chunk.columns else np.nan,
+                'amount': pd.to_numeric(chunk[column], errors='coerce')
+            })
+            for column, lift in OPENPOWERLIFTING_LIFTS.items() if column in chunk.columns
+        ], ignore_index=True)
+    rows = rows[rows['lift'].notna() & (rows['amount'] > 0)]
+    # Few distinct labels: normalize each once
+    classes = rows['weight_class'].astype('category')
+    rows['weight_class'] = classes.cat.rename_categories(
+        [normalize_weight_class(c) for c in classes.cat.categories]).astype(object)
+    rows['age_band'] = _age_bands(rows['age'])
+    return rows[rows['weight_class'].notna()]
+
+class StrengthStandards:
+    """Percentiles of lifted weight per (lift, weight class, age band)
+
+    Every group's lifts are kept as one sorted float32 array, stored back to
+    back in values (values[offsets[g]:offsets[g + 1]] for group g), so a
+    percentile is two binary searches. Groups also exist for all ages and
+    all weight classes of a lift, which small groups fall back to.
+    """
+
+    def __init__(self, groups, offsets, values, weight_classes):
+        self.groups = groups
+        self.offsets = offsets
+        self.values = values
+        self.weight_classes = weight_classes
+
+    @classmethod
+    def build(cls, chunks):
+        """Build from DataFrame chunks of powerlifting_dataset.csv or OpenPowerlifting rows"""
+        parts = {}
+        for chunk in chunks:
+            rows = _lift_rows(chunk)
+            for by_class in (True, False):
+                for by_age in (True, False):
+                    frame = pd.DataFrame({
+                        'lift': rows['lift'],
+                        'weight_class': rows['weight_class'] if by_class else ALL,
+                        'age_band': rows['age_band'] if by_age else ALL,
+                        'amount': rows['amount'].astype(np.float32)
+                    })
+                    if by_age:
+                        # Unknown ages only count towards the all-ages groups
+                        frame = frame[frame['age_band'] != ALL]
+                    for key, amounts in frame.groupby(['lift', 'weight_class', 'age_band'], sort=False)['amount']:
+                        parts.setdefault(key, []).append(amounts.to_numpy())
+        if not parts:
+            return None
+
+        groups = {}
+        offsets = [0]
+        values = []
+        for key in sorted(parts):
+            group = np.sort(np.concatenate(parts[key]))
+            groups[key] = len(groups)
+            values.append(group)
+            offsets.append(offsets[-1] + len(group))
+        weight_classes = sorted({key[1] for key in groups if key[1] != ALL}, key=_class_limit)
+        return cls(groups, np.array(offsets, dtype=np.int64), np.concatenate(values), weight_classes)
+
+    @classmethod
+    def from_csv(cls, path, chunksize=CHUNK_ROWS):
+        """Build from a CSV read in chunks, so exports with millions of rows fit in memory"""
+        header = pd.read_csv(path, nrows=0).columns
+        if 'Lift Type' in header:
+            usecols = ['Age', 'Weight Class', 'Lift Type', 'Amount Lifted (kg)']
+        else:
+            usecols = [col for col in ['Age', 'WeightClassKg', *OPENPOWERLIFTING_LIFTS] if col in header]
+        return cls.build(pd.read_csv(path, usecols=usecols, chunksize=chunksize, low_memory=False))
+
+    def weight_class_for(self, bodyweight):
+        """Lightest weight class whose limit is at least the bodyweight"""
+        for weight_class in self.weight_classes:
+            if bodyweight <= _class_limit(weight_class):
+                return weight_class
+        return None
+
+    def _resolve(self, lift, weight_class, bodyweight, band):
+        """Most specific group key with at least MIN_GROUP_SIZE lifts (the widest one otherwise)"""
+        lift = normalize_lift(lift)
+        if lift is None:
+            return None
+        weight_class = normalize_weight_class(weight_class)
+        if weight_class is None and bodyweight is not None:
+            weight_class = self.weight_class_for(float(bodyweight))
+        weight_class = weight_class or ALL
+        band = band or ALL
+        fallback = None
+        for key in [(lift, weight_class, band), (lift, weight_class, ALL), (lift, ALL, band), (lift, ALL, ALL)]:
+            group_id = self.groups.get(key)
+            if group_id is None:
+                continue
+            if self.offsets[group_id + 1] - self.offsets[group_id] >= MIN_GROUP_SIZE:
+                return key
+            fallback = key
+        return fallback
+
+    def percentile(self, lift, amount, weight_class=None, bodyweight=None, age=None):
+        """Percentile of one lift within its group; None if the lift is unknown"""
+        return self.percentiles([{'lift': lift, 'amount': amount, 'weightClass': weight_class,
+                                  'bodyweight': bodyweight, 'age': age}])[0]
+
+    def percentiles(self, items):
+        """Percentiles for a batch of {'lift', 'amount', 'weightClass' or 'bodyweight', 'age'} items
+
+        Items of the same group are answered with one vectorized searchsorted.
+        An item with an unknown lift or no matching group gives None.
+        """
+        results = [None] * len(items)
+        by_group = {}
+        resolved = {}
+        for i, item in enumerate(items):
+            # Batches repeat the same few lift / class / age combinations
+            raw = (item.get('lift', ''), item.get('weightClass'), item.get('bodyweight'), age_band(item.get('age')))
+            if raw not in resolved:
+                resolved[raw] = self._resolve(*raw)
+            key = resolved[raw]
+            if key is not None:
+                by_group.setdefault(key, []).append(i)
+
+        for key, positions in by_group.items():
+            group_id = self.groups[key]
+            values = self.values[self.offsets[group_id]:self.offsets[group_id + 1]]
+            amounts = np.array([float(items[i]['amount']) for i in positions], dtype=np.float32)
+            below = np.searchsorted(values, amounts, side='left')
+            at_most = np.searchsorted(values, amounts, side='right')
+            # Mid-rank: ties count half, so the median lift scores 50
+            percentiles = 100.0 * (below + at_most) / (2 * len(values))
+            standards = {f'p{q}': round(float(values[min(len(values) - 1, int(q / 100 * len(values)))]), 1)
+                         for q in STANDARD_PERCENTILES}
+            for i, percentile in zip(positions, percentiles):
+                results[i] = {
+                    'lift': key[0],
+                    'amount': float(items[i]['amount']),
+                    'percentile': round(float(percentile), 1),
+                    'weightClass': key[1],
+                    'ageBand': key[2],
+                    'sampleSize': len(values),
+                    'standards': standards
+                }
+        return results
+
+    def __len__(self):
+        return len(self.groups)
@@ -0,0 +1,171 @@
+import re
+import numpy as np
+
+# Weight of each muscle column in a muscle vector
+MUSCLE_COLUMN_WEIGHTS = {'Target_Muscles': 1.0, 'Synergist_Muscles': 0.5}
+# Added to the overlap when a stretch and an exercise share their Main_muscle region
+REGION_WEIGHT = 0.5
+WARMUP_STRETCHES = 3
+COOLDOWN_STRETCHES = 3
+WARMUP_DOSE = '1x20s/side'
+COOLDOWN_DOSE = '2x30s/side'
+
+# Main_muscle regions stretched for the muscle groups WorkoutGeneratorML plans days around
+DAY_MUSCLE_REGIONS = {
+    'Chest': ['Chest'],
+    'Shoulders': ['Shoulder'],
+    'Triceps': ['Upper Arms'],
+    'Biceps': ['Upper Arms', 'Forearm'],
+    'Quadriceps': ['Thighs'],
+    'Hamstrings': ['Thighs'],
+    'Glutes': ['Hips'],
+    'Calves': ['Calves'],
+    'Back': ['Back'],
+    'Lats': ['Back'],
+    'Core': ['Back', 'Hips'],
+    'Cardio': ['Thighs', 'Calves', 'Hips'],
+    'Full Body': ['Thighs', 'Hips', 'Back', 'Shoulder']
+}
+
+_WORD = re.compile(r'[a-z]+')
+# Words of the muscle lists that say which part, not which muscle
+_QUALIFIERS = {'none', 'nan', 'and', 'part', 'fibers', 'head', 'general', 'hands', 'closer', 'further',
+               'away', 'from', 'to', 'feet'}
+
+def muscle_words(text):
+    """Lowercase muscle words of a muscle list such as 'Deltoid, Anterior, Pectoralis Major'"""
+    return [word for word in _WORD.findall(str(text).lower()) if word not in _QUALIFIERS]
+
+def _clean_name(name):
+    return ' '.join(str(name).replace('​', ' ').split())
+
+class StretchRoutines:
+    """Warm-up and cool-down stretches matched to the muscles of a workout day
+
+    Stretches are indexed by Main_muscle, Target_Muscles and
+    Synergist_Muscles at build time, and the muscle overlap of every exercise
+    of the exercise dataset with every stretch is precomputed (TF-IDF weighted
+    muscle words, cosine similarity, plus a bonus for the same Main_muscle
+    region). Picking a day's stretches is then a sum of a few precomputed
+    rows and a sort over the stretches.
+    """
+
+    def __init__(self):
+        self.stretches = []
+        self.by_main_muscle = {}
+        self.by_muscle = {}
+        self.exercise_rows = {}
+        self.overlap = None
+        self.region_scores = {}
+
+    @classmethod
+    def build(cls, stretches_df, exercises_df):
+        routines = cls()
+        stretches_df = stretches_df.reset_index(drop=True)
+        regions = stretches_df['Main_muscle'].fillna('').astype(str).str.strip()
+        routines.stretches = [
+            {'name': _clean_name(name), 'main_muscle': region}
+            for name, region in zip(stretches_df['Exercise Name'], regions)
+        ]
+        for i, region in enumerate(regions):
+            routines.by_main_muscle.setdefault(region, []).append(i)
+
+        stretch_words = [cls._weighted_words(row) for _, row in stretches_df.iterrows()]
+        exercise_words = [cls._weighted_words(row) for _, row in exercises_df.iterrows()]
+        for i, words in enumerate(stretch_words):
+            for word in words:
+                routines.by_muscle.setdefault(word, []).append(i)
+
+        vocabulary = {word: j for j, word in enumerate(sorted({w for words in stretch_words for w in words}))}
+        # IDF over both datasets, so words every list mentions count for little
+        documents = stretch_words + exercise_words
+        document_counts = np.zeros(len(vocabulary))
+        for words in documents:
+            for word in words:
+                if word in vocabulary:
+                    document_counts[vocabulary[word]] += 1
+        idf = np.log((1 + len(documents)) / (1 + document_counts)) + 1
+
+        stretch_matrix = cls._unit_rows(stretch_words, vocabulary, idf)
+        exercise_matrix = cls._unit_rows(exercise_words, vocabulary, idf)
+        exercise_regions = exercises_df['Main_muscle'].fillna('').astype(str).str.strip().to_numpy()
+        same_region = exercise_regions[:, None] == regions.to_numpy()[None, :]
+        routines.overlap = (exercise_matrix @ stretch_matrix.T + REGION_WEIGHT * same_region).astype(np.float32)
+
+        # First row of each exercise name, for plans that only keep exercise records
+        for row, name in enumerate(exercises_df['Exercise Name'].astype(str)):
+            routines.exercise_rows.setdefault(name, row)
+        for muscle, muscle_regions in DAY_MUSCLE_REGIONS.items():
+            scores = np.zeros(len(routines.stretches), dtype=np.float32)
+            for region in muscle_regions:
+                scores[routines.by_main_muscle.get(region, [])] = REGION_WEIGHT
+            # Stretches naming the muscle itself (e.g. Hamstrings) rank above the rest of its region
+            for word in muscle_words(muscle):
+                scores[routines.by_muscle.get(word, [])] += REGION_WEIGHT
+            routines.region_scores[muscle] = scores
+        return routines
+
+    @staticmethod
+    def _weighted_words(row):
+        words = {}
+        for column, weight in MUSCLE_COLUMN_WEIGHTS.items():
+            for word in muscle_words(row.get(column, '')):
+                words[word] = max(words.get(word, 0), weight)
+        return words
+
+    @staticmethod
+    def _unit_rows(rows, vocabulary, idf):
+        matrix = np.zeros((len(rows), len(vocabulary)))
+        for i, words in enumerate(rows):
+            for word, weight in words.items():
+                j = vocabulary.get(word)
+                if j is not None:
+                    matrix[i, j] = weight * idf[j]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1)
+
+    def __len__(self):
+        return len(self.stretches)
+
+    def day_scores(self, exercise_names, day_muscles):
+        """Overlap of every stretch with a day's exercises and planned muscle groups"""
+        rows = [self.exercise_rows[name] for name in exercise_names if name in self.exercise_rows]
+        scores = self.overlap[rows].sum(axis=0) if rows else np.zeros(len(self.stretches), dtype=np.float32)
+        for muscle in day_muscles:
+            region_scores = self.region_scores.get(muscle)
+            if region_scores is not None:
+                scores = scores + region_scores
+        return scores
+
+    def routine(self, exercise_names, day_muscles, warmup=WARMUP_STRETCHES, cooldown=COOLDOWN_STRETCHES):
+        """Warm-up and cool-down stretch lists for a day
+
+        The warm-up takes the best stretch of each of the most relevant
+        regions, so it loosens every area the day trains; the cool-down
+        takes the best remaining stretches overall.
+        """
+        if not self.stretches:
+            return [], []
+        scores = self.day_scores(exercise_names, day_muscles)
+        order = np.argsort(-scores, kind='stable')
+        order = order[scores[order] > 0].tolist()
+
+        warmup_ids, regions = [], set()
+        for i in order:
+            if len(warmup_ids) == warmup:
+                break
+            if self.stretches[i]['main_muscle'] not in regions:
+                warmup_ids.append(i)
+                regions.add(self.stretches[i]['main_muscle'])
+        cooldown_ids = []
+        for i in order:
+            if len(cooldown_ids) == cooldown:
+                break
+            if i not in warmup_ids:
+                cooldown_ids.append(i)
+        return ([self._format(i, WARMUP_DOSE) for i in warmup_ids],
+                [self._format(i, COOLDOWN_DOSE) for i in cooldown_ids])
+
+    def _format(self, i, dose):
+        stretch = self.stretches[i]
+        return f"{stretch['name']} {stretch['main_muscle']} Stretch {dose}"
@@ -4,6 +4,21 @@ from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 import random
 
+from models.stretch_routines import StretchRoutines
+from models.workout_scheduler import RecoveryScheduler, CARDIO, MAX_EXERCISES_PER_DAY, seeded_uniforms
+from models.exercise_index import ExerciseBitmapIndex
+from models.exercise_substitutes import ExerciseSubstitutes
+from models.exercise_search import ExerciseSearchIndex
+from models.periodization import (progression, sets_reps, BLOCK_WEEKS, MIN_WEEKS, MAX_WEEKS,
+                                  ISOLATION_EXTRA_REPS)
+
+SPLIT_GOALS = ['Muscle Gain', 'Weight Loss', 'Endurance', 'General Fitness']
+# Users scheduled per array pass; bounds the (users x candidates) score arrays
+BATCH_CHUNK = 512
+# Program slot values that are not exercise rows
+EMPTY_SLOT = -1
+CARDIO_SLOT = -2
+
 class WorkoutGeneratorML:
     """ML-based workout generator using exercise dataset"""
     
@@ -11,9 +26,15 @@ class WorkoutGeneratorML:
         self.exercises_df = None
         self.scaler = StandardScaler()
         self.muscle_groups = None
+        self.stretch_routines = None
+        self.scheduler = None
+        self.exercise_index = None
+        self.substitutes = None
+        self.search_index = None
+        self.compound = None
         self.results = {}
         
-    def train(self, exercises_df):
+    def train(self, exercises_df, stretches_df=None):
         """Train workout generator on exercise dataset"""
         if exercises_df is None or len(exercises_df) == 0:
             print("⚠ No exercise data available for training")
@@ -42,6 +63,11 @@ class WorkoutGeneratorML:
             'muscle_groups': len(self.muscle_groups),
             'muscle_group_list': self.muscle_groups[:10]  # Top 10
         }
+        if stretches_df is not None:
+            self.attach_stretches(stretches_df)
+            self.results['stretches'] = len(self.stretch_routines)
+        self.build_search_index(stretches_df)
+        self._build_indexes()
         
         print(f"✓ ML Workout Generator Trained:")
         print(f"  - Exercises: {len(self.exercises_df)}")
@@ -49,21 +75,238 @@ class WorkoutGeneratorML:
         
         return True
     
-    def generate_workout_plan(self, goal, activity_level, experience_level='Moderate', days_per_week=5):
-        """Generate workout plan using ML-based exercise selection"""
-        if self.exercises_df is None or len(self.exercises_df) == 0:
+    def attach_stretches(self, stretches_df):
+        """Index stretches for warm-ups and cool-downs (also for models saved without them)"""
+        if stretches_df is None or len(stretches_df) == 0 or self.exercises_df is None:
+            return False
+        self.stretch_routines = StretchRoutines.build(stretches_df, self.exercises_df)
+        print(f"✓ Stretch routines indexed: {len(self.stretch_routines)} stretches")
+        return True
+    
+    def build_search_index(self, stretches_df=None):
+        """BM25 index over exercise (and stretch) names and instructions"""
+        if self.exercises_df is None:
+            return False
+        self.search_index = ExerciseSearchIndex.build(self.exercises_df, stretches_df)
+        print(f"✓ Exercise search indexed: {len(self.search_index)} exercises and stretches")
+        return True
+    
+    def search_exercises(self, query, limit=10, kind=None):
+        """Exercises and stretches matching a free-text query, best first"""
+        if self.search_index is None:
             return []
+        return self.search_index.search(query, limit=limit, kind=kind)
+    
+    def generate_workout_plan(self, goal, activity_level, experience_level='Moderate', days_per_week=5, seed=None,
+                              equipment=None, exclude_equipment=None, max_difficulty=None):
+        """Generate workout plan using ML-based exercise selection
+        
+        Exercises are chosen by the recovery scheduler, which avoids loading the
+        same muscles on consecutive days. Pass seed for a reproducible plan.
+        equipment / exclude_equipment (lists of equipment names) and
+        max_difficulty (1-5, defaults to the experience level's ceiling) restrict
+        the exercises that can be picked; picks they rule out are replaced by
+        allowed exercises with a similar muscle profile.
+        """
+        return self.generate_workout_plans_batch([{
+            'goal': goal,
+            'activity_level': activity_level,
+            'experience_level': experience_level,
+            'days_per_week': days_per_week,
+            'seed': seed,
+            'equipment': equipment,
+            'exclude_equipment': exclude_equipment,
+            'max_difficulty': max_difficulty
+        }])[0]
+    
+    def generate_workout_plans_batch(self, requests):
+        """Workout plans for many users at once, in request order
+        
+        Each request is a dict of generate_workout_plan's arguments. Requests
+        with the same goal, experience level, days per week and filters are
+        scheduled together: a single seeded_uniforms call draws every pick of
+        up to BATCH_CHUNK users over the precomputed candidate arrays. A
+        request's plan depends only on its own seed (random when omitted),
+        so it matches generate_workout_plan with that seed.
+        """
+        if self.exercises_df is None or len(self.exercises_df) == 0:
+            return [[] for _ in requests]
         
-        # Map goal to muscle groups and workout structure
-        goal_config = self._get_goal_config(goal)
-        experience_config = self._get_experience_config(experience_level)
+        random_seeds = np.random.default_rng().integers(0, 2 ** 63 - 1, size=len(requests))
+        groups = {}
+        for i, request in enumerate(requests):
+            key = (request.get('goal', 'General Fitness'),
+                   request.get('experience_level', 'Moderate'),
+                   int(request.get('days_per_week', 5)),
+                   tuple(request.get('equipment') or ()),
+                   tuple(request.get('exclude_equipment') or ()),
+                   request.get('max_difficulty'))
+            groups.setdefault(key, []).append(i)
         
+        plans = [None] * len(requests)
+        for (goal, experience_level, days_per_week, equipment, exclude_equipment, max_difficulty), positions in groups.items():
+            if max_difficulty is None:
+                max_difficulty = self._get_experience_config(experience_level)['difficulty']
+            allowed = self.allowed_exercises(equipment, exclude_equipment, max_difficulty)
+            split_days = self._get_split_days(goal)[:days_per_week]
+            draws = self.scheduler.draws(split_days)
+            seeds = [random_seeds[i] if requests[i].get('seed') is None else requests[i]['seed'] for i in positions]
+            for start in range(0, len(positions), BATCH_CHUNK):
+                uniforms = seeded_uniforms(seeds[start:start + BATCH_CHUNK], draws)
+                weeks = self.scheduler.schedule_batch(split_days, uniforms, allowed, self.substitutes)
+                for i, week in zip(positions[start:start + BATCH_CHUNK], weeks):
+                    plans[i] = self._format_plan(goal, experience_level, split_days, week)
+        return plans
+    
+    def _format_plan(self, goal, experience_level, split_days, week):
+        """Plan days (focus, exercise details, warm-up and cool-down) from scheduled rows"""
+        scheduler = self.scheduler
         workout_plan = []
+        for day_idx, (day_config, slots) in enumerate(zip(split_days, week)):
+            exercise_details = []
+            exercise_names = []
+            for slot in slots:
+                if slot is None:
+                    exercise_details.append('Zone 2 Cardio 30-45 min')
+                    continue
+                for row in slot:
+                    ex_name = scheduler.names[row]
+                    difficulty = scheduler.difficulty[row]
+                    exercise_details.append(f"{ex_name} {self._get_sets_reps(goal, experience_level, difficulty)}")
+                    exercise_names.append(ex_name)
+            exercise_details = exercise_details[:MAX_EXERCISES_PER_DAY]
+            
+            day_plan = {
+                'day': f'Day {day_idx + 1}',
+                'focus': day_config['focus'],
+                'details': exercise_details if exercise_details else ['No exercises found']
+            }
+            if self.stretch_routines is not None:
+                day_plan['warmup'], day_plan['cooldown'] = self.stretch_routines.routine(
+                    exercise_names[:MAX_EXERCISES_PER_DAY], day_config['muscles'])
+            workout_plan.append(day_plan)
+        
+        return workout_plan
+    
+    def generate_program(self, goal, activity_level, experience_level='Moderate', days_per_week=5, weeks=8,
+                         seed=None, equipment=None, exclude_equipment=None, max_difficulty=None):
+        """Periodized mesocycle of MIN_WEEKS to MAX_WEEKS weeks
+        
+        Weeks come in blocks of BLOCK_WEEKS (loading weeks and a deload, see
+        models.periodization). Each block gets its own exercises: all blocks
+        are scheduled in one schedule_batch call, one seed per block. The
+        program is then a week x day x slot array of exercise rows with the
+        week's sets, reps and intensity broadcast over it, serialized in a
+        single pass. Arguments are those of generate_workout_plan.
+        """
+        if not MIN_WEEKS <= weeks <= MAX_WEEKS:
+            raise ValueError(f'weeks must be between {MIN_WEEKS} and {MAX_WEEKS}')
+        if self.exercises_df is None or len(self.exercises_df) == 0:
+            return None
+        
+        if max_difficulty is None:
+            max_difficulty = self._get_experience_config(experience_level)['difficulty']
+        allowed = self.allowed_exercises(equipment, exclude_equipment, max_difficulty)
+        split_days = self._get_split_days(goal)[:days_per_week]
+        num_blocks = -(-weeks // BLOCK_WEEKS)
+        block_seeds = np.random.default_rng(seed).integers(0, 2 ** 63 - 1, size=num_blocks)
+        uniforms = seeded_uniforms(block_seeds, self.scheduler.draws(split_days))
+        block_weeks = self.scheduler.schedule_batch(split_days, uniforms, allowed, self.substitutes)
+        
+        # block x day x slot exercise rows, and each block day's stretches
+        slots = np.full((num_blocks, len(split_days), MAX_EXERCISES_PER_DAY), EMPTY_SLOT, dtype=np.int64)
+        routines = []
+        for block, week in enumerate(block_weeks):
+            block_routines = []
+            for day, (day_config, day_slots) in enumerate(zip(split_days, week)):
+                day_rows = []
+                for slot in day_slots:
+                    day_rows.extend([CARDIO_SLOT] if slot is None else slot)
+                day_rows = day_rows[:MAX_EXERCISES_PER_DAY]
+                slots[block, day, :len(day_rows)] = day_rows
+                if self.stretch_routines is not None:
+                    names = [self.scheduler.names[row] for row in day_rows if row >= 0]
+                    block_routines.append(self.stretch_routines.routine(names, day_config['muscles']))
+            routines.append(block_routines)
         
-        # Generate workout days based on goal
+        load = progression(goal, experience_level, weeks)
+        rows = slots[load['block']]
+        exercise = rows >= 0
+        isolation = exercise & ~self.compound[np.maximum(rows, 0)]
+        sets = np.broadcast_to(load['sets'][:, None, None], rows.shape)
+        reps_low = load['reps_low'][:, None, None] + ISOLATION_EXTRA_REPS * isolation
+        reps_high = load['reps_high'][:, None, None] + ISOLATION_EXTRA_REPS * isolation
+        intensity = np.broadcast_to(load['intensity'][:, None, None], rows.shape)
+        minutes = np.broadcast_to(load['cardio_minutes'][:, None, None], rows.shape)
+        
+        names = self.scheduler.names
+        entries = [
+            f"{names[row]} {s}x{low}{'' if low == high else f'-{high}'} @ {pct:g}%" if row >= 0 else
+            f"Zone 2 Cardio {m} min" if row == CARDIO_SLOT else None
+            for row, s, low, high, pct, m in zip(rows.ravel().tolist(), sets.ravel().tolist(),
+                                                 reps_low.ravel().tolist(), reps_high.ravel().tolist(),
+                                                 intensity.ravel().tolist(), minutes.ravel().tolist())
+        ]
+        
+        program = []
+        per_week = len(split_days) * MAX_EXERCISES_PER_DAY
+        for week in range(weeks):
+            block = int(load['block'][week])
+            days = []
+            for day, day_config in enumerate(split_days):
+                start = week * per_week + day * MAX_EXERCISES_PER_DAY
+                details = [entry for entry in entries[start:start + MAX_EXERCISES_PER_DAY] if entry is not None]
+                day_plan = {
+                    'day': f'Day {day + 1}',
+                    'focus': day_config['focus'],
+                    'details': details if details else ['No exercises found']
+                }
+                if routines[block]:
+                    day_plan['warmup'], day_plan['cooldown'] = routines[block][day]
+                days.append(day_plan)
+            program.append({
+                'week': week + 1,
+                'block': block + 1,
+                'phase': 'Deload' if load['deload'][week] else 'Loading',
+                'intensity': float(load['intensity'][week]),
+                'days': days
+            })
+        
+        return {
+            'goal': goal,
+            'experienceLevel': experience_level,
+            'weeks': weeks,
+            'daysPerWeek': len(split_days),
+            'program': program
+        }
+    
+    def allowed_exercises(self, equipment=None, exclude_equipment=None, max_difficulty=None):
+        """Boolean row mask of the exercises passing the filters (None when nothing is filtered)"""
+        if not equipment and not exclude_equipment and max_difficulty is None:
+            return None
+        bitmap = self.exercise_index.select(equipment=equipment, exclude_equipment=exclude_equipment,
+                                            max_difficulty=max_difficulty)
+        return self.exercise_index.mask(bitmap)
+    
+    def _build_indexes(self):
+        """Recovery scheduler, attribute bitmaps and substitutes over the exercise dataset"""
+        self.scheduler = RecoveryScheduler(self.exercises_df)
+        self.exercise_index = ExerciseBitmapIndex(self.exercises_df)
+        self.substitutes = ExerciseSubstitutes(self.exercises_df, self.exercise_index)
+        self.compound = (self.exercises_df['Mechanics'].fillna('').astype(str).str.strip() == 'Compound').to_numpy() \
+            if 'Mechanics' in self.exercises_df.columns else np.ones(len(self.exercises_df), dtype=bool)
+        # Precompute the candidate arrays of every planned muscle group
+        for goal in SPLIT_GOALS:
+            for day in self._get_split_days(goal):
+                for muscle in day['muscles']:
+                    if muscle != CARDIO:
+                        self.scheduler.candidates(muscle)
+    
+    def _get_split_days(self, goal):
+        """Weekly split for a goal: focus, muscle groups and exercises per muscle of each day"""
         if goal == 'Muscle Gain':
             # Push/Pull/Legs split
-            split_days = [
+            return [
                 {'focus': 'Upper Push', 'muscles': ['Chest', 'Shoulders', 'Triceps'], 'exercises_per_muscle': 2},
                 {'focus': 'Lower Strength', 'muscles': ['Quadriceps', 'Hamstrings', 'Glutes'], 'exercises_per_muscle': 2},
                 {'focus': 'Upper Pull', 'muscles': ['Back', 'Biceps', 'Lats'], 'exercises_per_muscle': 2},
@@ -72,7 +315,7 @@ class WorkoutGeneratorML:
             ]
         elif goal == 'Weight Loss':
             # Full body circuit
-            split_days = [
+            return [
                 {'focus': 'Full Body Circuit', 'muscles': ['Chest', 'Back', 'Quadriceps', 'Core'], 'exercises_per_muscle': 1},
                 {'focus': 'Cardio + Core', 'muscles': ['Core', 'Cardio'], 'exercises_per_muscle': 2},
                 {'focus': 'Upper Body + Intervals', 'muscles': ['Chest', 'Back', 'Shoulders'], 'exercises_per_muscle': 1},
@@ -81,7 +324,7 @@ class WorkoutGeneratorML:
             ]
         elif goal == 'Endurance':
             # Cardio-focused
-            split_days = [
+            return [
                 {'focus': 'Zone 2 Base', 'muscles': ['Cardio'], 'exercises_per_muscle': 1},
                 {'focus': 'Strength Maintenance', 'muscles': ['Full Body'], 'exercises_per_muscle': 2},
                 {'focus': 'Intervals', 'muscles': ['Cardio'], 'exercises_per_muscle': 1},
@@ -89,109 +332,18 @@ class WorkoutGeneratorML:
                 {'focus': 'Mobility + Easy', 'muscles': ['Core', 'Full Body'], 'exercises_per_muscle': 1}
             ]
         else:  # General Fitness
-            split_days = [
+            return [
                 {'focus': 'Full Body A', 'muscles': ['Chest', 'Back', 'Quadriceps', 'Core'], 'exercises_per_muscle': 1},
                 {'focus': 'Cardio 30-40', 'muscles': ['Cardio'], 'exercises_per_muscle': 1},
                 {'focus': 'Full Body B', 'muscles': ['Back', 'Shoulders', 'Hamstrings', 'Core'], 'exercises_per_muscle': 1},
                 {'focus': 'Intervals + Steps', 'muscles': ['Cardio', 'Core'], 'exercises_per_muscle': 1},
                 {'focus': 'Mobility + Core', 'muscles': ['Core', 'Full Body'], 'exercises_per_muscle': 1}
             ]
-        
-        # Generate exercises for each day
-        for day_idx, day_config in enumerate(split_days[:days_per_week]):
-            exercises = []
-            
-            for muscle in day_config['muscles']:
-                if muscle == 'Cardio':
-                    # Add cardio exercise
-                    exercises.append({
-                        'name': 'Zone 2 Cardio',
-                        'sets': '30-45 min',
-                        'reps': 'Steady pace',
-                        'rest': 'N/A'
-                    })
-                elif muscle == 'Core':
-                    # Get core exercises
-                    core_exercises = self._get_exercises_by_muscle(['Abdominals', 'Core', 'Obliques'], 
-                                                                   day_config['exercises_per_muscle'])
-                    exercises.extend(core_exercises)
-                elif muscle == 'Full Body':
-                    # Get full body exercises
-                    full_body_exercises = self._get_exercises_by_muscle(['Full Body', 'Compound'], 
-                                                                        day_config['exercises_per_muscle'])
-                    exercises.extend(full_body_exercises)
-                else:
-                    # Get exercises for specific muscle group
-                    muscle_exercises = self._get_exercises_by_muscle([muscle], 
-                                                                     day_config['exercises_per_muscle'])
-                    exercises.extend(muscle_exercises)
-            
-            # Format exercises
-            exercise_details = []
-            for ex in exercises[:8]:  # Limit to 8 exercises per day
-                if isinstance(ex, dict):
-                    if 'name' in ex:
-                        # Already formatted exercise
-                        exercise_details.append(f"{ex['name']} {ex.get('sets', '3x10')}")
-                    elif 'Exercise Name' in ex:
-                        # Exercise from dataset
-                        ex_name = ex.get('Exercise Name', 'Exercise')
-                        sets_reps = self._get_sets_reps(goal, experience_level, ex.get('Difficulty (1-5)', 3))
-                        exercise_details.append(f"{ex_name} {sets_reps}")
-                    else:
-                        # Generic dict, try to get name
-                        ex_name = ex.get('name', ex.get('exercise', 'Exercise'))
-                        sets_reps = self._get_sets_reps(goal, experience_level, ex.get('difficulty', 3))
-                        exercise_details.append(f"{ex_name} {sets_reps}")
-                elif isinstance(ex, str):
-                    exercise_details.append(ex)
-                else:
-                    # Fallback
-                    exercise_details.append('Exercise')
-            
-            workout_plan.append({
-                'day': f'Day {day_idx + 1}',
-                'focus': day_config['focus'],
-                'details': exercise_details if exercise_details else ['No exercises found']
-            })
-        
-        return workout_plan
-    
-    def _get_exercises_by_muscle(self, muscle_groups, num_exercises):
-        """Get exercises for specific muscle groups"""
-        exercises = []
-        
-        for muscle in muscle_groups:
-            # Find exercises that match muscle group (fuzzy match)
-            matching_exercises = self.exercises_df[
-                self.exercises_df['Main_muscle'].str.contains(muscle, case=False, na=False) |
-                self.exercises_df['Target_Muscles'].str.contains(muscle, case=False, na=False)
-            ]
-            
-            if len(matching_exercises) > 0:
-                # Select random exercises
-                selected = matching_exercises.sample(min(num_exercises, len(matching_exercises)))
-                exercises.extend(selected.to_dict('records'))
-        
-        # If no matches, get any exercises
-        if len(exercises) == 0:
-            exercises = self.exercises_df.sample(min(num_exercises * len(muscle_groups), len(self.exercises_df))).to_dict('records')
-        
-        return exercises
     
     def _get_sets_reps(self, goal, experience_level, difficulty):
         """Get sets and reps based on goal and experience"""
-        if goal == 'Muscle Gain':
-            if experience_level == 'Beginner':
-                return '3x8-10'
-            elif experience_level == 'Advanced':
-                return '4x6-8'
-            else:
-                return '3x10-12'
-        elif goal == 'Weight Loss':
-            return '3x12-15'
-        else:  # General Fitness or Endurance
-            return '3x10'
+        sets, low, high = sets_reps(goal, experience_level)
+        return f'{sets}x{low}-{high}' if low != high else f'{sets}x{low}'
     
     def _get_goal_config(self, goal):
         """Get configuration for fitness goal"""
@@ -206,8 +358,9 @@ class WorkoutGeneratorML:
     def _get_experience_config(self, experience_level):
         """Get configuration for experience level"""
         configs = {
-            'Beginner': {'difficulty': 1, 'complexity': 'low'},
-            'Moderate': {'difficulty': 3, 'complexity': 'moderate'},
+            # difficulty: hardest exercise (Difficulty (1-5)) picked by default
+            'Beginner': {'difficulty': 2, 'complexity': 'low'},
+            'Moderate': {'difficulty': 4, 'complexity': 'moderate'},
             'Advanced': {'difficulty': 5, 'complexity': 'high'}
         }
         return configs.get(experience_level, configs['Moderate'])
@@ -220,6 +373,8 @@ class WorkoutGeneratorML:
             'exercises_df': self.exercises_df,
             'exercises_by_muscle': self.exercises_by_muscle,
             'muscle_groups': self.muscle_groups,
+            'stretch_routines': self.stretch_routines,
+            'search_index': self.search_index,
             'results': self.results
         }, path)
         print(f"✓ ML Workout Generator saved to {path}")
@@ -230,6 +385,9 @@ class WorkoutGeneratorML:
         self.exercises_df = data['exercises_df']
         self.exercises_by_muscle = data['exercises_by_muscle']
         self.muscle_groups = data['muscle_groups']
+        self.stretch_routines = data.get('stretch_routines')
+        self.search_index = data.get('search_index')
         self.results = data['results']
+        self._build_indexes()
         print(f"✓ ML Workout Generator loaded from {path}")
 
@@ -0,0 +1,182 @@
+import numpy as np
+
+# Load an exercise puts on a muscle, by the column the muscle is listed in
+LOAD_COLUMNS = {'Target_Muscles': 1.0, 'Synergist_Muscles': 0.5, 'Stabilizer_Muscles': 0.25}
+# Share of a day's fatigue still present the next day
+RESIDUAL_FATIGUE = 0.5
+# How much residual fatigue on an exercise's muscles outweighs the random pick order
+FATIGUE_PENALTY = 2.0
+MAX_EXERCISES_PER_DAY = 8
+
+# Day muscle groups and the Main_muscle / Target_Muscles names they match
+DAY_MUSCLE_ALIASES = {
+    'Core': ['Abdominals', 'Core', 'Obliques'],
+    'Full Body': ['Full Body', 'Compound'],
+    'Shoulders': ['Shoulder', 'Deltoid'],
+    'Glutes': ['Gluteus'],
+    'Lats': ['Latissimus']
+}
+# Day entries that are not picked from the exercise dataset
+CARDIO = 'Cardio'
+
+def parse_muscles(text):
+    """Muscle names of a comma-separated muscle list ('None' and blanks dropped)"""
+    if not isinstance(text, str):
+        return []
+    names = [name.strip() for name in text.split(',')]
+    return [name for name in names if name and name.lower() != 'none']
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+def _mix(x):
+    """SplitMix64 finalizer over a uint64 array"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def seeded_uniforms(seeds, size):
+    """(len(seeds), size) float32 uniforms in [0, 1) from one counter-based draw
+
+    Row i depends only on seeds[i], so a user's picks are reproducible
+    whichever batch they are generated in.
+    """
+    seeds = np.asarray(seeds, dtype=np.int64).astype(np.uint64)
+    counters = np.arange(1, size + 1, dtype=np.uint64) * _GOLDEN
+    bits = _mix(_mix(seeds)[:, None] + counters[None, :])
+    return (bits >> np.uint64(40)).astype(np.float32) * np.float32(2.0 ** -24)
+
+class RecoveryScheduler:
+    """Chooses a week's exercises so the same muscles are not loaded on consecutive days
+
+    Every exercise has a row in an exercise x muscle load matrix (target,
+    synergist and stabilizer muscles with decreasing weights, rows summing to
+    one), and every day muscle group an array of candidate exercises. Picks
+    for a muscle slot are the candidates with the best random draw minus a
+    penalty for the fatigue their muscles still carry from earlier days.
+    """
+
+    def __init__(self, exercises_df):
+        self.names = exercises_df['Exercise Name'].astype(str).to_numpy()
+        self.main_muscles = exercises_df['Main_muscle'].fillna('').astype(str).to_numpy()
+        self.targets = exercises_df['Target_Muscles'].fillna('').astype(str).to_numpy()
+        self.difficulty = exercises_df['Difficulty (1-5)'].to_numpy()
+        # Variations share a name; a day never lists the same name twice
+        _, self.name_ids = np.unique(self.names, return_inverse=True)
+
+        muscles = {}
+        rows, cols, values = [], [], []
+        for column, weight in LOAD_COLUMNS.items():
+            if column not in exercises_df.columns:
+                continue
+            for row, text in enumerate(exercises_df[column]):
+                for muscle in parse_muscles(text):
+                    rows.append(row)
+                    cols.append(muscles.setdefault(muscle, len(muscles)))
+                    values.append(weight)
+        self.muscles = list(muscles)
+        load = np.zeros((len(self.names), max(1, len(muscles))), dtype=np.float32)
+        # A muscle listed in several columns keeps its highest weight
+        np.maximum.at(load, (rows, cols), values)
+        totals = load.sum(axis=1, keepdims=True)
+        self.load = load / np.where(totals > 0, totals, 1)
+        self._candidates = {}
+
+    def candidates(self, muscle):
+        """Rows of the exercises for a day muscle group (every exercise if none match)"""
+        rows = self._candidates.get(muscle)
+        if rows is None:
+            mask = np.zeros(len(self.names), dtype=bool)
+            for name in DAY_MUSCLE_ALIASES.get(muscle, [muscle]):
+                name = name.lower()
+                mask |= np.array([name in m.lower() or name in t.lower()
+                                  for m, t in zip(self.main_muscles, self.targets)], dtype=bool)
+            rows = np.flatnonzero(mask) if mask.any() else np.arange(len(self.names))
+            self._candidates[muscle] = rows = rows.astype(np.int32)
+        return rows
+
+    def draws(self, split_days):
+        """Random numbers a week needs: one per candidate of every muscle slot"""
+        return sum(len(self.candidates(muscle)) for day in split_days
+                   for muscle in day['muscles'] if muscle != CARDIO)
+
+    def schedule(self, split_days, seed, allowed=None, substitutes=None):
+        """Exercise rows per day of one week (see schedule_batch)"""
+        uniforms = seeded_uniforms([seed], self.draws(split_days))
+        return self.schedule_batch(split_days, uniforms, allowed, substitutes)[0]
+
+    def schedule_batch(self, split_days, uniforms, allowed=None, substitutes=None):
+        """Weeks for many users at once: per user, per day, a list of rows per
+        muscle slot (None for cardio slots)
+
+        uniforms holds one row of self.draws(split_days) random numbers per
+        user; every slot is ranked for all users with array operations over its
+        candidates. allowed is an optional boolean row mask (e.g. from
+        equipment filters). When it leaves a slot short of exercises, the best
+        unfiltered picks are replaced by the most similar allowed exercises
+        (ExerciseSubstitutes); without substitutes the slot keeps fewer
+        exercises. Without filters, a slot repeats names used earlier in the
+        day once its fresh candidates run out.
+        """
+        users = len(uniforms)
+        everyone = np.arange(users)
+        fatigue = np.zeros((users, self.load.shape[1]), dtype=np.float32)
+        num_names = self.name_ids.max() + 1 if len(self.names) else 0
+        weeks = [[] for _ in range(users)]
+        offset = 0
+        for day in split_days:
+            used = np.zeros((users, num_names), dtype=bool)
+            slots = []
+            for muscle in day['muscles']:
+                if muscle == CARDIO:
+                    slots.append(None)
+                    continue
+                count = day['exercises_per_muscle']
+                candidates = self.candidates(muscle)
+                candidate_names = self.name_ids[candidates]
+                scores = uniforms[:, offset:offset + len(candidates)] - FATIGUE_PENALTY * (fatigue @ self.load[candidates].T)
+                offset += len(candidates)
+                # Candidates whose name this slot has not picked yet, and those also fresh today
+                open_names = np.ones(scores.shape, dtype=bool)
+                fresh = ~used[:, candidate_names]
+                eligible = fresh if allowed is None else fresh & allowed[candidates]
+                picks = np.full((users, count), -1, dtype=np.int64)
+                for k in range(count):
+                    best = np.where(eligible & open_names, scores, -np.inf).argmax(axis=1)
+                    found = eligible[everyone, best] & open_names[everyone, best]
+                    if allowed is None and not found.all():
+                        # Fewer names than slots: repeat rather than leave the slot empty
+                        repeat = np.where(open_names, scores, -np.inf).argmax(axis=1)
+                        best = np.where(found, best, repeat)
+                        found = found | open_names[everyone, repeat]
+                    picks[found, k] = candidates[best[found]]
+                    open_names[found] &= candidate_names[None, :] != candidate_names[best[found]][:, None]
+                picked = picks >= 0
+                used[np.nonzero(picked)[0], self.name_ids[picks[picked]]] = True
+                if allowed is not None and substitutes is not None and not picked.all():
+                    self._substitute(picks, scores, candidates, used, allowed, substitutes)
+                slots.append(picks)
+
+            day_rows = np.concatenate([slot for slot in slots if slot is not None], axis=1) \
+                if any(slot is not None for slot in slots) else np.full((users, 0), -1)
+            valid = day_rows >= 0
+            counted = valid & (np.cumsum(valid, axis=1) <= MAX_EXERCISES_PER_DAY)
+            day_load = (self.load[np.where(counted, day_rows, 0)] * counted[:, :, None]).sum(axis=1)
+            fatigue = fatigue * RESIDUAL_FATIGUE + day_load
+            for user in range(users):
+                weeks[user].append([None if slot is None else [int(row) for row in slot[user] if row >= 0]
+                                    for slot in slots])
+        return weeks
+
+    def _substitute(self, picks, scores, candidates, used, allowed, substitutes):
+        """Fill the empty picks of a slot with allowed exercises similar to the best unfiltered candidates"""
+        for user in np.flatnonzero((picks < 0).any(axis=1)):
+            missing = np.flatnonzero(picks[user] < 0)
+            fresh = ~used[user, self.name_ids[candidates]]
+            ranked = candidates[fresh][np.argsort(-scores[user][fresh], kind='stable')]
+            _, first = np.unique(self.name_ids[ranked], return_index=True)
+            for row in ranked[np.sort(first)][:len(missing)]:
+                substitute = substitutes.best_allowed(row, allowed & ~used[user, self.name_ids])
+                if substitute is not None:
+                    picks[user, missing[0]] = substitute
+                    missing = missing[1:]
+                    used[user, self.name_ids[substitute]] = True
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.meal_recommender_ml import MealRecommenderML
+
+MEAL_WORDS = ['chicken', 'beef', 'tofu', 'salad', 'pasta', 'rice', 'egg', 'cheese', 'bean',
+              'soup', 'oat', 'apple', 'fish', 'yogurt']
+CUISINES = ['American', 'Italian', 'Mexican', 'Chinese', 'Indian']
+
+def synthetic_meals(n=3000, seed=0):
+    """Random meal catalog with the columns the USDA and PP_recipes loaders produce"""
+    rng = np.random.default_rng(seed)
+    names = [' '.join(rng.choice(MEAL_WORDS, 2)) + f' {i % 400}' for i in range(n)]
+    protein = rng.uniform(1, 40, n)
+    carbs = rng.uniform(1, 80, n)
+    fats = rng.uniform(1, 30, n)
+    is_vegetarian = rng.random(n) < 0.7
+    return pd.DataFrame({
+        'name': names,
+        'fdc_id': np.arange(n) + 1,
+        'calories': protein * 4 + carbs * 4 + fats * 9,
+        'protein': protein,
+        'carbs': carbs,
+        'fats': fats,
+        'diet': rng.choice(['Balanced', 'Low_Carb'], n),
+        'restrictions': rng.choice(['None', 'Low_Sodium'], n),
+        'is_vegetarian': is_vegetarian,
+        'is_vegan': is_vegetarian & (rng.random(n) < 0.5),
+        'has_meat': ~is_vegetarian,
+        'has_dairy': rng.random(n) < 0.2,
+        'has_egg': rng.random(n) < 0.1,
+        'category': 'Other',
+        'cuisine': rng.choice(CUISINES, n),
+        'meal_type': rng.choice(['Breakfast', 'Lunch', 'Dinner'], n),
+    })
+
+def trained_recommender(meals_df):
+    recommender = MealRecommenderML()
+    assert recommender.train(meals_df=meals_df)
+    return recommender
+
+@pytest.fixture(scope='session')
+def meals_df():
+    return synthetic_meals()
+
+@pytest.fixture(scope='session')
+def recommender(meals_df):
+    return trained_recommender(meals_df)
@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from conftest import MEAL_WORDS
+from models.lift_quality import LiftQualityClassifier, WINDOW
+from models.meal_plan_optimizer import MealPlanOptimizer
+from models.population_percentiles import PopulationPercentiles
+from utils.sensor_store import SENSOR_CHANNELS, SensorStore
+
+@pytest.fixture
+def meal_client(recommender, monkeypatch):
+    """Test client with the synthetic catalog loaded in memory"""
+    monkeypatch.setattr(app, 'meal_recommender_ml', recommender)
+    monkeypatch.setattr(app, 'meal_plan_optimizer', MealPlanOptimizer(recommender))
+    monkeypatch.setattr(app, 'meal_shards', None)
+    monkeypatch.setattr(app, 'recommendation_table', None)
+    return app.app.test_client()
+
+@pytest.fixture(scope='module')
+def server_models():
+    """Models and standards as the server loads them from the committed artifacts and datasets"""
+    app.load_models()
+
+def assert_error(response, status):
+    assert response.status_code == status
+    assert response.get_json()['error']
+
+# /api/meal-plan
+
+def test_meal_plan(meal_client):
+    response = meal_client.post('/api/meal-plan', json={'calorieGoal': 2200, 'numMeals': 3, 'days': 2})
+    assert response.status_code == 200
+    assert len(response.get_json()['days']) == 2
+
+@pytest.mark.parametrize('body', [
+    {'calorieGoal': 0},
+    {'calorieGoal': -100},
+    {'numMeals': 0},
+    {'numMeals': 7},
+    {'days': 0},
+    {'days': 29},
+    {'calorieGoal': 'lots'},
+])
+def test_meal_plan_rejects_invalid_requests(meal_client, body):
+    assert_error(meal_client.post('/api/meal-plan', json=body), 400)
+
+def test_meal_plan_without_eligible_meals_is_404(meal_client):
+    body = {'calorieGoal': 2000, 'days': 3, 'excludeIngredients': MEAL_WORDS}
+    assert_error(meal_client.post('/api/meal-plan', json=body), 404)
+
+def test_meal_plan_without_catalog_is_500(monkeypatch):
+    monkeypatch.setattr(app, 'meal_recommender_ml', None)
+    monkeypatch.setattr(app, 'meal_plan_optimizer', None)
+    assert_error(app.app.test_client().post('/api/meal-plan', json={'calorieGoal': 2000}), 500)
+
+# /api/meals/<id>/alternatives
+
+def test_meal_alternatives(meal_client):
+    for by in ['nutrition', 'ingredients']:
+        response = meal_client.get(f'/api/meals/1/alternatives?k=4&by={by}')
+        assert response.status_code == 200
+        alternatives = response.get_json()['alternatives']
+        assert len(alternatives) == 4
+        assert 1 not in [meal['id'] for meal in alternatives]
+
+@pytest.mark.parametrize('query', ['k=0', 'k=51', 'k=many', 'by=flavor'])
+def test_meal_alternatives_rejects_invalid_requests(meal_client, query):
+    assert_error(meal_client.get(f'/api/meals/1/alternatives?{query}'), 400)
+
+def test_meal_alternatives_of_unknown_meal_is_404(meal_client):
+    assert_error(meal_client.get('/api/meals/999999/alternatives'), 404)
+
+# /api/meals/search
+
+def test_meal_search(meal_client):
+    response = meal_client.get('/api/meals/search?q=chick&limit=5')
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 0 < len(results) <= 5
+    assert all('chicken' in meal['name'] for meal in results)
+
+@pytest.mark.parametrize('query', ['', 'q=', 'q=%20', 'q=rice&limit=0', 'q=rice&limit=51', 'q=rice&limit=all'])
+def test_meal_search_rejects_invalid_requests(meal_client, query):
+    assert_error(meal_client.get(f'/api/meals/search?{query}'), 400)
+
+# /api/strength-percentile
+
+def test_strength_percentile(server_models):
+    response = app.app.test_client().post('/api/strength-percentile', json={
+        'lift': 'Squat', 'amount': 150, 'bodyweight': 80, 'age': 28})
+    assert response.status_code == 200
+    assert 0 <= response.get_json()['percentile'] <= 100
+
+@pytest.mark.parametrize('body', [
+    {'amount': 150},
+    {'lift': 'Squat'},
+    {'lift': 'Squat', 'amount': 0},
+    {'lift': 'Squat', 'amount': 'heavy'},
+    [{'lift': 'Squat', 'amount': 150}],
+])
+def test_strength_percentile_rejects_invalid_lifts(server_models, body):
+    assert_error(app.app.test_client().post('/api/strength-percentile', json=body), 400)
+
+def test_strength_percentile_of_unknown_lift_is_404(server_models):
+    response = app.app.test_client().post('/api/strength-percentile', json={'lift': 'Curl', 'amount': 40})
+    assert_error(response, 404)
+
+def test_strength_percentile_batch(server_models):
+    response = app.app.test_client().post('/api/strength-percentile/batch', json={'lifts': [
+        {'lift': 'Deadlift', 'amount': 200, 'bodyweight': 90},
+        {'lift': 'Curl', 'amount': 40},
+        {'lift': 'Bench Press'},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 'percentile' in results[0]
+    assert 'error' in results[1] and 'error' in results[2]
+
+@pytest.mark.parametrize('body', [{}, {'lifts': {'lift': 'Squat', 'amount': 150}},
+                                  {'lifts': [{'lift': 'Squat', 'amount': 150}] * (app.MAX_STRENGTH_BATCH + 1)}])
+def test_strength_percentile_batch_rejects_invalid_requests(server_models, body):
+    assert_error(app.app.test_client().post('/api/strength-percentile/batch', json=body), 400)
+
+# /api/lift-quality
+
+@pytest.fixture(scope='module')
+def lift_quality_model():
+    """Classifier trained on two synthetic recordings, one per class"""
+    rng = np.random.default_rng(0)
+    n = 400
+    samples = np.concatenate([rng.normal(0, 1, (len(SENSOR_CHANNELS), n)),
+                              rng.normal(3, 2, (len(SENSOR_CHANNELS), n))], axis=1).astype(np.float32)
+    labels = np.repeat(np.array([0, 1], dtype=np.int8), n)
+    store = SensorStore(SENSOR_CHANNELS, ['A', 'B'], samples, labels, labels.astype(np.int32))
+    model = LiftQualityClassifier()
+    assert model.train(store)
+    return model
+
+@pytest.fixture
+def lift_client(lift_quality_model, monkeypatch):
+    monkeypatch.setattr(app, 'lift_quality_model', lift_quality_model)
+    return app.app.test_client()
+
+def test_lift_quality(lift_client):
+    samples = np.random.default_rng(1).normal(0, 1, (WINDOW * 2, len(SENSOR_CHANNELS))).tolist()
+    response = lift_client.post('/api/lift-quality', json={'samples': samples})
+    assert response.status_code == 200
+    assert response.get_json()['label'] == 'A'
+
+@pytest.mark.parametrize('samples', [
+    None,
+    [],
+    'belt',
+    [[0.0] * (len(SENSOR_CHANNELS) - 1)] * WINDOW,
+    [[float('nan')] * len(SENSOR_CHANNELS)] * WINDOW,
+    [[0.0] * len(SENSOR_CHANNELS)] * (WINDOW - 1),
+    [[0.0] * len(SENSOR_CHANNELS)] * (app.MAX_SENSOR_SAMPLES + 1),
+])
+def test_lift_quality_rejects_invalid_samples(lift_client, samples):
+    assert_error(lift_client.post('/api/lift-quality', json={'samples': samples}), 400)
+
+# /api/body-percentiles
+
+@pytest.fixture
+def body_client(monkeypatch):
+    rng = np.random.default_rng(0)
+    population = PopulationPercentiles()
+    assert population.train(body_index_df=pd.DataFrame({
+        'Gender': rng.choice(['Male', 'Female'], 500),
+        'Height': rng.normal(170, 10, 500),
+        'Weight': rng.normal(75, 12, 500)
+    }))
+    monkeypatch.setattr(app, 'population_percentiles', population)
+    return app.app.test_client()
+
+def test_body_percentiles(body_client):
+    response = body_client.post('/api/body-percentiles', json={'gender': 'Female', 'heightFeet': 5,
+                                                               'heightInches': 6, 'weight': 60})
+    assert response.status_code == 200
+    assert response.get_json()['height']['percentile'] is not None
+
+@pytest.mark.parametrize('body', [{}, {'gender': 'Male'}, {'height': 0}, {'weight': -70},
+                                  {'height': 'tall'}, [{'height': 170}]])
+def test_body_percentiles_rejects_invalid_measurements(body_client, body):
+    assert_error(body_client.post('/api/body-percentiles', json=body), 400)
+
+def test_body_percentiles_batch(body_client):
+    response = body_client.post('/api/body-percentiles/batch', json={'people': [
+        {'gender': 'Male', 'height': 180, 'weight': 80},
+        {'gender': 'Male'},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 'error' not in results[0] and 'error' in results[1]
+
+@pytest.mark.parametrize('body', [{}, {'people': {'height': 170}},
+                                  {'people': [{'height': 170}] * (app.MAX_BODY_BATCH + 1)}])
+def test_body_percentiles_batch_rejects_invalid_requests(body_client, body):
+    assert_error(body_client.post('/api/body-percentiles/batch', json=body), 400)
+
+# /api/exercises/<name>/substitutes
+
+def test_exercise_substitutes(server_models):
+    response = app.app.test_client().get('/api/exercises/Bench Press/substitutes?limit=3')
+    assert response.status_code == 200
+    substitutes = response.get_json()['substitutes']
+    assert 0 < len(substitutes) <= 3
+
+@pytest.mark.parametrize('query', ['limit=0', 'limit=21', 'limit=few', 'row=first'])
+def test_exercise_substitutes_rejects_invalid_requests(server_models, query):
+    assert_error(app.app.test_client().get(f'/api/exercises/Bench Press/substitutes?{query}'), 400)
+
+@pytest.mark.parametrize('path', ['/api/exercises/Barbell Bench Press/substitutes',
+                                  '/api/exercises/Bench Press/substitutes?row=9999'])
+def test_exercise_substitutes_of_unknown_exercise_is_404(server_models, path):
+    assert_error(app.app.test_client().get(path), 404)
+
+# /api/exercises/search
+
+def test_exercise_search(server_models):
+    response = app.app.test_client().get('/api/exercises/search?q=chest press&limit=5&type=exercise')
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 0 < len(results) <= 5
+
+@pytest.mark.parametrize('query', ['', 'q=', 'q=chest&limit=0', 'q=chest&limit=51', 'q=chest&limit=some',
+                                   'q=chest&type=cardio'])
+def test_exercise_search_rejects_invalid_requests(server_models, query):
+    assert_error(app.app.test_client().get(f'/api/exercises/search?{query}'), 400)
+
+# /api/workout-plan/batch
+
+def test_workout_plan_batch(server_models):
+    response = app.app.test_client().post('/api/workout-plan/batch', json={'requests': [
+        {'fitnessGoal': 'Strength', 'activityLevel': 'Active', 'seed': 1},
+        {'maxDifficulty': 9},
+        {'seed': 1, 'fitnessGoal': 'Strength', 'activityLevel': 'Active'},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 'plan' in results[0] and 'error' in results[1]
+    assert results[2] == results[0]
+
+@pytest.mark.parametrize('body', [{}, {'requests': {'seed': 1}}, {'requests': [{}] * (app.MAX_WORKOUT_BATCH + 1)}])
+def test_workout_plan_batch_rejects_invalid_requests(server_models, body):
+    assert_error(app.app.test_client().post('/api/workout-plan/batch', json=body), 400)
+
+# /api/workout-program
+
+def test_workout_program(server_models):
+    response = app.app.test_client().post('/api/workout-program', json={'weeks': 4, 'seed': 3})
+    assert response.status_code == 200
+    program = response.get_json()
+    assert program['weeks'] == 4 and len(program['program']) == 4
+
+@pytest.mark.parametrize('body', [
+    {'weeks': 3},
+    {'weeks': 17},
+    {'weeks': '8'},
+    {'weeks': True},
+    {'weeks': 8, 'maxDifficulty': 0},
+    {'weeks': 8, 'seed': -1},
+    [{'weeks': 8}],
+])
+def test_workout_program_rejects_invalid_requests(server_models, body):
+    assert_error(app.app.test_client().post('/api/workout-program', json=body), 400)
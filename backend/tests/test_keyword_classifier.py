@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.keyword_classifier import classify_names
+
+# Keyword lists of the per-keyword loops the classifier replaced
+OLD_MEAT = ['beef', 'chicken', 'pork', 'turkey', 'lamb', 'meat', 'bacon', 'sausage', 'ham', 'steak',
+            'fish', 'seafood', 'salmon', 'tuna', 'shrimp', 'poultry']
+OLD_USDA_DAIRY = ['cheese', 'milk', 'butter', 'cream', 'yogurt', 'whey', 'casein', 'dairy']
+OLD_EGG = ['egg', 'yolk']
+OLD_RECIPE_MEAT = OLD_MEAT + ['cod', 'pasta carbonara']
+OLD_RECIPE_DAIRY_EGG = ['cheese', 'milk', 'butter', 'cream', 'yogurt', 'dairy', 'parfait',
+                        'egg', 'eggs', 'scrambled', 'omelet', 'carbonara']
+OLD_BACKUP_DAIRY = ['cheese', 'milk', 'butter', 'cream', 'yogurt', 'dairy']
+OLD_CUISINES = [
+    ('Mexican', ['taco', 'burrito', 'quesadilla', 'enchilada', 'mexican']),
+    ('Italian', ['pasta', 'pizza', 'risotto', 'italian', 'spaghetti']),
+    ('Indian', ['curry', 'masala', 'naan', 'tikka', 'indian']),
+    ('Chinese', ['chow', 'fried rice', 'wonton', 'chinese', 'dim sum'])
+]
+
+def old_labels(name):
+    name = name.lower()
+    has = lambda keywords: any(keyword in name for keyword in keywords)
+    cuisine = next((cuisine for cuisine, keywords in OLD_CUISINES if has(keywords)), 'American')
+    return {
+        'cuisine': cuisine,
+        'has_meat': has(OLD_MEAT),
+        'has_dairy': has(OLD_BACKUP_DAIRY),
+        'has_egg': has(OLD_EGG),
+        'usda_meat': has(OLD_MEAT),
+        'usda_dairy': has(OLD_USDA_DAIRY),
+        'usda_egg': has(OLD_EGG),
+        'recipes_meat': has(OLD_RECIPE_MEAT),
+        'recipes_dairy_egg': has(OLD_RECIPE_DAIRY_EGG),
+    }
+
+def random_names(n, seed):
+    rng = np.random.default_rng(seed)
+    keywords = sorted({keyword for keywords in [OLD_RECIPE_MEAT, OLD_USDA_DAIRY, OLD_EGG, OLD_RECIPE_DAIRY_EGG]
+                       for keyword in keywords} | {keyword for _, keywords in OLD_CUISINES for keyword in keywords})
+    fillers = ['with', 'and', 'raw', 'Cooked', 'ham', 'hamburger', 'sandwich', 'eggplant', 'fishcake', 'rice', '']
+    names = []
+    for _ in range(n):
+        words = rng.choice(keywords + fillers, rng.integers(1, 5))
+        # Glue some words together so keywords also appear inside other words
+        name = ''.join(word + rng.choice([' ', '', ', ']) for word in words).strip()
+        names.append(name.upper() if rng.random() < 0.1 else name.title() if rng.random() < 0.3 else name)
+    return names
+
+@pytest.mark.parametrize('seed', range(4))
+def test_labels_match_per_keyword_loops(seed):
+    names = random_names(1000, seed)
+    labels = classify_names(names)
+    expected = pd.DataFrame([old_labels(name) for name in names])
+    pd.testing.assert_frame_equal(labels.reset_index(drop=True), expected[labels.columns], check_dtype=False)
+
+def test_categorical_names_match_plain_names():
+    names = random_names(500, seed=9) + [None]
+    plain = classify_names(pd.Series(names, dtype=object))
+    categorical = classify_names(pd.Series(names, dtype='category'))
+    pd.testing.assert_frame_equal(plain, categorical)
+    assert plain.iloc[-1]['cuisine'] == 'American'
+    assert not plain.iloc[-1][['has_meat', 'has_dairy', 'has_egg']].any()
+
+def test_longer_keywords_keep_labels_of_keywords_they_contain():
+    labels = classify_names(['Pasta Carbonara', 'Scrambled Eggs', 'Chicken Tikka Masala Pizza'])
+    assert labels['cuisine'].tolist() == ['Italian', 'American', 'Italian']
+    assert labels['recipes_meat'].tolist() == [True, False, True]
+    assert labels['recipes_dairy_egg'].tolist() == [True, True, False]
+    assert labels['has_egg'].tolist() == [False, True, False]
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.meal_recommender import MealRecommender
+
+def sorted_recommendations(meals_db, calorie_goal, dietary_preferences, cuisine_preference=None, num_meals=3):
+    """recommend_meals as it was before the calorie index: filter, then sort the whole database"""
+    filtered = meals_db.copy()
+    if cuisine_preference:
+        filtered = filtered[filtered['cuisine'] == cuisine_preference]
+    if dietary_preferences:
+        if 'Low_Sugar' in dietary_preferences or 'Low_Carb' in dietary_preferences:
+            filtered = filtered[filtered['diet'].isin(['Low_Carb', 'Balanced'])]
+        if 'Low_Sodium' in dietary_preferences:
+            filtered = filtered[filtered['restrictions'] == 'Low_Sodium']
+    if len(filtered) == 0:
+        filtered = meals_db.copy()
+    target_calories_per_meal = calorie_goal / num_meals
+    filtered['calorie_diff'] = abs(filtered['calories'] - target_calories_per_meal)
+    # Stable so meals with equal differences stay in database order
+    filtered = filtered.sort_values('calorie_diff', kind='stable')
+    return filtered.head(num_meals).to_dict('records')
+
+def random_meals_db(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'name': [f'Meal {i}' for i in range(n)],
+        # Few distinct calorie values so many meals tie on their difference
+        'calories': rng.integers(20, 80, n) * 10,
+        'protein': rng.integers(5, 50, n),
+        'carbs': rng.integers(5, 90, n),
+        'fats': rng.integers(2, 30, n),
+        'restrictions': rng.choice(['None', 'Low_Sodium'], n),
+        'cuisine': rng.choice(['Mexican', 'Chinese', 'Italian', 'Indian'], n),
+        'diet': rng.choice(['Balanced', 'Low_Carb', 'Low_Sodium'], n),
+    })
+
+PREFERENCES = [None, [], ['Low_Carb'], ['Low_Sugar'], ['Low_Sodium'], ['Low_Carb', 'Low_Sodium'], ['Vegan']]
+
+def assert_same_meals(recommender, calorie_goal, dietary_preferences, cuisine_preference, num_meals):
+    got = recommender.recommend_meals(calorie_goal, dietary_preferences, cuisine_preference, num_meals)
+    want = sorted_recommendations(recommender.meals_db, calorie_goal, dietary_preferences,
+                                  cuisine_preference, num_meals)
+    assert [meal['name'] for meal in got] == [meal['name'] for meal in want]
+    assert [meal['calorie_diff'] for meal in got] == pytest.approx([meal['calorie_diff'] for meal in want])
+
+@pytest.mark.parametrize('seed', range(5))
+def test_calorie_index_matches_full_sort(seed):
+    rng = np.random.default_rng(seed)
+    recommender = MealRecommender()
+    recommender.meals_db = random_meals_db(int(rng.integers(1, 300)), seed)
+    recommender._build_calorie_index()
+    for _ in range(60):
+        calorie_goal = float(rng.integers(300, 4000))
+        preferences = PREFERENCES[rng.integers(len(PREFERENCES))]
+        cuisine = rng.choice([None, 'Mexican', 'Chinese', 'Italian', 'Indian', 'Thai'])
+        num_meals = int(rng.integers(1, 8))
+        assert_same_meals(recommender, calorie_goal, preferences, cuisine, num_meals)
+
+def test_template_database_matches_full_sort():
+    recommender = MealRecommender()
+    recommender.create_meal_database(None)
+    for calorie_goal in range(900, 3600, 150):
+        for cuisine in [None, 'Mexican', 'Indian']:
+            for preferences in PREFERENCES:
+                for num_meals in [3, 4, 5, 6]:
+                    assert_same_meals(recommender, calorie_goal, preferences, cuisine, num_meals)
+
+def test_nearest_includes_ties_in_database_order():
+    recommender = MealRecommender()
+    sorted_calories = np.array([100.0, 200.0, 200.0, 300.0, 300.0])
+    rows = np.array([4, 1, 3, 0, 2])
+    picked = recommender._nearest(sorted_calories, rows, 250.0, 3)
+    assert picked == [(50.0, 0), (50.0, 1), (50.0, 2)]
+    assert recommender._nearest(sorted_calories, rows, 250.0, 10) == [
+        (50.0, 0), (50.0, 1), (50.0, 2), (50.0, 3), (150.0, 4)]
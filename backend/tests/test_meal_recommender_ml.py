@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import StandardScaler
+
+from conftest import synthetic_meals, trained_recommender
+from models.meal_recommender_ml import FEATURE_COLUMNS
+
+PREFERENCES = [None, ['Omnivore'], ['Vegetarian'], ['Vegan'], ['Keto'], ['Low_Carb'], ['Low_Sodium'], ['Paleo'],
+               ['Mediterranean'], ['Vegetarian', 'Low_Sodium']]
+
+def reference_recommendations(recommender, meals_df, calorie_goal, dietary_preferences, num_meals):
+    """Recommendations as computed before the compact schema and snapshots: float64
+    object-dtype catalog, a scaler fitted on it and the filtered features scaled per request"""
+    filtered = meals_df[recommender._preference_mask(dietary_preferences, meals_df)]
+    if len(filtered) == 0:
+        filtered = meals_df
+    target_calories_per_meal = calorie_goal / num_meals
+    target_features = np.array([[target_calories_per_meal, int(target_calories_per_meal * 0.25 / 4),
+                                 int(target_calories_per_meal * 0.50 / 4), int(target_calories_per_meal * 0.25 / 9)]])
+    scaler = StandardScaler().fit(meals_df[FEATURE_COLUMNS].values)
+    similarities = cosine_similarity(scaler.transform(target_features),
+                                     scaler.transform(filtered[FEATURE_COLUMNS].values))[0]
+    if dietary_preferences and 'Omnivore' in dietary_preferences:
+        for idx in range(len(similarities)):
+            if not filtered.iloc[idx]['is_vegetarian']:
+                similarities[idx] = min(1.0, similarities[idx] * 1.2)
+    return recommender._diverse_selection(filtered, similarities, calorie_goal, dietary_preferences, num_meals)
+
+def assert_same_recommendations(got, want):
+    assert [meal['id'] for meal in got] == [meal['id'] for meal in want]
+    assert [meal['name'] for meal in got] == [meal['name'] for meal in want]
+    assert [meal['type'] for meal in got] == [meal['type'] for meal in want]
+    for got_meal, want_meal in zip(got, want):
+        # Macros are truncated to ints after scaling, so float32 rounding can move them by one
+        for key in ['calories', 'protein', 'carbs', 'fats']:
+            assert abs(got_meal[key] - want_meal[key]) <= 1
+
+@pytest.mark.parametrize('dietary_preferences', PREFERENCES)
+def test_compact_snapshot_matches_reference(recommender, meals_df, dietary_preferences):
+    for calorie_goal in range(1200, 4001, 350):
+        for num_meals in [3, 4, 5, 6]:
+            got = recommender.recommend_meals(calorie_goal, dietary_preferences, num_meals)
+            want = reference_recommendations(recommender, meals_df, calorie_goal, dietary_preferences, num_meals)
+            assert_same_recommendations(got, want)
+
+def test_catalog_uses_compact_schema(recommender):
+    dtypes = recommender.meals_df.dtypes
+    assert all(dtypes[col] == np.float32 for col in FEATURE_COLUMNS)
+    assert str(dtypes['name']) == 'category'
+    assert str(dtypes['cuisine']) == 'category'
+    assert dtypes['fdc_id'] == np.int32
+
+def test_snapshot_is_immutable(recommender):
+    snapshot = recommender.snapshot
+    with pytest.raises(AttributeError):
+        snapshot.scaler = None
+    with pytest.raises(ValueError):
+        snapshot.meal_features_scaled[0, 0] = 0.0
+
+def test_requests_keep_their_snapshot_across_retraining():
+    recommender = trained_recommender(synthetic_meals(500, seed=1))
+    old_snapshot = recommender.snapshot
+    before = recommender.recommend_meals(2000, ['Vegetarian'], 3)
+
+    assert recommender.train(meals_df=synthetic_meals(500, seed=2))
+    assert recommender.snapshot is not old_snapshot
+    assert recommender.recommend_meals(2000, ['Vegetarian'], 3, snapshot=old_snapshot) == before
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+from sklearn.preprocessing import normalize
+
+from models.meal_shards import ShardedMealRecommender
+
+# Omnivore is left out: boosted scores capped at 1.0 tie, and tied meals may
+# be ordered differently once candidates are merged across shards
+PREFERENCES = [None, ['Vegetarian'], ['Vegan'], ['Keto'], ['Low_Carb'], ['Low_Sodium'], ['Mediterranean'],
+               ['Vegan', 'Low_Sodium']]
+EXCLUSIONS = [None, ['chicken'], ['rice', 'egg']]
+
+@pytest.fixture(scope='module')
+def shards(recommender):
+    sharded = ShardedMealRecommender(recommender, 4)
+    yield sharded
+    sharded.close()
+
+@pytest.mark.parametrize('dietary_preferences', PREFERENCES)
+def test_sharded_matches_in_memory(recommender, shards, dietary_preferences):
+    for calorie_goal in range(1200, 4001, 400):
+        for num_meals in [3, 4, 5, 6]:
+            for exclude in EXCLUSIONS:
+                assert shards.recommend_meals(calorie_goal, dietary_preferences, num_meals,
+                                              exclude_ingredients=exclude) == \
+                    recommender.recommend_meals(calorie_goal, dietary_preferences, num_meals,
+                                                exclude_ingredients=exclude)
+
+def test_allergies_are_excluded_like_in_memory(recommender, shards):
+    assert shards.recommend_meals(2200, ['Vegetarian'], 4, allergies=['Eggs', 'Dairy']) == \
+        recommender.recommend_meals(2200, ['Vegetarian'], 4, allergies=['Eggs', 'Dairy'])
+
+def test_concurrent_requests_get_their_own_replies(recommender, shards):
+    requests = [(1200 + 100 * i, PREFERENCES[i % len(PREFERENCES)], 3 + i % 4) for i in range(24)]
+    results = [None] * len(requests)
+
+    def run(i):
+        results[i] = shards.recommend_meals(*requests[i])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [recommender.recommend_meals(*request) for request in requests]
+
+def shards_request(recommender):
+    """Arguments of a valid shard scoring request"""
+    target = recommender._target_features_scaled(recommender.snapshot.scaler, 2000, 3)
+    return normalize(target)[0], None, True, [], 64
+
+def test_stale_replies_are_skipped(recommender, shards):
+    # A reply to an abandoned request is still in shard 0's pipe
+    with shards.locks[0]:
+        shards._send(0, (-1, shards_request(recommender)))
+    assert shards.recommend_meals(1800, ['Vegan'], 3) == recommender.recommend_meals(1800, ['Vegan'], 3)
+
+def test_dead_worker_falls_back_and_is_restarted(recommender):
+    sharded = ShardedMealRecommender(recommender, 3)
+    try:
+        dead = sharded.processes[1]
+        dead.kill()
+        dead.join()
+        assert sharded.recommend_meals(2000, ['Keto'], 4) == recommender.recommend_meals(2000, ['Keto'], 4)
+        assert sharded.processes[1] is not dead and sharded.processes[1].is_alive()
+        # Later requests are answered by the restarted worker
+        assert sharded.recommend_meals(2600, ['Vegetarian'], 5) == \
+            recommender.recommend_meals(2600, ['Vegetarian'], 5)
+    finally:
+        sharded.close()
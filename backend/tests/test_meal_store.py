@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from conftest import synthetic_meals, trained_recommender
+from models.meal_recommender_ml import MealRecommenderML
+from models.meal_store import CALORIE_WINDOW, MIN_WINDOW_CANDIDATES
+
+PREFERENCES = [None, ['Omnivore'], ['Vegetarian'], ['Vegan'], ['Keto'], ['Low_Sodium'], ['Paleo'],
+               ['Vegan', 'Low_Sodium']]
+EXCLUSIONS = [None, ['chicken'], ['rice', 'egg']]
+
+def store_backed(recommender, path):
+    recommender.save_store(path)
+    store_recommender = MealRecommenderML()
+    store_recommender.open_store(path)
+    return store_recommender
+
+@pytest.fixture(scope='module')
+def small_catalog(tmp_path_factory):
+    """In-memory and store-backed recommenders over a catalog too small for the calorie window"""
+    recommender = trained_recommender(synthetic_meals(MIN_WINDOW_CANDIDATES - 50, seed=5))
+    path = str(tmp_path_factory.mktemp('store') / 'meal_catalog.sqlite')
+    return recommender, store_backed(recommender, path)
+
+@pytest.fixture(scope='module')
+def large_catalog(recommender, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('store') / 'meal_catalog.sqlite')
+    return recommender, store_backed(recommender, path)
+
+@pytest.mark.parametrize('dietary_preferences', PREFERENCES)
+def test_store_matches_in_memory_without_window(small_catalog, dietary_preferences):
+    recommender, store_recommender = small_catalog
+    for calorie_goal in range(1200, 4001, 400):
+        for num_meals in [3, 4, 5, 6]:
+            for exclude in EXCLUSIONS:
+                assert store_recommender.recommend_meals(calorie_goal, dietary_preferences, num_meals,
+                                                         exclude_ingredients=exclude) == \
+                    recommender.recommend_meals(calorie_goal, dietary_preferences, num_meals,
+                                                exclude_ingredients=exclude)
+
+def expected_candidates(recommender, dietary_preferences, target, exclude):
+    """In-memory mask of the rows MealStore.candidates should return, by the same window rules"""
+    snapshot = recommender.snapshot
+    preference = recommender._preference_mask(dietary_preferences, snapshot.meals_df)
+    calories = snapshot.meals_df['calories'].to_numpy(dtype=np.float64)
+    window = (calories >= target * (1 - CALORIE_WINDOW)) & (calories <= target * (1 + CALORIE_WINDOW))
+    excluded = recommender.exclusion_mask(exclude, None, snapshot)
+    if excluded is None:
+        excluded = np.ones(len(calories), dtype=bool)
+    if (preference & window & excluded).sum() >= MIN_WINDOW_CANDIDATES:
+        return preference & window & excluded, True
+    if preference.any():
+        return preference & excluded, False
+    if (window & excluded).sum() >= MIN_WINDOW_CANDIDATES:
+        return window & excluded, True
+    return excluded, False
+
+@pytest.mark.parametrize('dietary_preferences', PREFERENCES)
+def test_store_candidates_match_in_memory_filters(large_catalog, dietary_preferences):
+    recommender, store_recommender = large_catalog
+    meals_df = recommender.snapshot.meals_df
+    windowed = 0
+    for calorie_goal in [1200, 2000, 3200]:
+        for exclude in EXCLUSIONS:
+            target = calorie_goal / 3
+            filtered, features = store_recommender.store.candidates(
+                recommender._preference_filters(dietary_preferences), target, exclude)
+            mask, used_window = expected_candidates(recommender, dietary_preferences, target, exclude)
+            windowed += used_window
+            assert filtered['fdc_id'].tolist() == meals_df['fdc_id'][mask].tolist()
+            assert filtered['name'].tolist() == meals_df['name'][mask].astype(str).tolist()
+            np.testing.assert_array_equal(features, recommender.snapshot.meal_features_scaled[mask])
+    # The catalog is large enough for the window to narrow some requests
+    assert windowed > 0
+
+def test_store_keeps_hard_exclusions(large_catalog):
+    _, store_recommender = large_catalog
+    meals = store_recommender.recommend_meals(2000, ['Vegetarian'], 4, exclude_ingredients=['tofu', 'oat'])
+    assert len(meals) == 4
+    assert not any('tofu' in meal['name'] or 'oat' in meal['name'] for meal in meals)
+
+@pytest.mark.parametrize('method, path, body', [
+    ('post', '/api/meal-plan', {'calorieGoal': 2000}),
+    ('get', '/api/meals/search?q=chicken', None),
+    ('get', '/api/meals/1/alternatives', None),
+])
+def test_catalog_only_endpoints_answer_501_in_sqlite_mode(small_catalog, monkeypatch, method, path, body):
+    import app
+    monkeypatch.setattr(app, 'meal_recommender_ml', small_catalog[1])
+    monkeypatch.setattr(app, 'meal_plan_optimizer', None)
+    response = getattr(app.app.test_client(), method)(path, json=body)
+    assert response.status_code == 501
+    assert 'MEAL_CATALOG_BACKEND=sqlite' in response.get_json()['error']
+
+def test_recommendations_are_served_in_sqlite_mode(small_catalog, monkeypatch):
+    import app
+    recommender, store_recommender = small_catalog
+    monkeypatch.setattr(app, 'meal_recommender_ml', store_recommender)
+    monkeypatch.setattr(app, 'meal_shards', None)
+    monkeypatch.setattr(app, 'recommendation_table', None)
+    body = {'calorieGoal': 2400, 'dietaryPreferences': 'Vegetarian', 'numMeals': 3, 'excludeIngredients': 'beef'}
+    response = app.app.test_client().post('/api/meal-recommendations', json=body)
+    assert response.status_code == 200
+    assert response.get_json() == recommender.recommend_meals(2400, 'Vegetarian', 3, exclude_ingredients=['beef'])
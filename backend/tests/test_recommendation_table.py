@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from conftest import synthetic_meals, trained_recommender
+from models import recommendation_table
+from models.meal_recommender_ml import MealRecommenderML
+from models.recommendation_table import RecommendationTable, grid_keys
+
+@pytest.fixture(scope='module')
+def table_files(tmp_path_factory):
+    """A saved model and a table materialized from it over a reduced grid"""
+    directory = tmp_path_factory.mktemp('table')
+    model_path = str(directory / 'meal_recommender_ml.joblib')
+    table_path = str(directory / 'meal_recommendations.bin')
+    trained_recommender(synthetic_meals(800, seed=3)).save(model_path)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(recommendation_table, 'MIN_CALORIES', 1200)
+        patch.setattr(recommendation_table, 'MAX_CALORIES', 2800)
+        patch.setattr(recommendation_table, 'CALORIE_STEP', 200)
+        recommendation_table.materialize(model_path, table_path, n_jobs=1)
+    return model_path, table_path
+
+@pytest.fixture(scope='module')
+def live_model(table_files):
+    model = MealRecommenderML()
+    model.load(table_files[0])
+    return model
+
+def test_table_hits_equal_live_scoring(table_files, live_model):
+    model_path, table_path = table_files
+    table = RecommendationTable.open(table_path, model_path)
+    keys = grid_keys(table.header['grid'])
+    assert len(table) == len(keys) == 9 * 8 * 4
+    for calorie_goal, preference, num_meals in keys:
+        live = live_model.recommend_meals(calorie_goal, preference, num_meals=num_meals)
+        expected = json.dumps(live, separators=(',', ':'), sort_keys=True).encode()
+        assert table.get(calorie_goal, preference, num_meals) == expected
+        assert table.get(calorie_goal, [preference], num_meals) == expected
+
+@pytest.mark.parametrize('request_key', [
+    (1250, 'Vegan', 3),        # between grid steps
+    (3000, 'Vegan', 3),        # above the grid
+    (1200, 'Pescatarian', 3),  # unknown preference
+    (1200, 'Vegan', 7),        # meal count off the grid
+    (1200, ['Vegan', 'Keto'], 3),
+])
+def test_off_grid_requests_miss(table_files, request_key):
+    table = RecommendationTable.open(table_files[1], table_files[0])
+    assert table.get(*request_key) is None
+
+def test_table_from_another_artifact_is_ignored(table_files, tmp_path):
+    other_path = str(tmp_path / 'other.joblib')
+    trained_recommender(synthetic_meals(300, seed=4)).save(other_path)
+    assert RecommendationTable.open(table_files[1], other_path) is None
+    assert RecommendationTable.open(str(tmp_path / 'missing.bin')) is None
+
+def test_endpoint_serves_table_hits_like_live_scoring(table_files, live_model, monkeypatch):
+    import app
+    monkeypatch.setattr(app, 'meal_recommender_ml', live_model)
+    monkeypatch.setattr(app, 'meal_shards', None)
+    client = app.app.test_client()
+    for body in [{'calorieGoal': 2000, 'dietaryPreferences': 'Vegetarian', 'numMeals': 4},
+                 {'calorieGoal': 1600, 'dietaryPreferences': ['Omnivore'], 'numMeals': 3}]:
+        monkeypatch.setattr(app, 'recommendation_table', None)
+        live = client.post('/api/meal-recommendations', json=body)
+        monkeypatch.setattr(app, 'recommendation_table', RecommendationTable.open(table_files[1], table_files[0]))
+        cached = client.post('/api/meal-recommendations', json=body)
+        assert live.status_code == cached.status_code == 200
+        assert cached.get_json() == live.get_json()
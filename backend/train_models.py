@@ -1,115 +1,505 @@
 #!/usr/bin/env python3
 """
 Train all ML models and generate verifiable results
+
+Models are trained as a small DAG: every model is a task with its input
+datasets, the source files that define it (plus the backend modules they
+import) and the tasks it must run after.
+Independent tasks run in parallel worker processes, and a task is skipped
+when its inputs, code and upstream tasks are unchanged since the last run
+(see models/training_manifest.json). Use --force to retrain everything.
 """
 
 import sys
 import os
 import json
+import time
+import ast
+import hashlib
+import inspect
+import argparse
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.data_loader import load_datasets
+from utils.data_loader import load_datasets, dataset_files
 from models.nutritional_model import NutritionalTargetModel
 from models.meal_recommender import MealRecommender
+from models.meal_recommender_ml import MealRecommenderML
+from models.recommendation_table import materialize, artifact_fingerprint
 from models.workout_classifier import WorkoutClassifier
+from models.workout_generator_ml import WorkoutGeneratorML
 from models.progress_forecast import ProgressForecastModel
+from models.lift_quality import LiftQualityClassifier
+from models.population_percentiles import PopulationPercentiles
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(BACKEND_DIR)
+MODELS_DIR = os.path.join(BACKEND_DIR, 'models')
+RESULTS_FILE = os.path.join(BACKEND_DIR, 'model_results.json')
+
+# Bump to invalidate every cached model (e.g. after a dependency upgrade)
+PIPELINE_VERSION = 1
+
+def train_nutritional_targets(datasets, models_dir):
+    nutritional_model = NutritionalTargetModel()
+    if datasets['dietary'] is None or not nutritional_model.train(datasets['dietary']):
+        return None
+    nutritional_model.save(os.path.join(models_dir, 'nutritional_model.joblib'))
+    results = dict(nutritional_model.results)
+
+    test_pred = nutritional_model.predict(25, 'Male', 175, 75, 'Moderate')
+    results['test_prediction'] = test_pred
+    print(f"  Test Prediction (25yo Male, 175cm, 75kg, Moderate):")
+    print(f"    Calories: {test_pred['calories']}, Protein: {test_pred['protein']}g, Carbs: {test_pred['carbs']}g, Fats: {test_pred['fats']}g")
+    return results
+
+def build_meal_recommendations(datasets, models_dir):
+    meal_recommender = MealRecommender()
+    if datasets['dietary'] is None:
+        return None
+    meal_recommender.create_meal_database(datasets['dietary'])
+    results = dict(meal_recommender.results)
+
+    test_meals = meal_recommender.recommend_meals(2000, ['None'], 'Mexican', 3)
+    results['test_recommendation'] = test_meals
+    print(f"  Test Recommendation (2000 cal, Mexican, 3 meals):")
+    for i, meal in enumerate(test_meals, 1):
+        print(f"    Meal {i}: {meal['name']} - {meal['calories']} cal")
+    return results
+
+def train_meal_recommender_ml(datasets, models_dir):
+    meal_recommender_ml = MealRecommenderML()
+    if not meal_recommender_ml.train(dietary_df=datasets['dietary'], meals_df=datasets['meals']):
+        return None
+    meal_recommender_ml.save(os.path.join(models_dir, 'meal_recommender_ml.joblib'))
+    results = dict(meal_recommender_ml.results)
+
+    test_meals = meal_recommender_ml.recommend_meals(2000, 'Omnivore', num_meals=3)
+    results['test_recommendation'] = test_meals
+    print(f"  Test Recommendation (2000 cal, Omnivore, 3 meals):")
+    for i, meal in enumerate(test_meals, 1):
+        print(f"    Meal {i}: {meal['name']} - {meal['calories']} cal")
+    return results
+
+def build_meal_recommendation_table(datasets, models_dir):
+    model_path = os.path.join(models_dir, 'meal_recommender_ml.joblib')
+    if not os.path.exists(model_path):
+        return None
+    results = materialize(model_path, os.path.join(models_dir, 'meal_recommendations.bin'))
+    print(f"  Precomputed {results['entries']} recommendations ({results['file_mb']} MB)")
+    return results
+
+def build_meal_catalog_store(datasets, models_dir):
+    model_path = os.path.join(models_dir, 'meal_recommender_ml.joblib')
+    if not os.path.exists(model_path):
+        return None
+    meal_recommender_ml = MealRecommenderML()
+    meal_recommender_ml.load(model_path)
+    store = meal_recommender_ml.save_store(os.path.join(models_dir, 'meal_catalog.sqlite'),
+                                           artifact_fingerprint(model_path))
+    results = {
+        'meals': len(store),
+        'file_mb': round(os.path.getsize(store.path) / 1e6, 3),
+        'artifact_sha256': store.artifact_sha256
+    }
+    print(f"  Stored {results['meals']} meals ({results['file_mb']} MB)")
+    return results
+
+def train_workout_plan(datasets, models_dir):
+    workout_classifier = WorkoutClassifier()
+    if datasets['progress'] is None or not workout_classifier.train(datasets['progress'], datasets['exercises']):
+        return None
+    workout_classifier.save(os.path.join(models_dir, 'workout_classifier.joblib'))
+    results = dict(workout_classifier.results)
+
+    test_workout = workout_classifier.generate_workout_plan('Weight Loss', 'Moderate', 'Moderate')
+    results['test_workout'] = test_workout
+    print(f"  Test Workout Plan (Weight Loss, Moderate):")
+    print(f"    Generated {len(test_workout)} workout days")
+    return results
+
+def train_workout_generator_ml(datasets, models_dir):
+    workout_generator_ml = WorkoutGeneratorML()
+    if not workout_generator_ml.train(datasets['exercises'], datasets['stretches']):
+        return None
+    workout_generator_ml.save(os.path.join(models_dir, 'workout_generator_ml.joblib'))
+    results = dict(workout_generator_ml.results)
+
+    test_workout = workout_generator_ml.generate_workout_plan('Muscle Gain', 'Moderate', 'Moderate', 4)
+    results['test_workout'] = test_workout
+    print(f"  Test Workout Plan (Muscle Gain, Moderate, 4 days):")
+    print(f"    Generated {len(test_workout)} workout days")
+    if test_workout and 'warmup' in test_workout[0]:
+        print(f"    Day 1 warm-up: {', '.join(test_workout[0]['warmup'])}")
+    return results
+
+def train_progress_forecast(datasets, models_dir):
+    progress_model = ProgressForecastModel()
+    if datasets['progress'] is None or not progress_model.train(datasets['progress']):
+        return None
+    progress_model.save(os.path.join(models_dir, 'progress_forecast.joblib'))
+    results = dict(progress_model.results)
+
+    sample_data = datasets['progress'].head(10).to_dict('records')
+    test_forecast = progress_model.forecast(sample_data, 4)
+    results['test_forecast'] = test_forecast
+    print(f"  Test Forecast (4 weeks):")
+    for week in test_forecast:
+        print(f"    {week['date']}: Weight {week['predicted_weight']}kg, BMI {week['predicted_bmi']}")
+    return results
+
+def train_lift_quality(datasets, models_dir):
+    lift_quality = LiftQualityClassifier()
+    if not lift_quality.train(datasets['sensors']):
+        return None
+    lift_quality.save(os.path.join(models_dir, 'lift_quality_model.joblib'))
+    results = dict(lift_quality.results)
+
+    store = datasets['sensors']
+    start, end = store.segment_bounds()[0]
+    test_batch = lift_quality.predict(store.samples[:, start:min(end, start + 225)].T)
+    if test_batch is not None:
+        results['test_prediction'] = {'label': test_batch['label'], 'confidence': test_batch['confidence'],
+                                      'expected': store.classes[store.labels[start]]}
+        print(f"  Test Prediction (5 s batch of class {results['test_prediction']['expected']}): {test_batch['label']}")
+    return results
+
+def build_population_percentiles(datasets, models_dir):
+    population = PopulationPercentiles()
+    if not population.train(datasets['heights_weights'], datasets['body_index']):
+        return None
+    population.save(os.path.join(models_dir, 'population_percentiles.joblib'))
+    results = dict(population.results)
+
+    test_percentiles = population.percentile('Male', 175, 75)
+    results['test_percentiles'] = test_percentiles
+    print(f"  Test Percentiles (Male, 175cm, 75kg):")
+    print(f"    Height: {test_percentiles['height']['percentile']}, Weight: {test_percentiles['weight']['percentile']}, BMI: {test_percentiles['bmi']['percentile']}")
+    return results
+
+# Training DAG. 'inputs' are dataset keys from utils.data_loader, 'code' the
+# source files whose changes invalidate the model, 'artifacts' the files the
+# task writes to models/ and 'after' the tasks it depends on.
+TRAINING_TASKS = {
+    'nutritional_targets': {
+        'train': train_nutritional_targets,
+        'inputs': ['dietary'],
+        'code': ['models/nutritional_model.py'],
+        'artifacts': ['nutritional_model.joblib'],
+        'after': []
+    },
+    'meal_recommendations': {
+        'train': build_meal_recommendations,
+        'inputs': ['dietary'],
+        'code': ['models/meal_recommender.py'],
+        'artifacts': [],
+        'after': []
+    },
+    'meal_recommender_ml': {
+        'train': train_meal_recommender_ml,
+        'inputs': ['meals', 'dietary'],
+        'code': ['models/meal_recommender_ml.py', 'models/ingredient_index.py', 'models/recipe_embeddings.py',
+                 'models/meal_search.py', 'utils/keyword_classifier.py',
+                 'utils/data_loader.py'],
+        'artifacts': ['meal_recommender_ml.joblib', 'meal_recommender_ml_embeddings.npy'],
+        'after': []
+    },
+    'meal_recommendation_table': {
+        'train': build_meal_recommendation_table,
+        'inputs': [],
+        'code': ['models/recommendation_table.py'],
+        'artifacts': ['meal_recommendations.bin'],
+        'after': ['meal_recommender_ml']
+    },
+    'meal_catalog_store': {
+        'train': build_meal_catalog_store,
+        'inputs': [],
+        'code': ['models/meal_store.py'],
+        'artifacts': ['meal_catalog.sqlite'],
+        'after': ['meal_recommender_ml']
+    },
+    'workout_plan': {
+        'train': train_workout_plan,
+        'inputs': ['progress', 'exercises'],
+        'code': ['models/workout_classifier.py'],
+        'artifacts': ['workout_classifier.joblib'],
+        'after': []
+    },
+    'workout_generator_ml': {
+        'train': train_workout_generator_ml,
+        'inputs': ['exercises', 'stretches'],
+        'code': ['models/workout_generator_ml.py', 'models/stretch_routines.py'],
+        'artifacts': ['workout_generator_ml.joblib'],
+        'after': []
+    },
+    'progress_forecast': {
+        'train': train_progress_forecast,
+        'inputs': ['progress'],
+        'code': ['models/progress_forecast.py'],
+        'artifacts': ['progress_forecast.joblib'],
+        'after': []
+    },
+    'lift_quality': {
+        'train': train_lift_quality,
+        'inputs': ['sensors'],
+        'code': ['models/lift_quality.py', 'utils/sensor_store.py'],
+        'artifacts': ['lift_quality_model.joblib'],
+        'after': []
+    },
+    'population_percentiles': {
+        'train': build_population_percentiles,
+        'inputs': ['heights_weights', 'body_index'],
+        'code': ['models/population_percentiles.py'],
+        'artifacts': ['population_percentiles.joblib'],
+        'after': []
+    }
+}
+
+_file_hashes = {}
+# Packages of this backend whose modules are fingerprinted with the tasks importing them
+LOCAL_PACKAGES = ('models', 'utils')
+
+def _local_imports(code_path):
+    """Backend modules (relative paths) imported by a backend source file"""
+    path = os.path.join(BACKEND_DIR, code_path)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+        elif isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+    paths = []
+    for module in modules:
+        if module.split('.')[0] in LOCAL_PACKAGES:
+            module_path = module.replace('.', '/') + '.py'
+            if os.path.exists(os.path.join(BACKEND_DIR, module_path)):
+                paths.append(module_path)
+    return paths
+
+def task_code(name):
+    """A task's code files plus every backend module they import, directly or not"""
+    code = []
+    stack = list(TRAINING_TASKS[name]['code'])
+    while stack:
+        code_path = stack.pop(0)
+        if code_path in code:
+            continue
+        code.append(code_path)
+        stack.extend(_local_imports(code_path))
+    return sorted(code)
+
+def _hash_file(path):
+    """SHA-256 of a file, read in blocks so large datasets don't need to fit in memory"""
+    if path not in _file_hashes:
+        if not os.path.exists(path):
+            _file_hashes[path] = 'missing'
+        else:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            _file_hashes[path] = digest.hexdigest()
+    return _file_hashes[path]
+
+def task_fingerprint(name, base_path, fingerprints):
+    """Hash of a task's input datasets, code and upstream fingerprints"""
+    task = TRAINING_TASKS[name]
+    digest = hashlib.sha256()
+    digest.update(f"pipeline:{PIPELINE_VERSION}".encode())
+    for input_name in task['inputs']:
+        for path in dataset_files(input_name, base_path):
+            digest.update(f"{input_name}:{os.path.basename(path)}:{_hash_file(path)}".encode())
+    for code_path in task_code(name):
+        digest.update(f"{code_path}:{_hash_file(os.path.join(BACKEND_DIR, code_path))}".encode())
+    digest.update(inspect.getsource(task['train']).encode())
+    for upstream in task['after']:
+        digest.update(f"{upstream}:{fingerprints[upstream]}".encode())
+    return digest.hexdigest()
+
+def topological_order():
+    """Task names ordered so that every task comes after its dependencies"""
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Training DAG has a cycle through '{name}'")
+        visiting.add(name)
+        for upstream in TRAINING_TASKS[name]['after']:
+            visit(upstream)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in TRAINING_TASKS:
+        visit(name)
+    return order
+
+def run_task(name, base_path, models_dir):
+    """Load a task's datasets and train it (runs in a worker process)"""
+    task = TRAINING_TASKS[name]
+    print(f"[{name}] Training...")
+    datasets = load_datasets(base_path=base_path, names=task['inputs'])
+    start = time.perf_counter()
+    results = task['train'](datasets, models_dir)
+    return results, round(time.perf_counter() - start, 3)
+
+def _load_json(path):
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ Could not read {path}: {e}")
+    return {}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train BioBoard ML models')
+    parser.add_argument('--force', action='store_true', help='retrain models even if inputs are unchanged')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='number of parallel worker processes')
+    parser.add_argument('--only', nargs='+', choices=list(TRAINING_TASKS), help='train only these models')
+    parser.add_argument('--models-dir', default=MODELS_DIR, help='directory to write model artifacts to')
+    args = parser.parse_args(argv)
 
-def main():
     print("=" * 60)
     print("BIOBOARD ML MODEL TRAINING")
     print("=" * 60)
     print()
-    
-    print("Step 1: Loading datasets...")
+
+    pipeline_start = time.perf_counter()
+    models_dir = os.path.abspath(args.models_dir)
+    manifest_file = os.path.join(models_dir, 'training_manifest.json')
+    previous_results = _load_json(RESULTS_FILE).get('models', {})
+    manifest = _load_json(manifest_file)
+
+    print("Step 1: Fingerprinting datasets and model code...")
+    print("-" * 60)
+    fingerprints = {}
+    for name in topological_order():
+        fingerprints[name] = task_fingerprint(name, BASE_DIR, fingerprints)
+
+    selected = set(args.only) if args.only else set(TRAINING_TASKS)
+    pending = {}
+    statuses = {}
+    for name in topological_order():
+        if name not in selected:
+            continue
+        artifacts_exist = all(os.path.exists(os.path.join(models_dir, a)) for a in TRAINING_TASKS[name]['artifacts'])
+        # A retrained upstream model rewrites the artifacts this task was built from
+        upstream_retrained = any(dep in pending for dep in TRAINING_TASKS[name]['after'])
+        up_to_date = (
+            manifest.get(name, {}).get('fingerprint') == fingerprints[name]
+            and artifacts_exist
+            and name in previous_results
+            and not upstream_retrained
+        )
+        if up_to_date and not args.force:
+            statuses[name] = 'cached'
+            print(f"  - {name}: unchanged, skipping")
+        else:
+            pending[name] = TRAINING_TASKS[name]
+            print(f"  - {name}: needs training")
+    print()
+
+    print(f"Step 2: Training {len(pending)} model(s) with {args.jobs} worker(s)...")
     print("-" * 60)
-    datasets = load_datasets()
+    model_results = {name: previous_results[name] for name in previous_results if name in TRAINING_TASKS}
+    timings = {}
+    running = {}
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        while pending or running:
+            # Submit every task whose upstream tasks have finished
+            for name in list(pending):
+                upstream = pending[name]['after']
+                if any(dep in pending or dep in running.values() for dep in upstream):
+                    continue
+                del pending[name]
+                if any(statuses.get(dep) == 'failed' for dep in upstream):
+                    statuses[name] = 'failed'
+                    model_results.pop(name, None)
+                    manifest.pop(name, None)
+                    print(f"⚠ {name}: skipped because an upstream model failed")
+                    continue
+                running[pool.submit(run_task, name, BASE_DIR, models_dir)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results, elapsed = future.result()
+                except Exception as e:
+                    print(f"⚠ {name}: training failed: {e}")
+                    results, elapsed = None, None
+
+                if results is None:
+                    # Results of an earlier run would be reported as if they were current
+                    statuses[name] = 'failed'
+                    model_results.pop(name, None)
+                    manifest.pop(name, None)
+                    print(f"⚠ {name}: not trained")
+                    continue
+
+                statuses[name] = 'trained'
+                timings[name] = elapsed
+                results['training_time_seconds'] = elapsed
+                model_results[name] = results
+                manifest[name] = {
+                    'fingerprint': fingerprints[name],
+                    'trained_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'training_time_seconds': elapsed
+                }
+                print(f"✓ {name}: trained in {elapsed:.2f}s")
     print()
-    
+
+    for name, status in statuses.items():
+        if status == 'cached':
+            timings[name] = 0.0
+
     all_results = {
         'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'models': {}
+        'models': model_results,
+        'timings': {
+            'per_model_seconds': timings,
+            'status': statuses,
+            'total_seconds': round(time.perf_counter() - pipeline_start, 3)
+        }
     }
-    
-    print("Step 2: Training Nutritional Targets Model...")
-    print("-" * 60)
-    nutritional_model = NutritionalTargetModel()
-    if datasets['dietary'] is not None:
-        success = nutritional_model.train(datasets['dietary'])
-        if success:
-            nutritional_model.save('models/nutritional_model.joblib')
-            all_results['models']['nutritional_targets'] = nutritional_model.results
-            
-            test_pred = nutritional_model.predict(25, 'Male', 175, 75, 'Moderate')
-            all_results['models']['nutritional_targets']['test_prediction'] = test_pred
-            print(f"  Test Prediction (25yo Male, 175cm, 75kg, Moderate):")
-            print(f"    Calories: {test_pred['calories']}, Protein: {test_pred['protein']}g, Carbs: {test_pred['carbs']}g, Fats: {test_pred['fats']}g")
-    print()
-    
-    print("Step 3: Creating Meal Recommendation System...")
-    print("-" * 60)
-    meal_recommender = MealRecommender()
-    if datasets['dietary'] is not None:
-        meal_recommender.create_meal_database(datasets['dietary'])
-        all_results['models']['meal_recommendations'] = meal_recommender.results
-        
-        test_meals = meal_recommender.recommend_meals(2000, ['None'], 'Mexican', 3)
-        all_results['models']['meal_recommendations']['test_recommendation'] = test_meals
-        print(f"  Test Recommendation (2000 cal, Mexican, 3 meals):")
-        for i, meal in enumerate(test_meals, 1):
-            print(f"    Meal {i}: {meal['name']} - {meal['calories']} cal")
-    print()
-    
-    print("Step 4: Training Workout Plan Classifier...")
-    print("-" * 60)
-    workout_classifier = WorkoutClassifier()
-    if datasets['progress'] is not None:
-        success = workout_classifier.train(datasets['progress'], datasets['exercises'])
-        if success:
-            workout_classifier.save('models/workout_classifier.joblib')
-            all_results['models']['workout_plan'] = workout_classifier.results
-            
-            test_workout = workout_classifier.generate_workout_plan('Weight Loss', 'Moderate', 'Moderate')
-            all_results['models']['workout_plan']['test_workout'] = test_workout
-            print(f"  Test Workout Plan (Weight Loss, Moderate):")
-            print(f"    Generated {len(test_workout)} workout days")
-    print()
-    
-    print("Step 5: Training Progress Forecast Model...")
-    print("-" * 60)
-    progress_model = ProgressForecastModel()
-    if datasets['progress'] is not None:
-        success = progress_model.train(datasets['progress'])
-        if success:
-            progress_model.save('models/progress_forecast.joblib')
-            all_results['models']['progress_forecast'] = progress_model.results
-            
-            sample_data = datasets['progress'].head(10).to_dict('records')
-            test_forecast = progress_model.forecast(sample_data, 4)
-            all_results['models']['progress_forecast']['test_forecast'] = test_forecast
-            print(f"  Test Forecast (4 weeks):")
-            for week in test_forecast:
-                print(f"    {week['date']}: Weight {week['predicted_weight']}kg, BMI {week['predicted_bmi']}")
-    print()
-    
-    print("Step 6: Saving results...")
+
+    print("Step 3: Saving results...")
     print("-" * 60)
-    results_file = 'model_results.json'
-    with open(results_file, 'w') as f:
-        json.dump(all_results, f, indent=2)
-    print(f"✓ Results saved to {results_file}")
+    os.makedirs(models_dir, exist_ok=True)
+    with open(manifest_file, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    with open(RESULTS_FILE, 'w') as f:
+        json.dump(all_results, f, indent=2, default=str)
+    print(f"✓ Results saved to {RESULTS_FILE}")
     print()
-    
+
     print("=" * 60)
     print("TRAINING COMPLETE - SUMMARY")
     print("=" * 60)
     print(f"Training Date: {all_results['training_date']}")
-    print(f"Models Trained: {len(all_results['models'])}/4")
+    trained = sum(1 for s in statuses.values() if s == 'trained')
+    cached = sum(1 for s in statuses.values() if s == 'cached')
+    print(f"Models Trained: {trained}, Unchanged: {cached}, Total: {len(TRAINING_TASKS)}")
+    print(f"Total time: {all_results['timings']['total_seconds']:.2f}s")
     print()
     print("Model Results:")
-    for model_name, results in all_results['models'].items():
-        print(f"  - {model_name}: ✓ Trained")
+    for model_name, status in statuses.items():
+        results = model_results.get(model_name, {})
+        label = {'trained': '✓ Trained', 'cached': '✓ Unchanged', 'failed': '⚠ Not trained'}[status]
+        print(f"  - {model_name}: {label}")
+        if status == 'trained':
+            print(f"    Time: {timings[model_name]:.2f}s")
         if 'r2_score' in results:
             print(f"    R² Score: {results['r2_score']:.4f}")
         if 'accuracy' in results:
@@ -118,7 +508,10 @@ def main():
             print(f"    Calories R²: {results['calories_r2']:.4f}")
     print()
     print("=" * 60)
-    print("✓ All models trained successfully!")
+    if any(s == 'failed' for s in statuses.values()):
+        print("⚠ Some models could not be trained (see messages above)")
+    else:
+        print("✓ All models trained successfully!")
     print("=" * 60)
 
 if __name__ == '__main__':
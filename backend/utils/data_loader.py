@@ -1,134 +1,205 @@
 import pandas as pd
+import numpy as np
 import os
+import json
 
-def load_usda_meals(meal_dir):
-    """Load and process USDA FoodData Central to create meal dataset"""
-    try:
-        # Load main files
-        food_df = pd.read_csv(os.path.join(meal_dir, 'food.csv'))
-        food_nutrient_df = pd.read_csv(os.path.join(meal_dir, 'food_nutrient.csv'))
-        nutrient_df = pd.read_csv(os.path.join(meal_dir, 'nutrient.csv'))
-        food_category_df = pd.read_csv(os.path.join(meal_dir, 'food_category.csv'))
+from utils.keyword_classifier import classify_names
+from utils.sensor_store import load_sensor_store
+
+# USDA nutrient IDs tried for each macro, in priority order
+USDA_NUTRIENT_IDS = {
+    'calories': [1008, 2047, 2048],  # Energy (kcal)
+    'protein': [1003, 1053],  # Protein
+    'carbs': [1005, 1050, 1072],  # Carbohydrate
+    'fats': [1004, 1085]  # Total lipid (fat)
+}
+
+# Rows read per chunk from the USDA CSVs. Peak ingest memory scales with this,
+# not with the size of food_nutrient.csv (~16 bytes per row after narrowing).
+USDA_CHUNK_ROWS = int(os.environ.get('BIOBOARD_INGEST_CHUNK_ROWS', 1000000))
+
+MACRO_COLUMNS = ['calories', 'protein', 'carbs', 'fats']
+
+def _aggregate_food_nutrients(food_nutrient_path, chunk_size):
+    """Stream food_nutrient.csv and keep one amount per (fdc_id, macro)
+    
+    Only the USDA_NUTRIENT_IDS rows are kept from each chunk, and they are folded
+    into a running table right away, so memory is bounded by the number of foods.
+    """
+    macro_codes = {}
+    priorities = {}
+    for code, nutrient_ids in enumerate(USDA_NUTRIENT_IDS.values()):
+        for priority, nutrient_id in enumerate(nutrient_ids):
+            macro_codes[nutrient_id] = code
+            priorities[nutrient_id] = priority
+    
+    header = pd.read_csv(food_nutrient_path, nrows=0).columns
+    usecols = ['fdc_id', 'nutrient_id', 'amount'] + (['median'] if 'median' in header else [])
+    dtypes = {'fdc_id': 'int32', 'nutrient_id': 'int32', 'amount': 'float32', 'median': 'float32'}
+    
+    best = None
+    for chunk in pd.read_csv(food_nutrient_path, usecols=usecols,
+                             dtype={col: dtypes[col] for col in usecols},
+                             chunksize=chunk_size):
+        chunk = chunk[chunk['nutrient_id'].isin(macro_codes)]
+        if len(chunk) == 0:
+            continue
         
-        # Find nutrient IDs (standard USDA IDs)
-        # Try multiple IDs for each nutrient to get more foods
-        nutrient_id_map = {
-            'calories': [1008, 2047, 2048],  # Energy (kcal) - try multiple
-            'protein': [1003, 1053],  # Protein - try multiple
-            'carbs': [1005, 1050, 1072],  # Carbohydrate - try multiple
-            'fats': [1004, 1085]  # Total lipid (fat) - try multiple
-        }
+        # Use amount, or median if amount is NaN
+        amount = chunk['amount']
+        if 'median' in chunk.columns:
+            amount = amount.fillna(chunk['median'])
         
-        # Get nutrient data for each food
-        meals = []
+        reduced = pd.DataFrame({
+            'fdc_id': chunk['fdc_id'].values,
+            'macro': chunk['nutrient_id'].map(macro_codes).astype('int8').values,
+            'priority': chunk['nutrient_id'].map(priorities).astype('int8').values,
+            'amount': amount.values
+        })
+        reduced = reduced[reduced['amount'] > 0]
+        if best is not None:
+            reduced = pd.concat([best, reduced], ignore_index=True)
+        # Highest-priority nutrient ID wins; ties keep the earliest row
+        best = reduced.sort_values('priority', kind='stable').drop_duplicates(['fdc_id', 'macro'])
+    
+    if best is None or len(best) == 0:
+        return pd.DataFrame(columns=MACRO_COLUMNS, dtype='float32')
+    
+    nutrients = best.pivot(index='fdc_id', columns='macro', values='amount')
+    nutrients = nutrients.reindex(columns=range(len(MACRO_COLUMNS))).fillna(0).astype('float32')
+    nutrients.columns = MACRO_COLUMNS
+    return nutrients
+
+def _build_usda_meal_chunk(food_chunk, nutrients, category_names):
+    """Turn a chunk of food.csv rows into meal catalog rows"""
+    meals = food_chunk.join(nutrients, on='fdc_id', how='inner')
+    if len(meals) == 0:
+        return meals
+    
+    # Calculate calories from macros if missing (4 cal/g protein/carbs, 9 cal/g fat)
+    calculated_calories = meals['protein'] * 4 + meals['carbs'] * 4 + meals['fats'] * 9
+    meals['calories'] = meals['calories'].where(meals['calories'] > 0, calculated_calories)
+    
+    # Only keep meals with valid calorie data and reasonable values
+    # Allow foods even if some macros are 0 (as long as calories > 0)
+    meals = meals[(meals['calories'] > 0) & (meals['calories'] < 5000)]
+    if len(meals) == 0:
+        return meals
+    
+    meals = meals.rename(columns={'description': 'name'})
+    meals['name'] = meals['name'].fillna('').astype(str)
+    if 'food_category_id' in meals.columns:
+        meals['category'] = meals['food_category_id'].map(category_names).fillna('Other')
+    else:
+        meals['category'] = 'Other'
+    
+    # Cuisine and meat/dairy/egg keywords, one regex pass over the names
+    labels = classify_names(meals['name'])
+    meals['cuisine'] = labels['cuisine'].to_numpy()
+    for col in ['has_meat', 'has_dairy', 'has_egg']:
+        meals[col] = labels[col].to_numpy()
+    
+    # Add diet type based on macros
+    carbs_pct = (meals['carbs'] * 4) / meals['calories'] * 100
+    fats_pct = (meals['fats'] * 9) / meals['calories'] * 100
+    meals['diet'] = np.select(
+        [carbs_pct < 10, fats_pct < 15],  # <10% calories from carbs, <15% from fats
+        ['Low_Carb', 'Low_Sodium'],  # Low_Sodium is an approximation
+        default='Balanced'
+    )
+    
+    # Check for vegan/vegetarian (exclude meat, dairy, eggs) with the USDA keyword lists
+    usda_dairy = labels['usda_dairy'].to_numpy() | meals['category'].str.lower().str.contains('dairy|cheese').to_numpy()
+    meals['is_vegetarian'] = ~(labels['usda_meat'].to_numpy() | labels['usda_egg'].to_numpy())
+    meals['is_vegan'] = meals['is_vegetarian'].to_numpy() & ~usda_dairy
+    
+    return meals[['name', 'fdc_id'] + MACRO_COLUMNS + ['category', 'cuisine', 'diet', 'is_vegetarian', 'is_vegan',
+                                                       'has_meat', 'has_dairy', 'has_egg']]
+
+def _source_stamps(paths):
+    """Size and modification time of each source file, by file name"""
+    return {os.path.basename(p): [os.path.getsize(p), os.path.getmtime(p)] for p in paths}
+
+def _usda_source_paths(meal_dir):
+    return [os.path.join(meal_dir, name) for name in ['food.csv', 'food_nutrient.csv', 'food_category.csv']]
+
+def load_meal_catalog_shards(shard_dir, source_paths=None):
+    """Load a meal catalog written by load_usda_meals
+    
+    Returns None unless the ingest finished (meta.json is written after the
+    last shard) and, when source_paths are given, the catalog was built from
+    those exact files.
+    """
+    meta_path = os.path.join(shard_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if source_paths is not None and meta.get('sources') != _source_stamps(source_paths):
+        return None
+    shard_paths = [os.path.join(shard_dir, name) for name in meta['shards']]
+    if not shard_paths or not all(os.path.exists(p) for p in shard_paths):
+        return None
+    return pd.concat([pd.read_csv(p) for p in shard_paths], ignore_index=True)
+
+def iter_usda_meals(meal_dir, chunk_size=None):
+    """Meal catalog rows from USDA FoodData Central, one DataFrame per food.csv chunk
+    
+    food_nutrient.csv and food.csv are streamed in chunks of chunk_size rows
+    (default USDA_CHUNK_ROWS); only the current chunk and the per-food macro
+    table are held in memory.
+    """
+    chunk_size = chunk_size or USDA_CHUNK_ROWS
+    food_path = os.path.join(meal_dir, 'food.csv')
+    food_category_df = pd.read_csv(os.path.join(meal_dir, 'food_category.csv'), usecols=['id', 'description'])
+    category_names = dict(zip(food_category_df['id'], food_category_df['description']))
+    
+    nutrients = _aggregate_food_nutrients(os.path.join(meal_dir, 'food_nutrient.csv'), chunk_size)
+    
+    food_header = pd.read_csv(food_path, nrows=0).columns
+    food_cols = [col for col in ['fdc_id', 'description', 'food_category_id'] if col in food_header]
+    for food_chunk in pd.read_csv(food_path, usecols=food_cols, dtype={'fdc_id': 'int32'}, chunksize=chunk_size):
+        meals = _build_usda_meal_chunk(food_chunk, nutrients, category_names)
+        if len(meals) > 0:
+            yield meals
+
+def load_usda_meals(meal_dir, shard_dir, chunk_size=None):
+    """Process USDA FoodData Central into a sharded meal catalog
+    
+    Each chunk of iter_usda_meals is written straight to its own CSV in
+    shard_dir, so peak memory is one chunk, not the catalog. meta.json
+    (shard list and source file stamps) is removed first and written last,
+    so an ingest that dies partway leaves no catalog to reuse. Returns the
+    shard paths (None if no meals were found); read them back with
+    load_meal_catalog_shards.
+    """
+    try:
+        os.makedirs(shard_dir, exist_ok=True)
+        meta_path = os.path.join(shard_dir, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        sources = _source_stamps(_usda_source_paths(meal_dir))
+        for f in os.listdir(shard_dir):
+            if f.startswith('meals_') and f.endswith('.csv'):
+                os.remove(os.path.join(shard_dir, f))
         
-        # Process in chunks for memory efficiency
-        chunk_size = 10000
-        for i in range(0, len(food_df), chunk_size):
-            chunk_foods = food_df.iloc[i:i+chunk_size]
-            
-            for _, food_row in chunk_foods.iterrows():
-                fdc_id = food_row['fdc_id']
-                food_name = food_row['description']
-                category_id = food_row.get('food_category_id', None)
-                
-                # Get nutrients for this food
-                food_nutrients = food_nutrient_df[food_nutrient_df['fdc_id'] == fdc_id]
-                
-                if len(food_nutrients) == 0:
-                    continue
-                
-                # Extract key nutrients - try multiple nutrient IDs for each
-                meal_data = {'name': food_name, 'fdc_id': fdc_id}
-                
-                for nutrient_name, nutrient_ids in nutrient_id_map.items():
-                    amount = 0
-                    # Try each nutrient ID until we find one with data
-                    for nutrient_id in nutrient_ids:
-                        nutrient_row = food_nutrients[food_nutrients['nutrient_id'] == nutrient_id]
-                        if len(nutrient_row) > 0:
-                            # Use amount, or median if amount is NaN
-                            val = nutrient_row.iloc[0]['amount']
-                            if pd.isna(val):
-                                val = nutrient_row.iloc[0].get('median', 0)
-                            if not pd.isna(val) and val > 0:
-                                amount = float(val)
-                                break
-                    
-                    # If no amount found and it's calories, try to calculate from macros
-                    if amount == 0 and nutrient_name == 'calories':
-                        # Will calculate later from protein/carbs/fats if available
-                        pass
-                    
-                    meal_data[nutrient_name] = amount
-                
-                # Calculate calories from macros if missing (4 cal/g protein/carbs, 9 cal/g fat)
-                if meal_data['calories'] == 0:
-                    calculated_calories = (meal_data['protein'] * 4) + (meal_data['carbs'] * 4) + (meal_data['fats'] * 9)
-                    if calculated_calories > 0:
-                        meal_data['calories'] = calculated_calories
-                
-                # Only add meals with valid calorie data and reasonable values
-                # Allow foods even if some macros are 0 (as long as calories > 0)
-                if meal_data['calories'] > 0 and meal_data['calories'] < 5000:
-                    # Get category name
-                    if category_id and category_id in food_category_df['id'].values:
-                        category_row = food_category_df[food_category_df['id'] == category_id]
-                        meal_data['category'] = category_row.iloc[0]['description'] if len(category_row) > 0 else 'Other'
-                    else:
-                        meal_data['category'] = 'Other'
-                    
-                    # Add cuisine estimate based on food name (simple heuristic)
-                    food_lower = food_name.lower()
-                    if any(word in food_lower for word in ['taco', 'burrito', 'quesadilla', 'enchilada', 'mexican']):
-                        meal_data['cuisine'] = 'Mexican'
-                    elif any(word in food_lower for word in ['pasta', 'pizza', 'risotto', 'italian', 'spaghetti']):
-                        meal_data['cuisine'] = 'Italian'
-                    elif any(word in food_lower for word in ['curry', 'masala', 'naan', 'tikka', 'indian']):
-                        meal_data['cuisine'] = 'Indian'
-                    elif any(word in food_lower for word in ['chow', 'fried rice', 'wonton', 'chinese', 'dim sum']):
-                        meal_data['cuisine'] = 'Chinese'
-                    else:
-                        meal_data['cuisine'] = 'American'  # Default
-                    
-                    # Add diet type based on macros
-                    if meal_data['calories'] > 0:
-                        carbs_pct = (meal_data['carbs'] * 4) / meal_data['calories'] * 100
-                        fats_pct = (meal_data['fats'] * 9) / meal_data['calories'] * 100
-                        
-                        if carbs_pct < 10:  # Less than 10% calories from carbs
-                            meal_data['diet'] = 'Low_Carb'
-                        elif fats_pct < 15:  # Less than 15% from fats
-                            meal_data['diet'] = 'Low_Sodium'  # Approximate
-                        else:
-                            meal_data['diet'] = 'Balanced'
-                    else:
-                        meal_data['diet'] = 'Balanced'
-                    
-                    # Add dietary flags based on food name and category
-                    food_lower = food_name.lower()
-                    category_lower = meal_data.get('category', '').lower()
-                    
-                    # Check for vegan/vegetarian (exclude meat, dairy, eggs)
-                    meat_keywords = ['beef', 'chicken', 'pork', 'turkey', 'lamb', 'meat', 'bacon', 'sausage', 'ham', 'steak', 'fish', 'seafood', 'salmon', 'tuna', 'shrimp', 'poultry']
-                    dairy_keywords = ['cheese', 'milk', 'butter', 'cream', 'yogurt', 'whey', 'casein', 'dairy']
-                    egg_keywords = ['egg', 'yolk']
-                    
-                    has_meat = any(kw in food_lower for kw in meat_keywords)
-                    has_dairy = any(kw in food_lower for kw in dairy_keywords) or 'dairy' in category_lower or 'cheese' in category_lower
-                    has_eggs = any(kw in food_lower for kw in egg_keywords)
-                    
-                    meal_data['is_vegetarian'] = not (has_meat or has_eggs)
-                    meal_data['is_vegan'] = not (has_meat or has_dairy or has_eggs)
-                    
-                    meals.append(meal_data)
+        shard_paths = []
+        num_meals = 0
+        for meals in iter_usda_meals(meal_dir, chunk_size):
+            shard_path = os.path.join(shard_dir, f"meals_{len(shard_paths):05d}.csv")
+            meals.to_csv(shard_path, index=False)
+            shard_paths.append(shard_path)
+            num_meals += len(meals)
         
-        if len(meals) == 0:
+        if len(shard_paths) == 0:
             return None
         
-        meals_df = pd.DataFrame(meals)
-        print(f"  Processed {len(meals_df)} meals from USDA FoodData Central")
-        return meals_df
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'shards': [os.path.basename(p) for p in shard_paths], 'meals': num_meals,
+                       'sources': sources}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        print(f"  Processed {num_meals} meals from USDA FoodData Central into {len(shard_paths)} shard(s)")
+        return shard_paths
         
     except Exception as e:
         print(f"  Error processing USDA meals: {e}")
@@ -184,11 +255,18 @@ def load_pp_recipes(recipes_paths):
                     fats = int(calories * 0.25 / 9)
                     
                     # Create realistic meal names based on ingredients and calorie level
+                    ingredients = []
                     try:
                         import ast
                         import random
                         ingredient_tokens = ast.literal_eval(row['ingredient_tokens'])
                         num_ingredients = len(ingredient_tokens) if isinstance(ingredient_tokens, list) else 0
+                        # One entry per ingredient, kept for the ingredient index
+                        if isinstance(ingredient_tokens, list):
+                            ingredients = [
+                                ' '.join(str(token) for token in tokens) if isinstance(tokens, (list, tuple)) else str(tokens)
+                                for tokens in ingredient_tokens
+                            ]
                         
                         # Real meal names based on calorie level and complexity
                         meal_names_by_level = {
@@ -245,35 +323,6 @@ def load_pp_recipes(recipes_paths):
                     meal_types = {0: 'Breakfast', 1: 'Lunch', 2: 'Dinner'}
                     meal_type = meal_types.get(calorie_level, 'Meal')
                     
-                    # Check if vegetarian/vegan based on meal name
-                    # Meat keywords - if meal name contains these, it's not vegetarian/vegan
-                    meat_keywords = [
-                        'chicken', 'salmon', 'beef', 'pork', 'turkey', 'lamb', 'meat', 
-                        'bacon', 'sausage', 'ham', 'steak', 'fish', 'seafood', 'tuna', 
-                        'shrimp', 'poultry', 'cod', 'seafood', 'pasta carbonara', 'steak'
-                    ]
-                    # Dairy/egg keywords - if meal name contains these, it's not vegan (but can be vegetarian)
-                    dairy_egg_keywords = [
-                        'cheese', 'milk', 'butter', 'cream', 'yogurt', 'dairy', 'parfait',
-                        'egg', 'eggs', 'scrambled', 'omelet', 'carbonara'
-                    ]
-                    
-                    meal_name_lower = recipe_name.lower()
-                    has_meat = any(keyword in meal_name_lower for keyword in meat_keywords)
-                    has_dairy_eggs = any(keyword in meal_name_lower for keyword in dairy_egg_keywords)
-                    
-                    # Determine vegetarian/vegan status
-                    if has_meat:
-                        is_vegetarian = False
-                        is_vegan = False
-                    elif has_dairy_eggs:
-                        is_vegetarian = True  # Can have dairy/eggs
-                        is_vegan = False  # Cannot have dairy/eggs
-                    else:
-                        # No meat or dairy keywords - default to vegetarian/vegan
-                        is_vegetarian = True
-                        is_vegan = True
-                    
                     meal_data = {
                         'name': recipe_name,
                         'fdc_id': recipe_id,  # Using recipe ID
@@ -284,10 +333,9 @@ def load_pp_recipes(recipes_paths):
                         'category': 'Recipe',
                         'cuisine': 'American',  # Default, could improve with techniques
                         'diet': 'Balanced',
-                        'is_vegetarian': is_vegetarian,
-                        'is_vegan': is_vegan,
                         'meal_type': meal_type,
-                        'calorie_level': calorie_level
+                        'calorie_level': calorie_level,
+                        'ingredients': ingredients
                     }
                     
                     meals.append(meal_data)
@@ -303,6 +351,13 @@ def load_pp_recipes(recipes_paths):
             return None
         
         meals_df = pd.DataFrame(chunk_list)
+        
+        # Vegetarian/vegan status from meal name keywords (one pass per distinct name)
+        labels = classify_names(meals_df['name'].astype('category'))
+        for col in ['has_meat', 'has_dairy', 'has_egg']:
+            meals_df[col] = labels[col].to_numpy()
+        meals_df['is_vegetarian'] = ~labels['recipes_meat'].to_numpy()
+        meals_df['is_vegan'] = meals_df['is_vegetarian'].to_numpy() & ~labels['recipes_dairy_egg'].to_numpy()
         print(f"  Processed {len(meals_df)} recipes from PP_recipes split files")
         return meals_df
         
@@ -312,106 +367,108 @@ def load_pp_recipes(recipes_paths):
         traceback.print_exc()
         return None
 
-def load_datasets(base_path='../'):
-    """Load all datasets"""
-    datasets = {}
-    
-    try:
-        datasets['progress'] = pd.read_csv(os.path.join(base_path, 'dataset2.csv'))
-        print(f"✓ Loaded progress data: {len(datasets['progress'])} rows")
-    except Exception as e:
-        print(f"⚠ Error loading dataset2.csv: {e}")
-        datasets['progress'] = None
-    
-    try:
-        datasets['dietary'] = pd.read_csv(os.path.join(base_path, 'dataset6.csv'))
-        print(f"✓ Loaded dietary data: {len(datasets['dietary'])} rows")
-    except Exception as e:
-        print(f"⚠ Error loading dataset6.csv: {e}")
-        datasets['dietary'] = None
-    
+# CSV file backing each dataset key returned by load_datasets()
+DATASET_FILES = {
+    'progress': 'dataset2.csv',
+    'dietary': 'dataset6.csv',
+    'exercises': 'dataset8.csv',
+    'stretches': 'stretch_exercise_dataset.csv',
+    'powerlifting': 'powerlifting_dataset.csv',
+    'sensors': 'dataset7.csv',
+    'heights_weights': 'dataset1.csv',
+    'body_index': 'dataset4.csv'
+}
+
+def _pp_recipe_files(base_path):
+    """PP_recipes CSVs, from the PP_recipes folder or the old split-file location"""
+    pp_recipes_folder = os.path.join(base_path, 'PP_recipes')
+    if os.path.exists(pp_recipes_folder) and os.path.isdir(pp_recipes_folder):
+        # Sort files to ensure consistent processing order
+        recipe_files = sorted(
+            os.path.join(pp_recipes_folder, file)
+            for file in os.listdir(pp_recipes_folder)
+            if file.endswith('.csv')
+        )
+        if recipe_files:
+            return recipe_files
+    return [
+        os.path.join(base_path, 'PP_recipes_part1.csv'),
+        os.path.join(base_path, 'PP_recipes_part2.csv'),
+        os.path.join(base_path, 'PP_recipes_part3.csv')
+    ]
+
+def _usda_files(base_path):
+    """Existing USDA FoodData Central CSVs"""
+    usda_dir = os.path.join(base_path, 'dataset_mealNutrition')
+    paths = [os.path.join(usda_dir, name) for name in ['food.csv', 'food_nutrient.csv', 'nutrient.csv', 'food_category.csv']]
+    return [p for p in paths if os.path.exists(p)]
+
+def meal_source_files(base_path='../'):
+    """Existing files the meal dataset can be built from (used for change detection)"""
+    return [p for p in _pp_recipe_files(base_path) if os.path.exists(p)] + _usda_files(base_path)
+
+def dataset_files(name, base_path='../'):
+    """Files a dataset key is loaded from"""
+    if name == 'meals':
+        return meal_source_files(base_path)
+    return [os.path.join(base_path, DATASET_FILES[name])]
+
+def load_meals(base_path='../'):
+    """Load the meal dataset: PP_recipes (preferred), USDA FoodData Central as fallback"""
     try:
-        # Use PP_recipes split files from PP_recipes folder (has actual recipes, not just ingredients)
-        # Load all CSV files from PP_recipes folder
-        pp_recipes_folder = os.path.join(base_path, 'PP_recipes')
-        if os.path.exists(pp_recipes_folder) and os.path.isdir(pp_recipes_folder):
-            # Get all CSV files from the folder
-            recipe_files = []
-            for file in os.listdir(pp_recipes_folder):
-                if file.endswith('.csv'):
-                    recipe_files.append(os.path.join(pp_recipes_folder, file))
-            
-            # Sort files to ensure consistent processing order
-            recipe_files.sort()
-            
-            if recipe_files:
-                print(f"  Found {len(recipe_files)} PP_recipes files in folder...")
-                recipes_df = load_pp_recipes(recipe_files)
-                if recipes_df is not None and len(recipes_df) > 0:
-                    print(f"✓ Loaded PP recipes: {len(recipes_df)} meals with recipe-based names")
-                    datasets['meals'] = recipes_df
-                else:
-                    # Fallback to USDA meals
-                    datasets['meals'] = load_usda_meals(os.path.join(base_path, 'dataset_mealNutrition'))
-                    if datasets['meals'] is not None:
-                        print(f"✓ Loaded USDA meal nutrition data: {len(datasets['meals'])} meals")
-            else:
-                # No CSV files found in folder, try old location
-                recipe_parts = [
-                    os.path.join(base_path, 'PP_recipes_part1.csv'),
-                    os.path.join(base_path, 'PP_recipes_part2.csv'),
-                    os.path.join(base_path, 'PP_recipes_part3.csv')
-                ]
-                recipes_df = load_pp_recipes(recipe_parts)
-                if recipes_df is not None and len(recipes_df) > 0:
-                    print(f"✓ Loaded PP recipes: {len(recipes_df)} meals with recipe-based names")
-                    datasets['meals'] = recipes_df
-                else:
-                    # Fallback to USDA meals
-                    datasets['meals'] = load_usda_meals(os.path.join(base_path, 'dataset_mealNutrition'))
-                    if datasets['meals'] is not None:
-                        print(f"✓ Loaded USDA meal nutrition data: {len(datasets['meals'])} meals")
-        else:
-            # Folder doesn't exist, try old location
-            recipe_parts = [
-                os.path.join(base_path, 'PP_recipes_part1.csv'),
-                os.path.join(base_path, 'PP_recipes_part2.csv'),
-                os.path.join(base_path, 'PP_recipes_part3.csv')
-            ]
-            recipes_df = load_pp_recipes(recipe_parts)
-            if recipes_df is not None and len(recipes_df) > 0:
-                print(f"✓ Loaded PP recipes: {len(recipes_df)} meals with recipe-based names")
-                datasets['meals'] = recipes_df
-            else:
-                # Fallback to USDA meals
-                datasets['meals'] = load_usda_meals(os.path.join(base_path, 'dataset_mealNutrition'))
-                if datasets['meals'] is not None:
-                    print(f"✓ Loaded USDA meal nutrition data: {len(datasets['meals'])} meals")
+        # Use PP_recipes split files (has actual recipes, not just ingredients)
+        recipes_df = load_pp_recipes(_pp_recipe_files(base_path))
+        if recipes_df is not None and len(recipes_df) > 0:
+            print(f"✓ Loaded PP recipes: {len(recipes_df)} meals with recipe-based names")
+            return recipes_df
+        
+        # Fallback to USDA meals, reusing the sharded catalog if a finished ingest built it from this dump
+        usda_dir = os.path.join(base_path, 'dataset_mealNutrition')
+        catalog_dir = os.path.join(usda_dir, 'meal_catalog')
+        meals_df = None
+        if all(os.path.exists(p) for p in _usda_source_paths(usda_dir)):
+            meals_df = load_meal_catalog_shards(catalog_dir, _usda_source_paths(usda_dir))
+            if meals_df is None and load_usda_meals(usda_dir, catalog_dir) is not None:
+                meals_df = load_meal_catalog_shards(catalog_dir)
+        if meals_df is not None:
+            print(f"✓ Loaded USDA meal nutrition data: {len(meals_df)} meals")
+        return meals_df
     except Exception as e:
         print(f"⚠ Error loading meal dataset: {e}")
         import traceback
         traceback.print_exc()
-        datasets['meals'] = None
-    
-    try:
-        datasets['exercises'] = pd.read_csv(os.path.join(base_path, 'dataset8.csv'))
-        print(f"✓ Loaded exercises data: {len(datasets['exercises'])} rows")
-    except Exception as e:
-        print(f"⚠ Error loading dataset8.csv: {e}")
-        datasets['exercises'] = None
+        return None
+
+def load_dataset(name, base_path='../'):
+    """Load a single dataset by key (see DATASET_FILES, plus 'meals')"""
+    if name == 'meals':
+        return load_meals(base_path)
+    if name == 'sensors':
+        # Converted once to a memory-mapped columnar store next to the CSV
+        try:
+            store = load_sensor_store(os.path.join(base_path, DATASET_FILES[name]))
+            print(f"✓ Loaded {name} data: {len(store)} samples")
+            return store
+        except Exception as e:
+            print(f"⚠ Error loading {DATASET_FILES[name]}: {e}")
+            return None
     
+    filename = DATASET_FILES[name]
     try:
-        datasets['stretches'] = pd.read_csv(os.path.join(base_path, 'stretch_exercise_dataset.csv'))
-        print(f"✓ Loaded stretches data: {len(datasets['stretches'])} rows")
+        df = pd.read_csv(os.path.join(base_path, filename))
+        print(f"✓ Loaded {name} data: {len(df)} rows")
+        return df
     except Exception as e:
-        print(f"⚠ Error loading stretch_exercise_dataset.csv: {e}")
-        datasets['stretches'] = None
+        print(f"⚠ Error loading {filename}: {e}")
+        return None
+
+def load_datasets(base_path='../', names=None):
+    """Load all datasets (or only the keys listed in names)"""
+    if names is None:
+        names = ['progress', 'dietary', 'meals', 'exercises', 'stretches', 'powerlifting']
     
-    try:
-        datasets['powerlifting'] = pd.read_csv(os.path.join(base_path, 'powerlifting_dataset.csv'))
-        print(f"✓ Loaded powerlifting data: {len(datasets['powerlifting'])} rows")
-    except Exception as e:
-        print(f"⚠ Error loading powerlifting_dataset.csv: {e}")
-        datasets['powerlifting'] = None
+    datasets = {}
+    for name in names:
+        datasets[name] = load_dataset(name, base_path)
     
     return datasets
@@ -0,0 +1,114 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Keyword groups matched as lowercase substrings of a food name. Cuisine groups
+# are listed in priority order: the first one that matches wins.
+CUISINE_KEYWORDS = {
+    'Mexican': ['taco', 'burrito', 'quesadilla', 'enchilada', 'mexican'],
+    'Italian': ['pasta', 'pizza', 'risotto', 'italian', 'spaghetti'],
+    'Indian': ['curry', 'masala', 'naan', 'tikka', 'indian'],
+    'Chinese': ['chow', 'fried rice', 'wonton', 'chinese', 'dim sum']
+}
+DEFAULT_CUISINE = 'American'
+
+# Names checked for meat, dairy and eggs when a dietary filter is applied
+# (the has_meat/has_dairy/has_egg columns of the meal catalog)
+MEAT_KEYWORDS = [
+    'beef', 'chicken', 'pork', 'turkey', 'lamb', 'meat', 'bacon', 'sausage', 'ham', 'steak',
+    'fish', 'seafood', 'salmon', 'tuna', 'shrimp', 'poultry'
+]
+DAIRY_KEYWORDS = ['cheese', 'milk', 'butter', 'cream', 'yogurt', 'dairy']
+EGG_KEYWORDS = ['egg', 'yolk']
+
+LABEL_KEYWORDS = {
+    'has_meat': MEAT_KEYWORDS,
+    'has_dairy': DAIRY_KEYWORDS,
+    'has_egg': EGG_KEYWORDS
+}
+
+# Keywords each data source labels is_vegetarian/is_vegan with at ingest,
+# reported as '<source>_<group>' columns. USDA foods are vegetarian without
+# meat or eggs; recipes are vegetarian without meat, and recipe dairy and
+# eggs share one list.
+SOURCE_KEYWORDS = {
+    'usda': {
+        'meat': MEAT_KEYWORDS,
+        'dairy': DAIRY_KEYWORDS + ['whey', 'casein'],
+        'egg': EGG_KEYWORDS
+    },
+    'recipes': {
+        'meat': MEAT_KEYWORDS + ['cod', 'pasta carbonara'],
+        'dairy_egg': ['cheese', 'milk', 'butter', 'cream', 'yogurt', 'dairy', 'parfait',
+                      'egg', 'eggs', 'scrambled', 'omelet', 'carbonara']
+    }
+}
+SOURCE_LABELS = {
+    f'{source}_{group}': keywords
+    for source, groups in SOURCE_KEYWORDS.items()
+    for group, keywords in groups.items()
+}
+
+def _compile(groups):
+    """One regex with a named group per keyword
+
+    The alternation sits inside a lookahead so a match is tried at every
+    start position, which reports overlapping keywords like plain substring
+    tests would. Only one alternative can match at a given position, so
+    longer keywords are tried first and are credited with the labels of
+    every keyword they contain ('pasta carbonara' also counts as 'pasta').
+    """
+    owners = {}
+    for label, keywords in groups.items():
+        for keyword in keywords:
+            owners.setdefault(keyword, set()).add(label)
+    for keyword in owners:
+        for other in owners:
+            if other != keyword and other in keyword:
+                owners[keyword] |= owners[other]
+    parts = []
+    group_labels = {}
+    for i, keyword in enumerate(sorted(owners, key=lambda keyword: (-len(keyword), keyword))):
+        group_labels[f'g{i}'] = sorted(owners[keyword])
+        parts.append(f"(?P<g{i}>{re.escape(keyword)})")
+    return re.compile(f"(?=(?:{'|'.join(parts)}))"), group_labels
+
+_ALL_LABELS = {**CUISINE_KEYWORDS, **LABEL_KEYWORDS, **SOURCE_LABELS}
+_PATTERN, _GROUP_LABELS = _compile(_ALL_LABELS)
+
+def _classify_unique(names):
+    """Labels for a Series of lowercase names, one regex scan per name"""
+    names = names.reset_index(drop=True)
+    hits = {label: np.zeros(len(names), dtype=bool) for label in _ALL_LABELS}
+    matches = names.str.extractall(_PATTERN)
+    if len(matches):
+        found = matches.notna().groupby(level=0).any()
+        rows = found.index.to_numpy()
+        for group, labels in _GROUP_LABELS.items():
+            for label in labels:
+                hits[label][rows] |= found[group].to_numpy()
+
+    labels = pd.DataFrame({
+        'cuisine': np.select([hits[c] for c in CUISINE_KEYWORDS], list(CUISINE_KEYWORDS), default=DEFAULT_CUISINE)
+    })
+    for label in list(LABEL_KEYWORDS) + list(SOURCE_LABELS):
+        labels[label] = hits[label]
+    return labels
+
+def classify_names(names):
+    """Cuisine, has_meat/has_dairy/has_egg and per-source keyword labels for a column of food names
+
+    Each distinct name is scanned once by a single combined regex, so
+    categorical columns with few distinct names are classified almost for free.
+    """
+    names = pd.Series(names)
+    if isinstance(names.dtype, pd.CategoricalDtype):
+        distinct = [str(name) for name in names.cat.categories] + ['']
+        codes = names.cat.codes.to_numpy()
+        # Missing names (code -1) take the labels of an empty name
+        codes = np.where(codes < 0, len(distinct) - 1, codes)
+    else:
+        distinct, codes = np.unique(names.fillna('').astype(str).to_numpy(dtype=object), return_inverse=True)
+        codes = codes.ravel()
+    labels = _classify_unique(pd.Series(distinct, dtype=object).str.lower())
+    return labels.iloc[codes].set_index(names.index)
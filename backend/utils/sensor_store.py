@@ -0,0 +1,115 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+# Raw IMU channels of the Weight Lifting Exercises data (dataset7.csv): Euler
+# angles, total acceleration and gyroscope/accelerometer/magnetometer axes of
+# the four sensors. The per-window summary columns (kurtosis_*, avg_*, ...) are
+# only filled on window boundary rows and are not stored.
+SENSORS = ['belt', 'arm', 'dumbbell', 'forearm']
+SENSOR_CHANNELS = [
+    f'{name}_{sensor}' for sensor in SENSORS for name in ['roll', 'pitch', 'yaw', 'total_accel']
+] + [
+    f'{kind}_{sensor}_{axis}' for sensor in SENSORS for kind in ['gyros', 'accel', 'magnet'] for axis in 'xyz'
+]
+LABEL_COLUMN = 'classe'
+CHUNK_ROWS = 100000
+# A pause longer than this starts a new recording segment
+MAX_GAP_SECONDS = 1
+
+def _count_rows(csv_path, chunksize):
+    return sum(len(chunk) for chunk in pd.read_csv(csv_path, usecols=[0], chunksize=chunksize))
+
+class SensorStore:
+    """Columnar float32 copy of an IMU recording, memory-mapped from disk
+
+    samples has shape (channels, rows), so each channel is contiguous and
+    windows over time are strided views. labels holds class codes (-1 if
+    unlabelled) and segments numbers the uninterrupted recordings, which
+    feature windows must not cross.
+    """
+
+    def __init__(self, channels, classes, samples, labels, segments):
+        self.channels = channels
+        self.classes = classes
+        self.samples = samples
+        self.labels = labels
+        self.segments = segments
+
+    @classmethod
+    def convert(cls, csv_path, store_dir, chunksize=CHUNK_ROWS):
+        """Stream a CSV into a store directory in one pass over chunks (plus a row count)"""
+        os.makedirs(store_dir, exist_ok=True)
+        rows = _count_rows(csv_path, chunksize)
+        header = pd.read_csv(csv_path, nrows=0).columns
+        has_labels = LABEL_COLUMN in header
+        extra = [col for col in ['user_name', 'raw_timestamp_part_1', LABEL_COLUMN] if col in header]
+
+        samples = np.lib.format.open_memmap(os.path.join(store_dir, 'samples.npy'), mode='w+',
+                                            dtype=np.float32, shape=(len(SENSOR_CHANNELS), rows))
+        labels = np.full(rows, -1, dtype=np.int8)
+        segments = np.zeros(rows, dtype=np.int32)
+        classes = []
+        start = 0
+        previous = None  # (user, class, timestamp) of the last row of the previous chunk
+        segment = 0
+        for chunk in pd.read_csv(csv_path, usecols=SENSOR_CHANNELS + extra, chunksize=chunksize, low_memory=False):
+            end = start + len(chunk)
+            samples[:, start:end] = chunk[SENSOR_CHANNELS].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(np.float32).T
+
+            users = chunk['user_name'].astype(str).to_numpy() if 'user_name' in chunk else np.full(len(chunk), '')
+            label_values = chunk[LABEL_COLUMN].astype(str).to_numpy() if has_labels else np.full(len(chunk), '')
+            times = chunk['raw_timestamp_part_1'].to_numpy(np.int64) if 'raw_timestamp_part_1' in chunk else np.zeros(len(chunk), np.int64)
+            if has_labels:
+                for value in np.unique(label_values):
+                    if value not in classes:
+                        classes.append(value)
+                lookup = {value: code for code, value in enumerate(classes)}
+                labels[start:end] = [lookup[value] for value in label_values]
+
+            # New segment whenever the user or class changes or the recording pauses
+            prev_users = np.concatenate([[previous[0] if previous else None], users[:-1]])
+            prev_labels = np.concatenate([[previous[1] if previous else None], label_values[:-1]])
+            prev_times = np.concatenate([[previous[2] if previous else times[0]], times[:-1]])
+            breaks = (users != prev_users) | (label_values != prev_labels) | (times - prev_times > MAX_GAP_SECONDS)
+            if previous is None:
+                breaks[0] = False
+            segments[start:end] = segment + np.cumsum(breaks)
+            segment = int(segments[end - 1])
+            previous = (users[-1], label_values[-1], times[-1])
+            start = end
+        samples.flush()
+        del samples
+
+        np.save(os.path.join(store_dir, 'labels.npy'), labels)
+        np.save(os.path.join(store_dir, 'segments.npy'), segments)
+        with open(os.path.join(store_dir, 'meta.json'), 'w') as f:
+            json.dump({'channels': SENSOR_CHANNELS, 'classes': classes, 'rows': rows}, f)
+        print(f"✓ Converted {rows} sensor samples to {store_dir}")
+        return cls.open(store_dir)
+
+    @classmethod
+    def open(cls, store_dir):
+        with open(os.path.join(store_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        return cls(meta['channels'], meta['classes'],
+                   np.load(os.path.join(store_dir, 'samples.npy'), mmap_mode='r'),
+                   np.load(os.path.join(store_dir, 'labels.npy'), mmap_mode='r'),
+                   np.load(os.path.join(store_dir, 'segments.npy'), mmap_mode='r'))
+
+    def segment_bounds(self):
+        """(start, end) row ranges of the uninterrupted recordings"""
+        starts = np.flatnonzero(np.diff(self.segments, prepend=-1) != 0).tolist()
+        return list(zip(starts, starts[1:] + [len(self.segments)]))
+
+    def __len__(self):
+        return self.samples.shape[1]
+
+def load_sensor_store(csv_path, store_dir=None):
+    """Open the store for a sensor CSV, converting it first if it is missing or older than the CSV"""
+    store_dir = store_dir or os.path.splitext(csv_path)[0] + '_store'
+    meta_path = os.path.join(store_dir, 'meta.json')
+    if os.path.exists(meta_path) and os.path.getmtime(meta_path) >= os.path.getmtime(csv_path):
+        return SensorStore.open(store_dir)
+    return SensorStore.convert(csv_path, store_dir)
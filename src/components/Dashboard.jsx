@@ -2,10 +2,12 @@ import { useEffect, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import Header from './Header'
 import Logo from './Logo'
+import { getBodyPercentiles } from '../services/api'
 import '../App.css'
 
 function Dashboard() {
   const [userData, setUserData] = useState(null)
+  const [percentiles, setPercentiles] = useState(null)
   const navigate = useNavigate()
 
   useEffect(() => {
@@ -17,6 +19,12 @@ function Dashboard() {
     }
   }, [navigate])
 
+  useEffect(() => {
+    if (userData) {
+      getBodyPercentiles(userData).then(setPercentiles)
+    }
+  }, [userData])
+
   if (!userData) {
     return <div>Loading...</div>
   }
@@ -56,6 +64,14 @@ function Dashboard() {
             <div style={{ fontSize: '14px', color: 'rgba(255, 255, 255, 0.7)', marginBottom: '8px' }}>HEIGHT/WEIGHT</div>
             <div style={{ fontSize: '18px', fontWeight: '600' }}>{heightDisplay}/{userData.weight}</div>
           </div>
+          {percentiles?.bmi && (
+            <div>
+              <div style={{ fontSize: '14px', color: 'rgba(255, 255, 255, 0.7)', marginBottom: '8px' }}>BMI</div>
+              <div style={{ fontSize: '18px', fontWeight: '600' }}>
+                {percentiles.bmi.value.toFixed(1)} (percentile {Math.round(percentiles.bmi.percentile)})
+              </div>
+            </div>
+          )}
           <div>
             <div style={{ fontSize: '14px', color: 'rgba(255, 255, 255, 0.7)', marginBottom: '8px' }}>ACTIVITY LEVEL</div>
             <div style={{ fontSize: '18px', fontWeight: '600' }}>{userData.activityLevel}</div>
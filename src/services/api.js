@@ -84,6 +84,35 @@ function calculateFallbackTargets(userData) {
   };
 }
 
+/**
+ * Get height, weight and BMI percentiles from backend (null if unavailable)
+ */
+export async function getBodyPercentiles(userData) {
+  try {
+    const response = await fetch(`${API_BASE_URL}/body-percentiles`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        heightFeet: parseInt(userData.heightFeet),
+        heightInches: parseInt(userData.heightInches),
+        weight: parseFloat(userData.weight) * 0.453592, // weight is in pounds
+        gender: userData.gender
+      }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    return await response.json();
+  } catch (error) {
+    console.error('Error fetching body percentiles:', error);
+    return null;
+  }
+}
+
 /**
  * Get meal recommendations from backend
  */
@@ -203,6 +232,36 @@ export async function getWorkoutPlan(fitnessGoal, activityLevel, experienceLevel
   }
 }
 
+/**
+ * Get a periodized multi-week workout program (4-16 weeks) from backend
+ */
+export async function getWorkoutProgram(fitnessGoal, activityLevel, experienceLevel = 'Moderate', weeks = 8) {
+  try {
+    const response = await fetch(`${API_BASE_URL}/workout-program`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({
+        fitnessGoal,
+        activityLevel,
+        experienceLevel,
+        weeks
+      }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const data = await response.json();
+    return data;
+  } catch (error) {
+    console.error('Error fetching workout program:', error);
+    return null;
+  }
+}
+
 /**
  * Get progress forecast from backend
  */